@@ -0,0 +1,2 @@
+""" Performance benchmarks for tcalc, run them from the repository root.
+"""
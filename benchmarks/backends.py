@@ -0,0 +1,52 @@
+"""
+Throughput of the numeric backends.
+
+    $ python -m benchmarks.backends
+
+For every workload of `benchmarks.workloads` the compiled expressions
+are evaluated with each backend. `compile/s` includes lexing, parsing,
+optimizing and converting literals. `eval/s` only runs the bytecode, of
+unoptimized expressions as the workloads would be folded to constants.
+"""
+import argparse
+import timeit
+
+from benchmarks.workloads import WORKLOADS
+from tcalc.backends import BACKENDS
+from tcalc.compiled import compile
+
+
+def bench(exprs: list[str], backend: str, repeat: int) -> tuple[float, float]:
+    def compile_all() -> list:
+        return [compile(expr, cache=False, backend=backend) for expr in exprs]
+
+    compiled = [
+        compile(expr, cache=False, optimize=False, backend=backend) for expr in exprs
+    ]
+
+    def evaluate_all() -> list:
+        return [expr.evaluate() for expr in compiled]
+
+    compile_time = min(timeit.repeat(compile_all, number=1, repeat=repeat))
+    eval_time = min(timeit.repeat(evaluate_all, number=1, repeat=repeat))
+    return len(exprs) / compile_time, len(exprs) / eval_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.backends")
+    parser.add_argument(
+        "-w", "--workload", action="append", choices=WORKLOADS, help="(default: all)"
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'workload':<14} {'backend':<9} {'compile/s':>12} {'eval/s':>12}")
+    for name in args.workload or ["many_small", "fractional"]:
+        exprs = WORKLOADS[name]()
+        for backend in BACKENDS:
+            compiled, evaluated = bench(exprs, backend, args.repeat)
+            print(f"{name:<14} {backend:<9} {compiled:>12.0f} {evaluated:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
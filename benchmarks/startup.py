@@ -0,0 +1,146 @@
+"""
+Startup cost of `tcalc EXPR`, the way the console script runs it.
+
+    $ python -m benchmarks.startup
+    $ python -m benchmarks.startup --check     # exit 1 over budget
+
+Reports the best wall time of `--repeat` runs next to a bare interpreter
+and the import time, from `-X importtime`, of every module loaded on top
+of the bare interpreter. As for an installed package, the bytecode of
+tcalc is cached even if $PYTHONDONTWRITEBYTECODE is set, otherwise
+compiling every module would be measured. The import time is compared with
+`IMPORT_BUDGET_MS` and none of the `DEFERRED` modules may be loaded.
+The budget depends on the machine it was set on. Both are also checked
+by the test suite, the import time as the best of a few runs.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+EXPR = "(1:: + :45: + :15:) / 2"
+# what the `tcalc` console script runs
+SCRIPT = "import sys; from tcalc.cli import main; sys.exit(main())"
+ENV = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+
+IMPORT_BUDGET_MS = 30.0
+DEFERRED = (
+    "argparse",
+    "asyncio",
+    "json",
+    "socket",
+    "multiprocessing",
+    "concurrent.futures",
+    "fractions",
+    "tcalc.aggregate",
+    "tcalc.arena",
+    "tcalc.backends",
+    "tcalc.batch",
+    "tcalc.bytecode",
+    "tcalc.client",
+    "tcalc.compiled",
+    "tcalc.dag",
+    "tcalc.diskcache",
+    "tcalc.engine",
+    "tcalc.evaluator",
+    "tcalc.instrumentation",
+    "tcalc.optimizer",
+    "tcalc.parallel",
+    "tcalc.server",
+    "tcalc.sketch",
+    "tcalc.table",
+    "tcalc.worksheet",
+)
+
+
+def command(expr: str = EXPR) -> list[str]:
+    return [sys.executable, "-c", SCRIPT, expr]
+
+
+def wall_time(args: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(args, check=True, stdout=subprocess.DEVNULL, env=ENV)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def import_times(args: list[str]) -> dict[str, int]:
+    """Self import time in microseconds of every module loaded by `args`"""
+    args = [args[0], "-X", "importtime", *args[1:]]
+    proc = subprocess.run(
+        args,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=ENV,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def startup_imports(expr: str = EXPR) -> dict[str, int]:
+    """Import times of modules loaded by `tcalc EXPR` but not by `python`"""
+    bare = import_times([sys.executable, "-c", "pass"])
+    return {
+        name: us for name, us in import_times(command(expr)).items() if name not in bare
+    }
+
+
+def import_time(expr: str = EXPR, repeat: int = 5) -> float:
+    """Best total import time in ms of `startup_imports` over `repeat` runs"""
+    return min(sum(startup_imports(expr).values()) for _ in range(repeat)) / 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("-r", "--repeat", type=int, default=20)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=IMPORT_BUDGET_MS,
+        help="import time budget in ms (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="exit with status 1 over budget"
+    )
+    parser.add_argument("--top", type=int, default=10, help="slowest imports shown")
+    args = parser.parse_args()
+
+    bare = wall_time([sys.executable, "-c", "pass"], args.repeat)
+    tcalc = wall_time(command(), args.repeat)
+    imports = startup_imports()
+    total = sum(imports.values()) / 1000
+    deferred = sorted(
+        name
+        for name in imports
+        if any(name == m or name.startswith(m + ".") for m in DEFERRED)
+    )
+
+    print(f"python -c pass   {bare * 1000:8.1f} ms")
+    print(f"tcalc EXPR       {tcalc * 1000:8.1f} ms")
+    print(f"imports          {total:8.1f} ms  (budget {args.budget} ms)")
+    slowest = sorted(imports.items(), key=lambda item: -item[1])[: args.top]
+    for name, us in slowest:
+        print(f"  {name:<30} {us / 1000:6.1f} ms")
+
+    failed = False
+    if deferred:
+        print(f"modules that should be deferred: {', '.join(deferred)}")
+        failed = True
+    if total > args.budget:
+        print("import time over budget")
+        failed = True
+    return 1 if args.check and failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""
+Throughput and memory of every stage of tcalc on synthetic workloads.
+
+    $ python -m benchmarks.suite
+    $ python -m benchmarks.suite --save        # record a new baseline
+    $ python -m benchmarks.suite --compare     # exit 1 on regressions
+
+The stages are measured separately, each one on the output of the
+previous stage so that its own cost is isolated:
+
+  lexer       scanning the source into tokens (regex and char engines)
+  parser      `Parser.parse` on already scanned tokens
+  evaluator   `Evaluator.eval` on an already parsed AST
+  vm          evaluation of unoptimized bytecode
+  output      formatting and writing results with `tcalc.output.Writer`
+  cli         `cli.evaluate` end to end, with the compile cache disabled
+  batch-jN    `tcalc --batch --jobs N` of the workload repeated to span
+              many chunks, for every N in `JOBS`; scaling is the ratio of
+              their throughputs. Workloads of a single expression cannot
+              be split and are skipped. Peak memory is the parent's.
+
+Throughput is reported in expressions per second, the best of `--repeat`
+runs. Peak memory is the largest traced allocation of one extra run
+under `tracemalloc`, which would slow down the timed runs.
+
+Baselines are only comparable on the machine they were recorded on,
+record a new one with `--save` before comparing changes. A benchmark
+without a baseline counts as a regression for `--compare`.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, NamedTuple
+
+from benchmarks.workloads import WORKLOADS
+from tcalc import cli
+from tcalc.ast import AST
+from tcalc.compiled import DEFAULT_CACHE_SIZE, compile, set_cache_size
+from tcalc.evaluator import Evaluator
+from tcalc.lexer import create_lexer
+from tcalc.output import HMS, Writer
+from tcalc.parallel import evaluate_parallel
+from tcalc.parser import Parser
+from tcalc.token import Token, TokenType
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+TOLERANCE = 0.25
+JOBS = (1, 2, 4)
+# input of the scaling stages: copies of the workload, in chunks small
+# enough that every worker gets several
+SCALING_COPIES = 10
+SCALING_CHUNK_SIZE = 32 << 10
+
+
+class TokenStream:
+    """Replays scanned tokens to the parser"""
+
+    def __init__(self, tokens: list[Token]) -> None:
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> Token:
+        return self.tokens[self.pos]
+
+    def consume(self) -> Token:
+        token = self.tokens[self.pos]
+        if token.type is not TokenType.EOF:
+            self.pos += 1
+        return token
+
+    def isEOF(self) -> bool:
+        return self.tokens[self.pos].type is TokenType.EOF
+
+
+class ParsedExpression:
+    def __init__(self, ast: AST) -> None:
+        self.ast = ast
+
+    def parse(self) -> AST:
+        return self.ast
+
+
+class Result(NamedTuple):
+    ops_per_sec: float
+    peak_kib: float
+
+
+def scan(expr: str, engine: str = "regex") -> list[Token]:
+    lexer = create_lexer(expr, engine)
+    tokens = []
+    while not lexer.isEOF():
+        tokens.append(lexer.consume())
+    tokens.append(lexer.consume())
+    return tokens
+
+
+def stages(exprs: list[str]) -> dict[str, Callable[[], object]]:
+    tokens = [scan(expr) for expr in exprs]
+    asts = [Parser(TokenStream(t)).parse() for t in tokens]
+    # unoptimized, constant folding would leave nothing to evaluate
+    compiled = [compile(expr, cache=False, optimize=False) for expr in exprs]
+
+    def lexer(engine: str) -> Callable[[], object]:
+        return lambda: [scan(expr, engine) for expr in exprs]
+
+    def parser() -> object:
+        return [Parser(TokenStream(t)).parse() for t in tokens]
+
+    def evaluator() -> object:
+        return [Evaluator(ParsedExpression(ast)).eval() for ast in asts]
+
+    def vm() -> object:
+        return [expr.evaluate() for expr in compiled]
+
+    results = [expr.evaluate() for expr in compiled]
+
+    def output() -> object:
+        with Writer("hms", io.StringIO()) as writer:
+            for result in results:
+                writer.write(HMS.result(result))
+        return writer
+
+    def end_to_end() -> object:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return [cli.evaluate(expr) for expr in exprs]
+
+    return {
+        "lexer": lexer("regex"),
+        "lexer-char": lexer("char"),
+        "parser": parser,
+        "evaluator": evaluator,
+        "vm": vm,
+        "output": output,
+        "cli": end_to_end,
+    }
+
+
+def scaling(path: str) -> dict[str, Callable[[], object]]:
+    def batch(jobs: int) -> Callable[[], object]:
+        def run() -> object:
+            with contextlib.redirect_stdout(io.StringIO()):
+                return evaluate_parallel([path], jobs, chunk_size=SCALING_CHUNK_SIZE)
+
+        return run
+
+    return {f"batch-j{jobs}": batch(jobs) for jobs in JOBS}
+
+
+def measure(fn: Callable[[], object], count: int, repeat: int) -> Result:
+    best = float("inf")
+    gc.disable()  # as timeit does, collections add noise
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(count / best, peak / 1024)
+
+
+def run(workloads: list[str], repeat: int) -> dict[str, Result]:
+    results = {}
+    set_cache_size(0)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in workloads:
+                exprs = WORKLOADS[name]()
+                for stage, fn in stages(exprs).items():
+                    results[f"{name}/{stage}"] = measure(fn, len(exprs), repeat)
+                if len(exprs) == 1:
+                    continue
+                path = os.path.join(tmp, f"{name}.txt")
+                with open(path, "w") as fp:
+                    fp.writelines(f"{expr}\n" for expr in exprs * SCALING_COPIES)
+                count = len(exprs) * SCALING_COPIES
+                for stage, fn in scaling(path).items():
+                    results[f"{name}/{stage}"] = measure(fn, count, repeat)
+    finally:
+        set_cache_size(DEFAULT_CACHE_SIZE)
+    return results
+
+
+def compare(
+    results: dict[str, Result], baseline: dict[str, dict], tolerance: float
+) -> dict[str, list[str]]:
+    """Return the regressions of every benchmark, including the missing baselines"""
+    regressions: dict[str, list[str]] = {}
+    for key, result in results.items():
+        if key not in baseline:
+            regressions[key] = ["no baseline"]
+            continue
+        base = Result(**baseline[key])
+        found = []
+        if result.ops_per_sec < base.ops_per_sec * (1 - tolerance):
+            found.append("ops/s")
+        if result.peak_kib > base.peak_kib * (1 + tolerance):
+            found.append("memory")
+        if found:
+            regressions[key] = found
+    return regressions
+
+
+def report(
+    results: dict[str, Result],
+    baseline: dict[str, dict],
+    regressions: dict[str, list[str]],
+) -> None:
+    print(f"{'benchmark':<28} {'ops/s':>12} {'peak KiB':>10} {'vs base':>8}  flags")
+    for key, result in results.items():
+        change = ""
+        if key in baseline:
+            change = f"{result.ops_per_sec / baseline[key]['ops_per_sec']:.2f}x"
+        flags = ", ".join(regressions.get(key, []))
+        print(
+            f"{key:<28} {result.ops_per_sec:>12.0f} {result.peak_kib:>10.1f}"
+            f" {change:>8}  {flags}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument(
+        "-w",
+        "--workload",
+        action="append",
+        choices=WORKLOADS,
+        help="workloads to run, may be repeated (default: all)",
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=7)
+    parser.add_argument(
+        "--baseline", default=BASELINE, help="baseline file (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="write the results as the new baseline"
+    )
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="exit with status 1 if a benchmark regressed against the baseline",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=TOLERANCE,
+        help="allowed relative slowdown or memory growth (default: %(default)s)",
+    )
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.workload or list(WORKLOADS), args.repeat)
+
+    baseline: dict[str, dict] = {}
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+    regressions = {} if args.save else compare(results, baseline, args.tolerance)
+    report(results, baseline, regressions)
+
+    data = {key: result._asdict() for key, result in results.items()}
+    if args.json:
+        with open(args.json, "w") as fp:
+            json.dump(data, fp, indent=2)
+    if args.save:
+        with open(args.baseline, "w") as fp:
+            json.dump(data, fp, indent=2)
+            fp.write("\n")
+        print(f"baseline written to {args.baseline}")
+
+    if args.compare and regressions:
+        print(f"{len(regressions)} regression(s)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Compare the bytecode VM against the tree walking evaluator.
+
+    $ python -m benchmarks.vm
+"""
+import argparse
+import random
+import timeit
+from decimal import Decimal
+
+from tcalc.compiled import compile
+from tcalc.expression import Time
+
+EXPRESSIONS = (
+    "(1:: + :45: + :15:) / 2",
+    "(x + 0:15:) * 1.2",
+    "-(8:: - 0:30:) * 5 + x / 3",
+)
+
+
+def long_sum(terms: int) -> str:
+    rng = random.Random(terms)
+    return " + ".join(
+        f"{rng.randrange(10)}:{rng.randrange(60)}:{rng.randrange(60)}"
+        for _ in range(terms)
+    )
+
+
+def bench(source: str, repeat: int) -> tuple[float, float]:
+    expr = compile(source, cache=False)
+    variables = {"x": Time(Decimal(1), Decimal(2), Decimal(3))}
+    walk = min(timeit.repeat(lambda: expr.walk(**variables), number=repeat))
+    vm = min(timeit.repeat(lambda: expr.evaluate(**variables), number=repeat))
+    return walk, vm
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.vm")
+    parser.add_argument("-n", "--number", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{'expression':<40} {'walk/s':>12} {'vm/s':>12} {'speedup':>8}")
+    for source in EXPRESSIONS + (long_sum(100),):
+        number = args.number if len(source) < 100 else args.number // 100
+        walk, vm = bench(source, number)
+        label = source if len(source) <= 40 else source[:37] + "..."
+        print(
+            f"{label:<40} {number / walk:>12.0f} {number / vm:>12.0f}"
+            f" {walk / vm:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
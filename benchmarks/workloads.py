@@ -0,0 +1,54 @@
+"""
+Synthetic workloads, every workload is a list of expressions.
+
+The generators are seeded, so a workload is the same on every run and
+results can be compared with a saved baseline.
+"""
+import random
+
+
+def _time(rng: random.Random) -> str:
+    return f"{rng.randrange(24)}:{rng.randrange(60)}:{rng.randrange(60)}"
+
+
+def long_sum(terms: int = 2000, seed: int = 1) -> list[str]:
+    """One long additive chain of time literals"""
+    rng = random.Random(seed)
+    return [" + ".join(_time(rng) for _ in range(terms))]
+
+
+def deep_nesting(depth: int = 2000, seed: int = 2) -> list[str]:
+    """One expression nested `depth` parentheses deep"""
+    rng = random.Random(seed)
+    expr = _time(rng)
+    for _ in range(depth):
+        expr = f"({expr} + ::{rng.randrange(60)})"
+    return [expr]
+
+
+def many_small(count: int = 2000, seed: int = 3) -> list[str]:
+    """Many short expressions as found in job logs"""
+    rng = random.Random(seed)
+    return [
+        f"({_time(rng)} - :{rng.randrange(60)}:) * {rng.randrange(1, 9)}"
+        for _ in range(count)
+    ]
+
+
+def fractional(count: int = 2000, seed: int = 4) -> list[str]:
+    """Expressions producing fractional seconds"""
+    rng = random.Random(seed)
+    return [
+        f"{_time(rng)} / {rng.randrange(3, 17, 2)}"
+        f" * {rng.randrange(1, 99)}.{rng.randrange(1, 99)}"
+        f" - ::{rng.randrange(60)} / 7"
+        for _ in range(count)
+    ]
+
+
+WORKLOADS = {
+    "long_sum": long_sum,
+    "deep_nesting": deep_nesting,
+    "many_small": many_small,
+    "fractional": fractional,
+}
@@ -25,6 +25,7 @@ setuptools.setup(
     author_email=__author_email__,
     description=__description__,
     entry_points=entry_points,
+    extras_require={"numpy": ["numpy"]},
     long_description=long_description,
     long_description_content_type="text/x-rst",
     url="https://github.com/zugruhtra/tcalc",
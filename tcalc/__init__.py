@@ -5,3 +5,27 @@ __version__ = "0.0.1"
 __description__ = "CLI calculator with support of time expressions"
 __author__ = "Arthur Guz"
 __author_email__ = "zugruhtra@gmail.com"
+
+__all__ = [
+    "CompiledExpression",
+    "Engine",
+    "Result",
+    "cache_clear",
+    "cache_info",
+    "compile",
+    "set_cache_size",
+]
+
+
+def __getattr__(name):
+    # imported on first use, `tcalc.cli` should not pay for the whole
+    # compiler stack when it does not need it
+    if name in ("Engine", "Result"):
+        from tcalc import engine
+
+        return getattr(engine, name)
+    if name in __all__:
+        from tcalc import compiled
+
+        return getattr(compiled, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
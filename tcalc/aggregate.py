@@ -0,0 +1,73 @@
+"""
+Running totals of durations (or numbers) grouped by key.
+
+Only count, sum, minimum and maximum are stored per key, so memory is
+bounded by the number of distinct keys, not by the number of values.
+Sums of times are exact, they are integer sums of ticks. Partial results,
+e.g. of different files or worker processes, are combined with `merge`.
+"""
+from decimal import Decimal
+from typing import Iterator
+
+from tcalc.errors import EvaluatorError
+from tcalc.expression import Time
+
+
+class Aggregate:
+    __slots__ = ("count", "total", "minimum", "maximum")
+
+    def __init__(self, value: Decimal | Time) -> None:
+        self.count = 1
+        self.total = value
+        self.minimum = value
+        self.maximum = value
+
+    def add(self, value: Decimal | Time) -> None:
+        if type(value) is not type(self.total):
+            raise EvaluatorError("cannot aggregate numbers and times", -1)
+        self.count += 1
+        self.total += value  # type: ignore
+        if value < self.minimum:  # type: ignore
+            self.minimum = value
+        elif value > self.maximum:  # type: ignore
+            self.maximum = value
+
+    def merge(self, other: "Aggregate") -> None:
+        if type(other.total) is not type(self.total):
+            raise EvaluatorError("cannot aggregate numbers and times", -1)
+        self.count += other.count
+        self.total += other.total  # type: ignore
+        self.minimum = min(self.minimum, other.minimum)  # type: ignore
+        self.maximum = max(self.maximum, other.maximum)  # type: ignore
+
+    @property
+    def mean(self) -> Decimal | Time:
+        return self.total / Decimal(self.count)  # type: ignore
+
+
+class Aggregator:
+    def __init__(self) -> None:
+        self.groups: dict[str, Aggregate] = {}
+
+    def add(self, key: str, value: Decimal | Time) -> None:
+        try:
+            self.groups[key].add(value)
+        except KeyError:
+            self.groups[key] = Aggregate(value)
+
+    def merge(self, other: "Aggregator") -> None:
+        for key, aggregate in other.groups.items():
+            self.merge_group(key, aggregate)
+
+    def merge_group(self, key: str, aggregate: Aggregate) -> None:
+        """Merge the partial `aggregate` of `key`, which is kept if new"""
+        try:
+            self.groups[key].merge(aggregate)
+        except KeyError:
+            self.groups[key] = aggregate
+
+    def __iter__(self) -> Iterator[tuple[str, Aggregate]]:
+        return iter(self.groups.items())
+
+    def __len__(self) -> int:
+        return len(self.groups)
@@ -0,0 +1,226 @@
+"""
+A compact representation of the AST for very large expressions.
+
+An `Arena` stores the nodes of one expression in parallel typed arrays
+instead of one object per node:
+
+  ops       opcode of the node, array of signed chars
+  left      left operand, the operand of a unary operator or, for
+            leaves, the index of the literal in `pool`
+  right     right operand, -1 for unary operators and leaves
+  columns   source column of operators and variables, -1 otherwise
+
+A node costs 13 bytes plus its share of the pool, where equal literals
+are stored once. Nodes are appended children first, so the arena is the
+expression in postfix order and `root` is its last node; the evaluator
+and the optimizer run over it in a single loop without a stack of nodes.
+
+`ArenaParser` builds an arena directly from tokens. `from_tree` and
+`to_tree` convert from and to the object tree of `tcalc.ast`, e.g. to
+print it with `tcalc.ast.format_tree`.
+"""
+from array import array
+from typing import Any, Iterator
+
+from tcalc.ast import (
+    AST,
+    BinaryOperator,
+    Constant,
+    Number,
+    Time,
+    UnaryOperator,
+    Variable,
+    postorder,
+)
+from tcalc.parser import Lexer, Parser
+from tcalc.token import Token, TokenType
+
+# leaves, `left` is an index into the pool
+NUMBER = 0  # pool holds the literal text
+TIME = 1  # pool holds "hours:minutes:seconds", one string is smallest
+VARIABLE = 2  # pool holds the name
+CONSTANT = 3  # pool holds a value of the numeric backend
+# operators
+ADD = 4
+SUB = 5
+MUL = 6
+DIV = 7
+NEG = 8
+POS = 9
+
+LEAVES = (NUMBER, TIME, VARIABLE, CONSTANT)
+BINARY = (ADD, SUB, MUL, DIV)
+UNARY = (NEG, POS)
+
+BINARY_OPS = {
+    TokenType.PLUS: ADD,
+    TokenType.MINUS: SUB,
+    TokenType.MULT: MUL,
+    TokenType.DIV: DIV,
+}
+OP_TOKENS = {
+    ADD: (TokenType.PLUS, "+"),
+    SUB: (TokenType.MINUS, "-"),
+    MUL: (TokenType.MULT, "*"),
+    DIV: (TokenType.DIV, "/"),
+    NEG: (TokenType.MINUS, "-"),
+    POS: (TokenType.PLUS, "+"),
+}
+
+
+class Arena:
+    __slots__ = ("ops", "left", "right", "columns", "pool", "root", "_pool_index")
+
+    def __init__(self) -> None:
+        self.ops = array("b")
+        self.left = array("i")
+        self.right = array("i")
+        self.columns = array("i")
+        self.pool: list[Any] = []
+        self._pool_index: dict[Any, int] = {}
+        self.root = -1
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def add(self, op: int, left: int, right: int = -1, column: int = -1) -> int:
+        self.ops.append(op)
+        self.left.append(left)
+        self.right.append(right)
+        self.columns.append(column)
+        self.root = len(self.ops) - 1
+        return self.root
+
+    def add_leaf(self, op: int, literal: Any, column: int = -1) -> int:
+        key = _pool_key(op, literal)
+        index = self._pool_index.get(key)
+        if index is None:
+            index = self._pool_index[key] = len(self.pool)
+            self.pool.append(literal)
+        return self.add(op, index, -1, column)
+
+    def add_node(self, node: AST) -> int:
+        """Append a leaf of the object tree"""
+        if type(node) is Number:
+            return self.add_leaf(NUMBER, node.value)
+        elif type(node) is Time:
+            text = f"{node.hours}:{node.minutes}:{node.seconds}"
+            return self.add_leaf(TIME, text)
+        elif type(node) is Variable:
+            return self.add_leaf(VARIABLE, node.name, node.column)
+        elif type(node) is Constant:
+            return self.add_leaf(CONSTANT, node.value)
+        assert False, "unreachable line"
+
+    def pop(self) -> None:
+        """Remove the last node, its literal stays in the pool"""
+        for column in (self.ops, self.left, self.right, self.columns):
+            column.pop()
+        self.root = len(self.ops) - 1
+
+    def compact(self) -> None:
+        """Drop the literals no node refers to any more"""
+        pool: list[Any] = []
+        pool_index: dict[Any, int] = {}
+        renumbered: dict[int, int] = {}
+        left = self.left
+        for index, op in enumerate(self.ops):
+            if op in LEAVES:
+                old = left[index]
+                new = renumbered.get(old)
+                if new is None:
+                    new = renumbered[old] = len(pool)
+                    pool.append(self.pool[old])
+                    pool_index[_pool_key(op, self.pool[old])] = new
+                left[index] = new
+        self.pool = pool
+        self._pool_index = pool_index
+
+    def literal(self, index: int) -> Any:
+        return self.pool[self.left[index]]
+
+    def variables(self) -> set[str]:
+        return {
+            self.pool[left]
+            for op, left in zip(self.ops, self.left)
+            if op == VARIABLE
+        }
+
+    def nbytes(self) -> int:
+        """Size of the node arrays in bytes, without the pool"""
+        return sum(
+            column.itemsize * len(column)
+            for column in (self.ops, self.left, self.right, self.columns)
+        )
+
+    def __iter__(self) -> Iterator[tuple[int, int, int, int]]:
+        """(op, left, right, column) of every node, children first"""
+        return zip(self.ops, self.left, self.right, self.columns)
+
+
+def _pool_key(op: int, literal: Any) -> Any:
+    # values that compare equal may print differently, e.g. Decimal("1")
+    # and Decimal("1.0"), so constants are pooled by their exact repr
+    return (type(literal), repr(literal)) if op == CONSTANT else literal
+
+
+class ArenaParser(Parser):
+    """`tcalc.parser.Parser` that builds an `Arena` instead of objects"""
+
+    def __init__(self, lexer: Lexer) -> None:
+        super().__init__(lexer)
+        self.arena = Arena()
+
+    def parse(self) -> Arena:  # type: ignore[override]
+        self.arena.root = super().parse()  # type: ignore
+        return self.arena
+
+    def _parse_operand(self) -> int:  # type: ignore[override]
+        return self.arena.add_node(super()._parse_operand())
+
+    def _make_unary(self, op: Token, expr: int) -> int:  # type: ignore[override]
+        unary = NEG if op.type is TokenType.MINUS else POS
+        return self.arena.add(unary, expr, -1, op.column)
+
+    def _make_binary(  # type: ignore[override]
+        self, left: int, op: Token, right: int
+    ) -> int:
+        return self.arena.add(BINARY_OPS[op.type], left, right, op.column)
+
+
+def from_tree(ast: AST) -> Arena:
+    arena = Arena()
+    operands: list[int] = []
+    for node in postorder(ast):
+        if type(node) is BinaryOperator:
+            right = operands.pop()
+            operands[-1] = arena.add(
+                BINARY_OPS[node.op.type], operands[-1], right, node.op.column
+            )
+        elif type(node) is UnaryOperator:
+            unary = NEG if node.op.type is TokenType.MINUS else POS
+            operands[-1] = arena.add(unary, operands[-1], -1, node.op.column)
+        else:
+            operands.append(arena.add_node(node))
+    return arena
+
+
+def to_tree(arena: Arena) -> AST:
+    nodes: list[AST] = []
+    pool = arena.pool
+    for op, left, right, column in arena:
+        if op == NUMBER:
+            nodes.append(Number(pool[left]))
+        elif op == TIME:
+            nodes.append(Time(*pool[left].split(":")))
+        elif op == VARIABLE:
+            nodes.append(Variable(pool[left], column))
+        elif op == CONSTANT:
+            nodes.append(Constant(pool[left]))
+        elif op in UNARY:
+            token = Token(*OP_TOKENS[op], column)
+            nodes.append(UnaryOperator(token, nodes[left]))
+        else:
+            token = Token(*OP_TOKENS[op], column)
+            nodes.append(BinaryOperator(nodes[left], token, nodes[right]))
+    return nodes[arena.root]
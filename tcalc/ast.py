@@ -1,3 +1,7 @@
+from decimal import Decimal
+from typing import Iterator
+
+from tcalc.expression import Time as TimeExpr
 from tcalc.token import Token
 
 
@@ -12,7 +16,7 @@ class BinaryOperator(AST):
         self.right = right
 
     def __str__(self) -> str:
-        return f"BinOp({self.op}, {str(self.left)}, {str(self.right)})"
+        return render(self)
 
 
 class UnaryOperator(AST):
@@ -21,7 +25,7 @@ class UnaryOperator(AST):
         self.expr = expr
 
     def __str__(self) -> str:
-        return f"UnaryOp({self.op}, {str(self.expr)})"
+        return render(self)
 
 
 class Number(AST):
@@ -40,3 +44,104 @@ class Time(AST):
 
     def __str__(self) -> str:
         return f"Time({self.hours}, {self.minutes}, {self.seconds})"
+
+
+class Variable(AST):
+    def __init__(self, name: str, column: int) -> None:
+        self.name = name
+        self.column = column
+
+    def __str__(self) -> str:
+        return f"Var({self.name})"
+
+
+class Constant(AST):
+    """A value computed ahead of evaluation, e.g. by the optimizer"""
+
+    def __init__(self, value: Decimal | TimeExpr) -> None:
+        self.value = value
+
+    def __str__(self) -> str:
+        return f"Const({self.value})"
+
+
+def postorder(ast: AST) -> Iterator[AST]:
+    """Yield the nodes of `ast` children first, without recursion"""
+    stack: list[tuple[AST, bool]] = [(ast, False)]
+    while stack:
+        node, visited = stack.pop()
+        if visited:
+            yield node
+        elif type(node) is BinaryOperator:
+            stack.append((node, True))
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+        elif type(node) is UnaryOperator:
+            stack.append((node, True))
+            stack.append((node.expr, False))
+        else:
+            yield node
+
+
+def render(ast: AST) -> str:
+    parts: list[str] = []
+    stack: list[AST | str] = [ast]
+    while stack:
+        item = stack.pop()
+        if type(item) is str:
+            parts.append(item)
+        elif type(item) is BinaryOperator:
+            stack += [")", item.right, ", ", item.left, f"BinOp({item.op}, "]
+        elif type(item) is UnaryOperator:
+            stack += [")", item.expr, f"UnaryOp({item.op}, "]
+        else:
+            parts.append(str(item))
+    return "".join(parts)
+
+
+def iter_nodes(ast: AST) -> Iterator[AST]:
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        yield node
+        if type(node) is BinaryOperator:
+            stack.append(node.right)
+            stack.append(node.left)
+        elif type(node) is UnaryOperator:
+            stack.append(node.expr)
+
+
+def variables(ast: AST) -> set[str]:
+    return {node.name for node in iter_nodes(ast) if type(node) is Variable}
+
+
+def variable_column(ast: AST, name: str) -> int:
+    """Column of the first reference to `name`, -1 if there is none"""
+    columns = [
+        node.column
+        for node in iter_nodes(ast)
+        if type(node) is Variable and node.name == name
+    ]
+    return min(columns, default=-1)
+
+
+def label(node: AST) -> str:
+    if type(node) is BinaryOperator:
+        return f"BinOp({node.op.value})"
+    elif type(node) is UnaryOperator:
+        return f"UnaryOp({node.op.value})"
+    return str(node)
+
+
+def format_tree(ast: AST) -> str:
+    lines = []
+    stack = [(ast, 0)]
+    while stack:
+        node, depth = stack.pop()
+        lines.append("  " * depth + label(node))
+        if type(node) is BinaryOperator:
+            stack.append((node.right, depth + 1))
+            stack.append((node.left, depth + 1))
+        elif type(node) is UnaryOperator:
+            stack.append((node.expr, depth + 1))
+    return "\n".join(lines)
@@ -0,0 +1,426 @@
+"""
+Numeric backends, the types expressions are evaluated with.
+
+A backend turns literals and bound variables into values. Arithmetic is
+done by the operators of its number and time types, so the evaluator,
+the optimizer and the VM work with every backend. It is chosen by name
+per call, e.g. `tcalc.compile(expr, backend="fraction")`.
+
+Precision contracts:
+
+  decimal   The default. Numbers are `Decimal` in the current context,
+            28 significant digits unless changed. Times are integer
+            microseconds (`tcalc.expression.Time`), multiplying and
+            dividing a time rounds half-even to the microsecond.
+
+  fraction  Exact. Numbers are `fractions.Fraction`, times are rational
+            seconds and no operation rounds, `1:: / 3 * 3` is exactly
+            one hour. Times are printed rounded half-even to the
+            microsecond, numbers as fractions, e.g. `1/3`.
+
+  fixed     Integer arithmetic only. Numbers are fixed point with six
+            decimal places, times integer microseconds. Literals and
+            the result of every operation are rounded half-even to the
+            last place.
+
+  float     Fast and approximate. Numbers and times (in seconds) are
+            binary floats with 15 to 17 significant digits, results may
+            be off in the last digits. Times are printed rounded to the
+            microsecond. The optimizer does not reorder sums and
+            products for this backend, as that would change results.
+"""
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from fractions import Fraction
+from functools import total_ordering
+from typing import Any
+
+from tcalc.expression import TICKS_PER_SECOND, Time, format_ticks
+
+SCALE = 10**6  # fixed point numbers have six decimal places
+ONE = Decimal(1)
+
+
+class Backend(ABC):
+    name = ""
+    # whether sums and products may be reordered without changing results
+    exact = True
+    number_type: type[Any] = object
+    time_type: type[Any] = object
+
+    def number(self, text: str) -> Any:
+        """Value of a numeric literal"""
+        return self.number_from_fraction(Fraction(text))
+
+    def time(self, hours: str, minutes: str, seconds: str) -> Any:
+        """Value of a time literal"""
+        total = Fraction(hours) * 3600 + Fraction(minutes) * 60 + Fraction(seconds)
+        return self.time_from_seconds(total)
+
+    @abstractmethod
+    def number_from_fraction(self, value: Fraction) -> Any:
+        pass
+
+    @abstractmethod
+    def time_from_seconds(self, seconds: Fraction) -> Any:
+        pass
+
+    def coerce(self, value: Any) -> Any:
+        """Convert a bound variable, e.g. a `Time` or an int, to this backend"""
+        if type(value) is self.number_type or type(value) is self.time_type:
+            return value
+        seconds = _seconds(value)
+        if seconds is not None:
+            return self.time_from_seconds(seconds)
+        if type(value) is Fixed:
+            return self.number_from_fraction(Fraction(value.units, SCALE))
+        return self.number_from_fraction(Fraction(value))
+
+    def is_time(self, value: Any) -> bool:
+        return type(value) is self.time_type
+
+    def is_one(self, value: Any) -> bool:
+        return type(value) is self.number_type and value == 1
+
+    def is_integral(self, value: Any) -> bool:
+        return type(value) is self.number_type and value == int(value)
+
+    def __repr__(self) -> str:
+        return f"<{self.name} backend>"
+
+
+class DecimalBackend(Backend):
+    name = "decimal"
+    number_type = Decimal
+    time_type = Time
+
+    def number(self, text: str) -> Decimal:
+        return Decimal(text)
+
+    def time(self, hours: str, minutes: str, seconds: str) -> Time:
+        return Time(Decimal(hours), Decimal(minutes), Decimal(seconds))
+
+    def number_from_fraction(self, value: Fraction) -> Decimal:
+        return Decimal(value.numerator) / Decimal(value.denominator)
+
+    def time_from_seconds(self, seconds: Fraction) -> Time:
+        return Time.from_ticks(round(seconds * TICKS_PER_SECOND))
+
+    def coerce(self, value: Any) -> Any:
+        # ints are valid operands of Decimal and Time already
+        if type(value) is int:
+            return value
+        return super().coerce(value)
+
+    def is_one(self, value: Any) -> bool:
+        # exactly 1, multiplying by 1.0 changes the exponent of a Decimal
+        return type(value) is Decimal and value.as_tuple() == ONE.as_tuple()
+
+    def is_integral(self, value: Any) -> bool:
+        return type(value) is Decimal and value == value.to_integral_value()
+
+
+@total_ordering
+class ScalarTime:
+    """A duration held as seconds of the backend's number type"""
+
+    __slots__ = ("seconds",)
+    number: type = object
+
+    def __init__(self, seconds: Any) -> None:
+        self.seconds = seconds
+
+    @property
+    def ticks(self) -> int:
+        # round() is half-even for Fraction and float
+        return round(self.seconds * TICKS_PER_SECOND)
+
+    def __str__(self) -> str:
+        return format_ticks(self.ticks)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.seconds!r})"
+
+    def __add__(self, other: Any) -> Any:
+        if type(other) is not type(self):
+            return NotImplemented
+        return type(self)(self.seconds + other.seconds)
+
+    def __sub__(self, other: Any) -> Any:
+        if type(other) is not type(self):
+            return NotImplemented
+        return type(self)(self.seconds - other.seconds)
+
+    def __mul__(self, other: Any) -> Any:
+        if not isinstance(other, (int, self.number)):
+            return NotImplemented
+        return type(self)(self.seconds * other)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: Any) -> Any:
+        if type(other) is type(self):
+            return self.seconds / other.seconds
+        if not isinstance(other, (int, self.number)):
+            return NotImplemented
+        return type(self)(self.seconds / other)
+
+    def __neg__(self) -> Any:
+        return type(self)(-self.seconds)
+
+    def __pos__(self) -> Any:
+        return self
+
+    def __abs__(self) -> Any:
+        return type(self)(abs(self.seconds))
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is type(self) and self.seconds == other.seconds
+
+    def __lt__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.seconds < other.seconds
+
+    def __hash__(self) -> int:
+        return hash(self.seconds)
+
+
+class FractionTime(ScalarTime):
+    __slots__ = ()
+    number = Fraction
+
+
+class FloatTime(ScalarTime):
+    __slots__ = ()
+    number = float
+
+
+class FractionBackend(Backend):
+    name = "fraction"
+    number_type = Fraction
+    time_type = FractionTime
+
+    def number_from_fraction(self, value: Fraction) -> Fraction:
+        return value
+
+    def time_from_seconds(self, seconds: Fraction) -> FractionTime:
+        return FractionTime(seconds)
+
+    def is_integral(self, value: Any) -> bool:
+        return type(value) is Fraction and value.denominator == 1
+
+
+class FloatBackend(Backend):
+    name = "float"
+    exact = False
+    number_type = float
+    time_type = FloatTime
+
+    def number(self, text: str) -> float:
+        return float(text)
+
+    def time(self, hours: str, minutes: str, seconds: str) -> FloatTime:
+        return FloatTime(float(hours) * 3600 + float(minutes) * 60 + float(seconds))
+
+    def number_from_fraction(self, value: Fraction) -> float:
+        return float(value)
+
+    def time_from_seconds(self, seconds: Fraction) -> FloatTime:
+        return FloatTime(float(seconds))
+
+
+def round_div(n: int, d: int) -> int:
+    """n / d rounded half-even to an integer"""
+    if not d:
+        raise ZeroDivisionError("division by zero")
+    if d < 0:
+        n, d = -n, -d
+    q, r = divmod(n, d)
+    if 2 * r > d or (2 * r == d and q % 2):
+        q += 1
+    return q
+
+
+@total_ordering
+class Fixed:
+    """A number with six decimal places, held as an integer count of 1e-6"""
+
+    __slots__ = ("units",)
+
+    def __init__(self, units: int) -> None:
+        self.units = units
+
+    def __str__(self) -> str:
+        whole, fraction = divmod(abs(self.units), SCALE)
+        text = f"{whole}.{fraction:06d}".rstrip("0") if fraction else f"{whole}"
+        return "-" + text if self.units < 0 else text
+
+    def __repr__(self) -> str:
+        return f"Fixed({self})"
+
+    def __add__(self, other: Any) -> Any:
+        if type(other) is not Fixed:
+            return NotImplemented
+        return Fixed(self.units + other.units)
+
+    def __sub__(self, other: Any) -> Any:
+        if type(other) is not Fixed:
+            return NotImplemented
+        return Fixed(self.units - other.units)
+
+    def __mul__(self, other: Any) -> Any:
+        if type(other) is not Fixed:
+            return NotImplemented
+        return Fixed(round_div(self.units * other.units, SCALE))
+
+    def __truediv__(self, other: Any) -> Any:
+        if type(other) is not Fixed:
+            return NotImplemented
+        return Fixed(round_div(self.units * SCALE, other.units))
+
+    def __neg__(self) -> "Fixed":
+        return Fixed(-self.units)
+
+    def __pos__(self) -> "Fixed":
+        return self
+
+    def __abs__(self) -> "Fixed":
+        return Fixed(abs(self.units))
+
+    def __int__(self) -> int:
+        return int(Fraction(self.units, SCALE))
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is int:
+            return self.units == other * SCALE
+        return type(other) is Fixed and self.units == other.units
+
+    def __lt__(self, other: Any) -> bool:
+        if type(other) is not Fixed:
+            return NotImplemented
+        return self.units < other.units
+
+    def __hash__(self) -> int:
+        return hash(Fraction(self.units, SCALE))
+
+
+@total_ordering
+class FixedTime:
+    """A duration of integer microseconds for the fixed point backend"""
+
+    __slots__ = ("ticks",)
+
+    def __init__(self, ticks: int) -> None:
+        self.ticks = ticks
+
+    def __str__(self) -> str:
+        return format_ticks(self.ticks)
+
+    def __repr__(self) -> str:
+        return f"FixedTime({self})"
+
+    def __add__(self, other: Any) -> Any:
+        if type(other) is not FixedTime:
+            return NotImplemented
+        return FixedTime(self.ticks + other.ticks)
+
+    def __sub__(self, other: Any) -> Any:
+        if type(other) is not FixedTime:
+            return NotImplemented
+        return FixedTime(self.ticks - other.ticks)
+
+    def __mul__(self, other: Any) -> Any:
+        if type(other) is not Fixed:
+            return NotImplemented
+        return FixedTime(round_div(self.ticks * other.units, SCALE))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: Any) -> Any:
+        if type(other) is Fixed:
+            return FixedTime(round_div(self.ticks * SCALE, other.units))
+        if type(other) is FixedTime:
+            return Fixed(round_div(self.ticks * SCALE, other.ticks))
+        return NotImplemented
+
+    def __neg__(self) -> "FixedTime":
+        return FixedTime(-self.ticks)
+
+    def __pos__(self) -> "FixedTime":
+        return self
+
+    def __abs__(self) -> "FixedTime":
+        return FixedTime(abs(self.ticks))
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is FixedTime and self.ticks == other.ticks
+
+    def __lt__(self, other: Any) -> bool:
+        if type(other) is not FixedTime:
+            return NotImplemented
+        return self.ticks < other.ticks
+
+    def __hash__(self) -> int:
+        return hash(self.ticks)
+
+
+class FixedBackend(Backend):
+    name = "fixed"
+    number_type = Fixed
+    time_type = FixedTime
+
+    # literals are parsed with integers only, Fraction is much slower
+
+    def number(self, text: str) -> Fixed:
+        n, d = _decimal_ratio(text)
+        return Fixed(round_div(n * SCALE, d))
+
+    def time(self, hours: str, minutes: str, seconds: str) -> FixedTime:
+        parts = [_decimal_ratio(text) for text in (hours, minutes, seconds)]
+        d = max(d for _, d in parts)
+        (h, hd), (m, md), (s, sd) = parts
+        n = h * (d // hd) * 3600 + m * (d // md) * 60 + s * (d // sd)
+        return FixedTime(round_div(n * TICKS_PER_SECOND, d))
+
+    def number_from_fraction(self, value: Fraction) -> Fixed:
+        return Fixed(round(value * SCALE))
+
+    def time_from_seconds(self, seconds: Fraction) -> FixedTime:
+        return FixedTime(round(seconds * TICKS_PER_SECOND))
+
+    def is_one(self, value: Any) -> bool:
+        return type(value) is Fixed and value.units == SCALE
+
+    def is_integral(self, value: Any) -> bool:
+        return type(value) is Fixed and not value.units % SCALE
+
+
+def _decimal_ratio(text: str) -> tuple[int, int]:
+    """Numerator and power of ten denominator of a decimal literal"""
+    whole, _, fraction = text.partition(".")
+    return int(whole + fraction or "0"), 10 ** len(fraction)
+
+
+def _seconds(value: Any) -> Fraction | None:
+    if type(value) is Time or type(value) is FixedTime:
+        return Fraction(value.ticks, TICKS_PER_SECOND)
+    if isinstance(value, ScalarTime):
+        return Fraction(value.seconds)
+    return None
+
+
+DECIMAL = DecimalBackend()
+BACKENDS: dict[str, Backend] = {
+    backend.name: backend
+    for backend in (DECIMAL, FractionBackend(), FixedBackend(), FloatBackend())
+}
+
+
+def get_backend(backend: str | Backend) -> Backend:
+    if isinstance(backend, Backend):
+        return backend
+    try:
+        return BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"unknown backend: {backend}") from None
@@ -0,0 +1,209 @@
+"""
+Line oriented evaluation shared by the batch, aggregate and parallel modes.
+
+Failing lines never stop a run, their errors are collected as `LineError`
+values which are plain tuples, so they can also be sent back from worker
+processes.
+"""
+import errno
+import sys
+import time
+from decimal import Decimal
+from typing import IO, Iterable, Iterator, NamedTuple
+
+from tcalc import instrumentation
+from tcalc.aggregate import Aggregator
+from tcalc.compiled import compile
+from tcalc.errors import Error, EvaluatorError, ParserError
+from tcalc.expression import Time
+from tcalc.output import HMS, Format, get_format
+from tcalc.sketch import Summary
+
+
+class LineError(NamedTuple):
+    lineno: int
+    column: int
+    kind: str
+    msg: str
+
+    def format(self, name: str, lineno_offset: int = 0) -> str:
+        location = f"{name}:{self.lineno + lineno_offset}"
+        if self.column > 0:
+            location += f":{self.column}"
+        return f"{location}: {self.kind}: {self.msg}\n"
+
+
+def line_error(lineno: int, err: Exception, offset: int = 0) -> LineError:
+    if isinstance(err, Error):
+        column = err.column + offset if err.column > 0 else -1
+        return LineError(lineno, column, type(err).__name__, err.msg)
+    elif isinstance(err, ZeroDivisionError):
+        return LineError(lineno, -1, "ZeroDivisionError", "division by zero")
+    return LineError(lineno, -1, "ArithmeticError", "invalid arithmetic operation")
+
+
+def calculate(
+    expr: str, lexer: str = "regex", backend: str = "decimal"
+) -> Decimal | Time:
+    return compile(expr, lexer=lexer, backend=backend).evaluate()
+
+
+def format_result(result: Decimal | Time, fmt: Format = HMS) -> str:
+    stats = instrumentation.active
+    if stats is None:
+        return fmt.result(result)
+    start = time.perf_counter()
+    text = fmt.result(result)
+    stats.add_time("format", time.perf_counter() - start)
+    return text
+
+
+def write_lines(lines: list[str]) -> None:
+    stats = instrumentation.active
+    if stats is None:
+        sys.stdout.writelines(lines)
+        return
+    start = time.perf_counter()
+    sys.stdout.writelines(lines)
+    stats.add_time("output", time.perf_counter() - start)
+
+
+def evaluate_lines(
+    lines: Iterable[str],
+    lexer: str = "regex",
+    backend: str = "decimal",
+    fmt: str = "hms",
+    shared: bool = False,
+) -> Iterator[tuple[str | None, LineError | None]]:
+    """
+    Yield the record body of every input line in the output format `fmt`
+    together with its error, if any. In the default format blank lines are
+    echoed and failing lines produce an empty line. With `shared` the lines
+    are interned into one `tcalc.dag.DAG`, which evaluates every distinct
+    subexpression once.
+    """
+    formatter = get_format(fmt)
+    blank = formatter.blank()
+    if shared:
+        from tcalc.backends import get_backend
+        from tcalc.dag import DAG
+
+        dag = DAG(get_backend(backend))
+    for lineno, line in enumerate(lines, 1):
+        expr = line.rstrip("\r\n")
+        if not expr.strip():
+            yield blank, None
+            continue
+        try:
+            if shared:
+                result = dag.calculate(expr, lexer)
+            else:
+                result = calculate(expr, lexer, backend)
+        except (Error, ArithmeticError) as err:
+            error = line_error(lineno, err)
+            yield formatter.error(error.kind, error.column, error.msg), error
+        else:
+            yield format_result(result, formatter), None
+
+
+def aggregate_lines(
+    lines: Iterable[str],
+    aggregator: Aggregator,
+    delimiter: str = "\t",
+    lexer: str = "regex",
+) -> Iterator[LineError]:
+    """
+    Add the `key<delimiter>expression` records of `lines` to `aggregator`
+    and yield the errors of records that could not be added.
+    """
+    for lineno, key, value in aggregate_records(lines, delimiter, lexer):
+        if type(value) is LineError:
+            yield value
+            continue
+        try:
+            aggregator.add(key, value)  # type: ignore
+        except EvaluatorError as err:
+            yield line_error(lineno, err)
+
+
+def aggregate_records(
+    lines: Iterable[str], delimiter: str = "\t", lexer: str = "regex"
+) -> Iterator[tuple[int, str, Decimal | Time | LineError]]:
+    """
+    Yield (line number, key, value) of the `key<delimiter>expression`
+    records of `lines`, the value is a `LineError` if it cannot be computed.
+    """
+    for lineno, line in enumerate(lines, 1):
+        record = line.rstrip("\r\n")
+        if not record.strip():
+            continue
+        key, sep, expr = record.partition(delimiter)
+        try:
+            if not sep:
+                raise ParserError("missing delimiter after key", -1)
+            yield lineno, key.strip(), calculate(expr, lexer)
+        except (Error, ArithmeticError) as err:
+            yield lineno, key, line_error(lineno, err, len(key) + len(sep))
+
+
+def summarize_lines(
+    lines: Iterable[str], summary: Summary, lexer: str = "regex"
+) -> Iterator[LineError]:
+    """
+    Add the duration every non-blank line of `lines` evaluates to to
+    `summary` and yield the errors of lines that could not be added.
+    """
+    for lineno, line in enumerate(lines, 1):
+        expr = line.rstrip("\r\n")
+        if not expr.strip():
+            continue
+        try:
+            result = calculate(expr, lexer)
+            if type(result) is not Time:
+                raise EvaluatorError("expected a duration, not a number", -1)
+            summary.add(result)
+        except (Error, ArithmeticError) as err:
+            yield line_error(lineno, err)
+
+
+def evaluate_inputs(
+    files: list[str],
+    stdin: IO[str],
+    lexer: str = "regex",
+    backend: str = "decimal",
+    fmt: str = "hms",
+    shared: bool = False,
+) -> Iterator[tuple[str, Iterator[tuple[str | None, LineError | None]]]]:
+    """
+    Yield (name, results) of `files` like `evaluate_lines`. Files are mapped
+    and scanned in place unless the char lexer, instrumentation or `shared`
+    is used.
+    """
+    if lexer != "regex" or instrumentation.active is not None or shared:
+        for name, stream in open_inputs(files, stdin):
+            yield name, evaluate_lines(stream, lexer, backend, fmt, shared)
+        return
+
+    from tcalc.mapped import evaluate_mapped, map_file
+
+    for name in files or ["-"]:
+        if name == "-":
+            yield "<stdin>", evaluate_lines(stdin, lexer, backend, fmt)
+        else:
+            with map_file(name) as buffer:
+                yield name, evaluate_mapped(buffer, backend=backend, fmt=fmt)
+
+
+def decode_error(name: str, err: UnicodeDecodeError) -> OSError:
+    """The error of an input `name` that is not text, like an unreadable one"""
+    return OSError(errno.EILSEQ, f"not {err.encoding} text: {err.reason}", name)
+
+
+def open_inputs(files: list[str], stdin: IO[str]) -> Iterator[tuple[str, IO[str]]]:
+    """Yield (name, stream) of `files`, `stdin` for "-" """
+    for name in files or ["-"]:
+        if name == "-":
+            yield "<stdin>", stdin
+        else:
+            with open(name) as stream:
+                yield name, stream
@@ -0,0 +1,133 @@
+"""
+Lowering of the AST into a flat instruction sequence for `tcalc.vm`.
+
+Every instruction is an `(opcode, argument)` pair and instructions are
+emitted in post-order, so the operands of an operator are always on top
+of the stack when it runs:
+
+  CONST  index     push constants[index]
+  LOAD   name      push the value bound to name
+  ADD              pop b, pop a, push a + b
+  SUB              pop b, pop a, push a - b
+  MUL              pop b, pop a, push a * b
+  DIV              pop b, pop a, push a / b
+  NEG              pop a, push -a
+
+Literals are converted to values of the numeric backend, `Decimal` and
+`tcalc.expression.Time` by default, once at compile time and stored in
+the constant pool. Unary plus is dropped.
+"""
+from decimal import Decimal
+from typing import Any
+
+from tcalc.ast import (
+    AST,
+    BinaryOperator,
+    Constant,
+    Time,
+    UnaryOperator,
+    Number,
+    Variable,
+    postorder,
+)
+from tcalc.backends import DECIMAL, Backend
+from tcalc.expression import Time as TimeExpr
+from tcalc.token import TokenType
+
+CONST = 0
+LOAD = 1
+ADD = 2
+SUB = 3
+MUL = 4
+DIV = 5
+NEG = 6
+
+OPNAMES = ("CONST", "LOAD", "ADD", "SUB", "MUL", "DIV", "NEG")
+
+BINARY_OPCODES = {
+    TokenType.PLUS: ADD,
+    TokenType.MINUS: SUB,
+    TokenType.MULT: MUL,
+    TokenType.DIV: DIV,
+}
+
+BINARY_SYMBOLS = {ADD: "+", SUB: "-", MUL: "*", DIV: "/"}
+
+
+class Code:
+    __slots__ = ("instructions", "constants", "columns")
+
+    def __init__(
+        self,
+        instructions: list[tuple[int, Any]],
+        constants: list[Decimal | TimeExpr],
+        columns: list[int],
+    ) -> None:
+        self.instructions = instructions
+        self.constants = constants
+        # source column of each instruction, used for error reporting
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.instructions)
+
+
+class Compiler:
+    def __init__(self, backend: Backend = DECIMAL) -> None:
+        self.backend = backend
+        self._instructions: list[tuple[int, Any]] = []
+        self._constants: list[Decimal | TimeExpr] = []
+        self._constant_index: dict[tuple[type, str], int] = {}
+        self._columns: list[int] = []
+
+    def compile(self, ast: AST) -> Code:
+        for node in postorder(ast):
+            if type(node) is BinaryOperator:
+                self._emit(BINARY_OPCODES[node.op.type], None, node.op.column)
+            elif type(node) is UnaryOperator:
+                if node.op.type is TokenType.MINUS:
+                    self._emit(NEG, None, node.op.column)
+            elif type(node) is Number:
+                self._emit_constant(self.backend.number(node.value))
+            elif type(node) is Time:
+                value = self.backend.time(node.hours, node.minutes, node.seconds)
+                self._emit_constant(value)
+            elif type(node) is Constant:
+                self._emit_constant(node.value)
+            elif type(node) is Variable:
+                self._emit(LOAD, node.name, node.column)
+            else:
+                assert False, "unreachable line"
+
+        return Code(self._instructions, self._constants, self._columns)
+
+    def _emit(self, opcode: int, arg: Any, column: int) -> None:
+        self._instructions.append((opcode, arg))
+        self._columns.append(column)
+
+    def _emit_constant(self, value: Decimal | TimeExpr) -> None:
+        # Decimal("1") and Decimal("1.0") or 0.0 and -0.0 compare equal but
+        # print differently, so constants are pooled by their exact repr
+        key = (type(value), repr(value))
+        try:
+            index = self._constant_index[key]
+        except KeyError:
+            index = self._constant_index[key] = len(self._constants)
+            self._constants.append(value)
+        self._emit(CONST, index, -1)
+
+
+def compile_ast(ast: AST, backend: Backend = DECIMAL) -> Code:
+    return Compiler(backend).compile(ast)
+
+
+def disassemble(code: Code) -> str:
+    lines = []
+    for pc, (opcode, arg) in enumerate(code.instructions):
+        line = f"{pc:4d} {OPNAMES[opcode]:<6}"
+        if opcode == CONST:
+            line += f" {arg} ({code.constants[arg]})"
+        elif opcode == LOAD:
+            line += f" {arg}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -1,68 +1,862 @@
+"""
+Command line interface.
+
+Scripts call `tcalc EXPR` many times, so startup matters more than the
+arithmetic. Modules are imported by the functions that need them: a
+single expression skips argparse and neither loads the batch, aggregate
+and parallel machinery nor the optimizer's debugging helpers.
+"""
 import sys
-import argparse
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import argparse
 
-from tcalc.reader import InputReader
-from tcalc.lexer import Lexer
-from tcalc.parser import Parser
-from tcalc.evaluator import Evaluator
-from tcalc.errors import LexerError, ParserError
+    from tcalc.aggregate import Aggregator
+    from tcalc.instrumentation import Stats
+    from tcalc.sketch import Summary
+    from tcalc.worksheet import Worksheet
+
+BATCH_BUFFER_LINES = 4096
+WATCH_INTERVAL = 0.5
+COMMANDS = ("aggregate", "serve", "stats")
 
 
 def get_args():
+    import argparse
+
+    from tcalc.backends import BACKENDS
+    from tcalc.lexer import LEXERS
+    from tcalc.output import FORMATS
+
     parser = argparse.ArgumentParser()
     parser.prog = "tcalc"
     parser.formatter_class = argparse.RawDescriptionHelpFormatter
     parser.description = "Calculate with Time Expressions"
 
     parser.add_argument(
-        "expr", type=str, nargs="?", help="a time expression. Use - to read from stdin"
+        "expr",
+        type=str,
+        nargs="*",
+        help="a time expression. Use - to read from stdin. "
+        "With --batch, files to read expressions from",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="evaluate every line of the given files (or stdin) as an expression",
+    )
+    parser.add_argument(
+        "-f",
+        "--file",
+        help="evaluate a worksheet of `name = expression` lines",
+    )
+    parser.add_argument(
+        "--csv",
+        metavar="FILE",
+        help="evaluate the expression for every row of a CSV or TSV table "
+        "(- for stdin), its columns are the variables",
+    )
+    parser.add_argument(
+        "--delimiter",
+        help="with --csv, separator of the columns (default: tab for .tsv "
+        "files, comma otherwise)",
+    )
+    parser.add_argument(
+        "--column",
+        default="result",
+        help="with --csv, name of the result column (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="with --file, evaluate the lines affected by every change of it",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="with --file, directory of compiled worksheets (default: "
+        "$TCALC_CACHE_DIR or ~/.cache/tcalc)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="with --file, compile the worksheet without the cache",
+    )
+    parser.add_argument(
+        "--lexer",
+        choices=LEXERS,
+        default="regex",
+        help="lexer engine used to scan expressions (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="decimal",
+        help="numbers to compute with: exact decimal, fraction, fixed point "
+        "or fast float (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="hms",
+        help="output format of results: HH:MM:SS, seconds, ISO 8601 durations, "
+        "CSV or JSON Lines records (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="with --batch, number of worker processes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--share",
+        action="store_true",
+        help="with --batch, evaluate subexpressions repeated across lines "
+        "once per input (per chunk with --jobs)",
+    )
+    parser.add_argument(
+        "--dump-ast",
+        action="store_true",
+        help="print the syntax tree before and after optimization to stderr",
+    )
+    parser.add_argument(
+        "--client",
+        action="store_true",
+        help="evaluate on a running `tcalc serve` daemon, in this process "
+        "if there is none",
+    )
+    parser.add_argument(
+        "--socket", help="socket of the daemon (default: $TCALC_SOCKET)"
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="print time spent per stage and counters to stderr",
+    )
+    parser.add_argument(
+        "--stats-format",
+        choices=("table", "json"),
+        default="table",
+        help="format of --stats (default: %(default)s)",
     )
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if not args.batch and len(args.expr) > 1:
+        parser.error("expected a single expression, quote it to include spaces")
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.watch and not args.file:
+        parser.error("--watch requires --file")
+    if args.share and not args.batch:
+        parser.error("--share requires --batch")
+    if args.csv is not None:
+        if len(args.expr) != 1:
+            parser.error("--csv requires an expression")
+        if args.format in ("csv", "jsonl"):
+            parser.error("--csv writes a table, use --format hms, seconds or iso")
+    return args
 
 
 # Main
 
 
-def evaluate(expr: str) -> int:
+def dump_ast(expr: str, lexer: str = "regex", backend: str = "decimal") -> None:
+    from tcalc.backends import get_backend
+    from tcalc.ast import format_tree
+    from tcalc.compiled import parse
+    from tcalc.optimizer import optimize
+
+    ast = parse(expr, lexer)
+    sys.stderr.write("AST:\n" + format_tree(ast) + "\n")
+    optimized = optimize(ast, get_backend(backend))
+    sys.stderr.write("Optimized AST:\n" + format_tree(optimized) + "\n")
+
+
+def evaluate_once(expr: str, lexer: str = "regex", backend: str = "decimal"):
+    """
+    Evaluate `expr` while parsing it, for an expression evaluated only once
+    neither building an AST nor optimizing and compiling it pays off.
+    """
+    from tcalc.direct import DirectEvaluator
+    from tcalc.lexer import create_lexer
+
+    tokens = create_lexer(expr, lexer)
+    if backend == "decimal":
+        return DirectEvaluator(tokens).eval()
+
+    from tcalc.backends import get_backend
+
+    return DirectEvaluator(tokens, backend=get_backend(backend)).eval()
+
+
+def evaluate(
+    expr: str,
+    lexer: str = "regex",
+    dump: bool = False,
+    once: bool = False,
+    backend: str = "decimal",
+    fmt: str = "hms",
+) -> int:
+    from tcalc.errors import EvaluatorError, LexerError, ParserError
+
     try:
-        input_reader = InputReader(expr)
-        lexer = Lexer(input_reader)
-        parser = Parser(lexer)
-        evaluator = Evaluator(parser)
-        result = evaluator.eval()
-    except ParserError as err:
-        sys.stderr.write(expr + "\n")
-        sys.stderr.write(" " * (err.column - 1) + "^\n")
-        sys.stderr.write(err.msg + "\n")
-        return 1
-    except LexerError as err:
-        sys.stderr.write(err.msg + "\n")
-        return 3
+        if dump:
+            dump_ast(expr, lexer, backend)
+        if once:
+            result = evaluate_once(expr, lexer, backend)
+        else:
+            from tcalc.batch import calculate
+
+            result = calculate(expr, lexer, backend)
+    except (ParserError, EvaluatorError, LexerError) as err:
+        return report_error(expr, type(err).__name__, err.column, err.msg)
     except ZeroDivisionError:
+        return report_error(expr, "ZeroDivisionError", -1, "division by zero")
+
+    if once:
+        sys.stdout.write(f"{result}\n")
+    else:
+        from tcalc.batch import format_result
+        from tcalc.output import Writer, get_format
+
+        with Writer(fmt) as writer:
+            writer.write(format_result(result, get_format(fmt)))
+
+    return 0
+
+
+def report_error(expr: str, kind: str, column: int, msg: str) -> int:
+    """Write an error of a single expression and return the exit status"""
+    if kind == "LexerError":
+        sys.stderr.write(msg + "\n")
+        return 3
+    if kind == "ZeroDivisionError":
         sys.stderr.write("Divison by Zero!\n")
         return 2
+    if kind in ("ParserError", "EvaluatorError"):
+        sys.stderr.write(expr + "\n")
+        sys.stderr.write(" " * (column - 1) + "^\n")
+        sys.stderr.write(msg + "\n")
+    else:
+        sys.stderr.write(f"{kind}: {msg}\n")
+    return 1
 
-    sys.stdout.write("{}\n".format(result))
 
-    return 0
+def report_input_error(err: OSError) -> int:
+    """Write why an input file cannot be read and return the exit status"""
+    if err.filename is None:
+        raise err  # not an input, e.g. stdout was closed
+    sys.stderr.write(f"tcalc: {err.filename}: {err.strerror}\n")
+    return 1
 
 
-def main():
-    args = get_args()
-    expr = args.expr if args.expr != "-" else sys.stdin.read()
-    if not expr:
+def evaluate_client(expr: str, path: str | None = None) -> int:
+    """
+    Forward `expr` to a running `tcalc serve` daemon, or evaluate it in
+    this process if no daemon is listening.
+    """
+    from tcalc.client import request
+
+    response = request(expr, path) if "\n" not in expr else None
+    if response is None:
+        return evaluate(expr, once=True)
+
+    status, _, rest = response.partition("\t")
+    if status == "ok":
+        sys.stdout.write(rest + "\n")
+        return 0
+    kind, column, msg = rest.split("\t", 2)
+    return report_error(expr, kind, int(column), msg)
+
+
+def evaluate_batch(
+    files: list[str],
+    lexer: str = "regex",
+    jobs: int = 1,
+    backend: str = "decimal",
+    fmt: str = "hms",
+    shared: bool = False,
+) -> int:
+    """
+    Evaluate every line of `files` (stdin for "-") as a separate expression.
+
+    Exactly one line is written per input line so that results can be
+    matched with their input. Blank lines are echoed, lines that fail are
+    reported on stderr with their position and left empty on stdout. The
+    csv and jsonl formats write numbered records instead, see tcalc.output.
+    """
+    from tcalc.batch import decode_error, evaluate_inputs
+    from tcalc.output import Writer
+
+    if jobs > 1:
+        from tcalc.parallel import evaluate_parallel
+
+        try:
+            return evaluate_parallel(
+                files, jobs, lexer, backend=backend, fmt=fmt, shared=shared
+            )
+        except OSError as err:
+            return report_input_error(err)
+
+    failed = 0
+    inputs = evaluate_inputs(files, sys.stdin, lexer, backend, fmt, shared)
+    try:
+        with Writer(fmt, buffer_lines=BATCH_BUFFER_LINES) as writer:
+            for name, results in inputs:
+                writer.start()
+                for line, error in results:
+                    writer.write(line)
+                    if error is not None:
+                        failed += 1
+                        sys.stderr.write(error.format(name))
+    except OSError as err:
+        return report_input_error(err)
+    except UnicodeDecodeError as err:
+        return report_input_error(decode_error(name, err))
+
+    return 1 if failed else 0
+
+
+# Worksheets
+
+
+def write_cells(sheet: "Worksheet", keys: list[str], name: str) -> int:
+    """Write the results of the cells `keys`, return the number of errors"""
+    from tcalc.batch import format_result, line_error
+
+    failed = 0
+    out = []
+    for key in keys:
+        cell = sheet.cells[key]
+        definition = cell.definition
+        prefix = f"{definition.name} = " if definition.name is not None else ""
+        if cell.error is None:
+            out.append(prefix + format_result(cell.value))  # type: ignore
+            continue
+        failed += 1
+        out.append(prefix.rstrip() + "\n")
+        error = line_error(definition.lineno, cell.error, definition.offset)
+        sys.stderr.write(error.format(name))
+    sys.stdout.writelines(out)
+    sys.stdout.flush()
+    return failed
+
+
+def evaluate_sheet(
+    path: str,
+    lexer: str = "regex",
+    backend: str = "decimal",
+    watch: bool = False,
+    cache_dir: str | None = None,
+) -> int:
+    """
+    Evaluate the worksheet `path` and write every line with its value.
+
+    With `cache_dir`, the compiled lines are loaded from and saved to the
+    `tcalc.diskcache.DiskCache` in it. With `watch`, keep polling the file
+    and write the lines evaluated again after each change, until
+    interrupted.
+    """
+    import io
+    import os
+    import time
+
+    from tcalc.batch import decode_error
+    from tcalc.worksheet import Worksheet
+
+    try:
+        with open(path, "rb") as fp:
+            data = fp.read()
+        text = data.decode()
+    except OSError as err:
+        return report_input_error(err)
+    except UnicodeDecodeError as err:
+        return report_input_error(decode_error(path, err))
+    compiled = None
+    if cache_dir is not None:
+        from tcalc.backends import get_backend
+        from tcalc.diskcache import DiskCache
+
+        cache = DiskCache(cache_dir)
+        numeric = get_backend(backend)
+        compiled = cache.load(data, lexer, numeric)
+    sheet = Worksheet(lexer, backend, compiled)
+    failed = write_cells(sheet, sheet.load(io.StringIO(text)), path)
+    if cache_dir is not None and compiled is None:
+        cache.save(data, lexer, numeric, sheet.compiled_cells())
+    if not watch:
+        return 1 if failed else 0
+
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    try:
         while True:
-            sys.stdout.write("tcalc> ")
-            sys.stdout.flush()
-            expr = sys.stdin.readline().strip()
-            if expr.lower() in ("exit", "quit", "halt"):
-                return 0
-            rc = evaluate(expr)
-            if rc != 0:
-                return rc
+            time.sleep(WATCH_INTERVAL)
+            try:
+                stat = os.stat(path)
+                if (stat.st_mtime_ns, stat.st_size) == version:
+                    continue
+                with open(path, "rb") as fp:
+                    data = fp.read()
+            except OSError:
+                continue  # replaced by an editor, try again
+            version = (stat.st_mtime_ns, stat.st_size)
+            try:
+                text = data.decode()
+            except UnicodeDecodeError as err:
+                report_input_error(decode_error(path, err))
+                continue
+            write_cells(sheet, sheet.load(io.StringIO(text)), path)
+    except KeyboardInterrupt:
+        return 0
+
+
+def repl(lexer: str = "regex", dump: bool = False, backend: str = "decimal") -> int:
+    """
+    Read expressions and `name = expression` definitions from stdin. Names
+    keep their values between lines, redefining one evaluates the
+    definitions depending on it again. Errors are reported and skipped.
+    """
+    from tcalc.errors import Error
+    from tcalc.worksheet import Worksheet, parse_line
+
+    sheet = Worksheet(lexer, backend)
+    while True:
+        sys.stdout.write("tcalc> ")
+        sys.stdout.flush()
+        line = sys.stdin.readline()
+        if not line:
+            return 0
+        expr = line.strip()
+        if expr.lower() in ("exit", "quit", "halt"):
+            return 0
+        definition = parse_line(expr)
+        if definition is None:
+            continue
+        if dump:
+            try:
+                dump_ast(definition.source, lexer, backend)
+            except Error:
+                pass  # reported below
+        if definition.name is not None:
+            evaluated = sheet.define(definition)
+            error = sheet.cells[definition.key].error
+            if error is not None:
+                report_cell_error(expr, error, definition.offset)
+                evaluated.remove(definition.key)
+            write_cells(sheet, evaluated, "<stdin>")
+            continue
+        try:
+            result = sheet.evaluate(expr)
+        except (Error, ArithmeticError) as err:
+            report_cell_error(expr, err)
+        else:
+            sys.stdout.write(f"{result}\n")
+
+
+def report_cell_error(expr: str, err: Exception, offset: int = 0) -> None:
+    from tcalc.errors import Error
+
+    if isinstance(err, Error):
+        column = err.column + offset if err.column > 0 else err.column
+        report_error(expr, type(err).__name__, column, err.msg)
+    elif isinstance(err, ZeroDivisionError):
+        report_error(expr, "ZeroDivisionError", -1, "division by zero")
     else:
-        return evaluate(expr)
+        report_error(expr, "ArithmeticError", -1, "invalid arithmetic operation")
+
+
+# Tables
+
+
+def evaluate_csv(
+    path: str,
+    expr: str,
+    delimiter: str | None = None,
+    column: str = "result",
+    lexer: str = "regex",
+    backend: str = "decimal",
+    fmt: str = "hms",
+) -> int:
+    """
+    Evaluate `expr` for every row of the table `path` with the columns
+    bound as variables and write the table with a result column appended.
+    """
+    from contextlib import ExitStack
+
+    from tcalc.batch import decode_error
+    from tcalc.compiled import compile
+    from tcalc.errors import EvaluatorError, LexerError, ParserError
+    from tcalc.output import get_format
+    from tcalc.table import delimiter_for, evaluate_table
+
+    try:
+        compiled = compile(expr, lexer=lexer, backend=backend)
+    except (ParserError, LexerError) as err:
+        return report_error(expr, type(err).__name__, err.column, err.msg)
+
+    if delimiter is None:
+        delimiter = delimiter_for(path)
+    name = "<stdin>" if path == "-" else path
+    failed = 0
+    with ExitStack() as stack:
+        if path == "-":
+            fp = sys.stdin
+        else:
+            try:
+                fp = stack.enter_context(open(path, newline=""))
+            except OSError as err:
+                return report_input_error(err)
+        rows = evaluate_table(
+            fp, sys.stdout, compiled, delimiter, column, get_format(fmt)
+        )
+        try:
+            for error in rows:
+                failed += 1
+                sys.stderr.write(error.format(name))
+        except EvaluatorError as err:
+            return report_error(expr, type(err).__name__, err.column, err.msg)
+        except UnicodeDecodeError as err:
+            return report_input_error(decode_error(name, err))
+    sys.stdout.flush()
+    return 1 if failed else 0
+
+
+# Aggregate
+
+
+def get_aggregate_args(argv: list[str]) -> "argparse.Namespace":
+    import argparse
+
+    from tcalc.lexer import LEXERS
+
+    parser = argparse.ArgumentParser()
+    parser.prog = "tcalc aggregate"
+    parser.description = (
+        "Sum up expressions per key. Every input line holds a key and an "
+        "expression separated by the delimiter. Prints count, sum, minimum, "
+        "maximum and mean of every key."
+    )
+    parser.add_argument(
+        "files", nargs="*", help="files to read records from, - for stdin"
+    )
+    parser.add_argument(
+        "-d",
+        "--delimiter",
+        default="\t",
+        help="separator between key and expression (default: tab)",
+    )
+    parser.add_argument("--lexer", choices=LEXERS, default="regex")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes (default: %(default)s)",
+    )
+
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    return args
+
+
+def aggregate(
+    files: list[str], delimiter: str = "\t", lexer: str = "regex", jobs: int = 1
+) -> int:
+    from tcalc.aggregate import Aggregator
+    from tcalc.batch import aggregate_lines, decode_error, open_inputs
+
+    try:
+        if jobs > 1:
+            from tcalc.parallel import aggregate_parallel
+
+            aggregator, failed = aggregate_parallel(files, jobs, delimiter, lexer)
+        else:
+            aggregator, failed = Aggregator(), 0
+            for name, stream in open_inputs(files, sys.stdin):
+                for error in aggregate_lines(stream, aggregator, delimiter, lexer):
+                    failed += 1
+                    sys.stderr.write(error.format(name))
+    except OSError as err:
+        return report_input_error(err)
+    except UnicodeDecodeError as err:
+        return report_input_error(decode_error(name, err))
+
+    write_aggregates(aggregator)
+    return 1 if failed else 0
+
+
+def write_aggregates(aggregator: "Aggregator") -> None:
+    out = ["key\tcount\tsum\tmin\tmax\tmean\n"]
+    for key, agg in aggregator:
+        out.append(
+            f"{key}\t{agg.count}\t{agg.total}\t{agg.minimum}\t{agg.maximum}"
+            f"\t{agg.mean}\n"
+        )
+    sys.stdout.writelines(out)
+    sys.stdout.flush()
+
+
+# Stats
+
+
+def get_stats_args(argv: list[str]) -> "argparse.Namespace":
+    import argparse
+
+    from tcalc.lexer import LEXERS
+    from tcalc.sketch import DEFAULT_ALPHA
+
+    parser = argparse.ArgumentParser()
+    parser.prog = "tcalc stats"
+    parser.description = (
+        "Summarize durations. Every input line is an expression evaluating "
+        "to a duration. Prints count, sum, minimum, maximum, mean, quantiles "
+        "and a histogram, in constant memory."
+    )
+    parser.add_argument(
+        "files", nargs="*", help="files to read expressions from, - for stdin"
+    )
+    parser.add_argument(
+        "-q",
+        "--quantiles",
+        default="50,90,99",
+        help="comma separated percentiles to print (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--buckets",
+        help="comma separated upper bounds of the histogram buckets as time "
+        "expressions, e.g. :1:,:5:,1:: (default: 1s to 24h)",
+    )
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=DEFAULT_ALPHA,
+        help="relative error of quantiles (default: %(default)s)",
+    )
+    parser.add_argument("--lexer", choices=LEXERS, default="regex")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("table", "json"),
+        default="table",
+        help="output format (default: %(default)s)",
+    )
+
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if not 0 < args.alpha < 1:
+        parser.error("--alpha must be between 0 and 1")
+    try:
+        args.quantiles = [float(q) / 100 for q in args.quantiles.split(",")]
+    except ValueError:
+        parser.error("--quantiles must be numbers")
+    if not all(0 <= q <= 1 for q in args.quantiles):
+        parser.error("--quantiles must be between 0 and 100")
+    if args.buckets is not None:
+        args.buckets = parse_buckets(args.buckets, parser)
+    return args
+
+
+def parse_buckets(text: str, parser: "argparse.ArgumentParser") -> list[int]:
+    from tcalc.batch import calculate
+    from tcalc.errors import Error
+    from tcalc.expression import Time
+
+    bounds = []
+    for expr in text.split(","):
+        try:
+            bound = calculate(expr)
+        except (Error, ArithmeticError):
+            parser.error(f"invalid bucket: {expr}")
+        if type(bound) is not Time:
+            parser.error(f"bucket is not a duration: {expr}")
+        bounds.append(bound.ticks)
+    return bounds
+
+
+def summarize(
+    files: list[str],
+    quantiles: list[float],
+    buckets: list[int] | None = None,
+    alpha: float = 0.01,
+    lexer: str = "regex",
+    jobs: int = 1,
+    fmt: str = "table",
+) -> int:
+    from tcalc.batch import decode_error, open_inputs, summarize_lines
+    from tcalc.sketch import Summary
+
+    summary = Summary(buckets, alpha)
+    try:
+        if jobs > 1:
+            from tcalc.parallel import summarize_parallel
+
+            failed = summarize_parallel(files, jobs, summary, lexer)
+        else:
+            failed = 0
+            for name, stream in open_inputs(files, sys.stdin):
+                for error in summarize_lines(stream, summary, lexer):
+                    failed += 1
+                    sys.stderr.write(error.format(name))
+    except OSError as err:
+        return report_input_error(err)
+    except UnicodeDecodeError as err:
+        return report_input_error(decode_error(name, err))
+
+    write_summary(summary, quantiles, fmt)
+    return 1 if failed else 0
+
+
+def write_summary(
+    summary: "Summary", quantiles: list[float], fmt: str = "table"
+) -> None:
+    from tcalc.sketch import quantile_name
+
+    data = summary.as_dict(quantiles)
+    if fmt == "json":
+        import json
+
+        sys.stdout.write(json.dumps(data, indent=2) + "\n")
+        sys.stdout.flush()
+        return
+
+    out = []
+    for name in ("count", "sum", "min", "max", "mean"):
+        out.append(f"{name}\t{data[name] if data[name] is not None else ''}\n")
+    for q in quantiles:
+        value = data["quantiles"][quantile_name(q)]
+        out.append(f"{quantile_name(q)}\t{value if value is not None else ''}\n")
+    out.append("\nle\tcount\n")
+    for bucket in data["histogram"]:
+        le = bucket["le"] if bucket["le"] is not None else "inf"
+        out.append(f"{le}\t{bucket['count']}\n")
+    sys.stdout.writelines(out)
+    sys.stdout.flush()
+
+
+# Serve
+
+
+def get_serve_args(argv: list[str]) -> "argparse.Namespace":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.prog = "tcalc serve"
+    parser.description = (
+        "Evaluate expressions sent to a Unix domain socket, one per line. "
+        "Use `tcalc --client EXPR` to send one."
+    )
+    parser.add_argument(
+        "--socket",
+        help="path of the socket (default: $TCALC_SOCKET, "
+        "$XDG_RUNTIME_DIR/tcalc.sock or /tmp/tcalc-$UID/tcalc.sock)",
+    )
+    return parser.parse_args(argv)
+
+
+# Entry point
+
+
+def write_stats(stats: "Stats", fmt: str = "table") -> None:
+    sys.stdout.flush()
+    if fmt == "json":
+        sys.stderr.write(stats.to_json() + "\n")
+    else:
+        sys.stderr.write(stats.format_table() + "\n")
+
+
+def run(args: "argparse.Namespace") -> int:
+    if args.batch:
+        return evaluate_batch(
+            args.expr, args.lexer, args.jobs, args.backend, args.format, args.share
+        )
+    if args.file:
+        cache_dir = None
+        if not args.no_cache:
+            from tcalc.diskcache import default_directory
+
+            cache_dir = args.cache_dir or default_directory()
+        return evaluate_sheet(
+            args.file, args.lexer, args.backend, args.watch, cache_dir
+        )
+    if args.csv is not None:
+        return evaluate_csv(
+            args.csv,
+            args.expr[0],
+            args.delimiter,
+            args.column,
+            args.lexer,
+            args.backend,
+            args.format,
+        )
+    expr = args.expr[0] if args.expr else None
+    expr = expr if expr != "-" else sys.stdin.read()
+    if (
+        expr
+        and args.client
+        and args.lexer == "regex"
+        and args.backend == "decimal"
+        and args.format == "hms"
+        and not args.dump_ast
+    ):
+        return evaluate_client(expr, args.socket)
+    if not expr:
+        return repl(args.lexer, args.dump_ast, args.backend)
+    return evaluate(
+        expr, args.lexer, args.dump_ast, backend=args.backend, fmt=args.format
+    )
+
+
+def main():
+    argv = sys.argv[1:]
+    # fast paths for `tcalc EXPR` and `tcalc --client EXPR`, argparse would
+    # accept them unchanged
+    if len(argv) == 1 and argv[0][:1] not in ("", "-") and argv[0] not in COMMANDS:
+        return evaluate(argv[0], once=True)
+    if len(argv) == 2 and argv[0] == "--client" and argv[1][:1] not in ("", "-"):
+        return evaluate_client(argv[1])
+
+    if argv[:1] == ["aggregate"]:
+        args = get_aggregate_args(argv[1:])
+        return aggregate(args.files, args.delimiter, args.lexer, args.jobs)
+    if argv[:1] == ["stats"]:
+        args = get_stats_args(argv[1:])
+        return summarize(
+            args.files,
+            args.quantiles,
+            args.buckets,
+            args.alpha,
+            args.lexer,
+            args.jobs,
+            args.format,
+        )
+    if argv[:1] == ["serve"]:
+        from tcalc import server
+
+        args = get_serve_args(argv[1:])
+        return server.main(args.socket)
+
+    args = get_args()
+    if not args.stats:
+        return run(args)
+
+    from tcalc import instrumentation
+
+    stats = instrumentation.enable()
+    try:
+        return run(args)
+    finally:
+        instrumentation.disable()
+        write_stats(stats, args.stats_format)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+"""
+Thin client of the `tcalc serve` daemon.
+
+Only `os`, `socket` and `stat` are imported, so forwarding an expression costs
+little more than starting the interpreter. The protocol is line based:
+every request is an expression terminated by a newline, every response
+one of
+
+    ok<TAB>result
+    error<TAB>kind<TAB>column<TAB>message
+
+where kind is the name of the error, e.g. ParserError, and column is -1
+if the error has no position.
+"""
+import os
+import socket
+import stat
+
+TIMEOUT = 30.0
+
+
+def default_socket_path() -> str:
+    path = os.environ.get("TCALC_SOCKET")
+    if path:
+        return path
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "tcalc.sock")
+    # not /tmp itself, anyone could listen on a socket there
+    return os.path.join(private_dir(f"/tmp/tcalc-{os.getuid()}"), "tcalc.sock")
+
+
+def private_dir(path: str) -> str:
+    """
+    Create the directory `path` accessible to the user only, unless it
+    exists. Raise PermissionError if it is not a directory of the user or
+    others may access it.
+    """
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(f"{path} is not a private directory")
+    return path
+
+
+def request(expr: str, path: str | None = None, timeout: float = TIMEOUT) -> str | None:
+    """
+    Send `expr` to the daemon and return its response line without the
+    newline, or None if no daemon answered on `path`: nothing listening,
+    a socket we may not use, a timeout or a broken connection. Callers
+    then evaluate `expr` themselves.
+    """
+    if "\n" in expr:
+        raise ValueError("expression must not contain a newline")
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    data = b""
+    try:
+        sock.connect(path or default_socket_path())
+        sock.sendall(expr.encode() + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        while not data.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+    if not data.endswith(b"\n"):
+        return None  # not a tcalc daemon, or it went away
+    try:
+        return data[:-1].decode()
+    except UnicodeDecodeError:
+        return None
@@ -0,0 +1,148 @@
+import time
+from decimal import Decimal
+
+from tcalc import instrumentation
+from tcalc.ast import AST, iter_nodes, variables
+from tcalc.backends import DECIMAL, Backend, get_backend
+from tcalc.bytecode import Code, compile_ast
+from tcalc.cache import CacheInfo, LRUCache
+from tcalc.evaluator import Evaluator
+from tcalc.instrumentation import Stats, TimedLexer
+from tcalc.expression import Time
+from tcalc.lexer import create_lexer
+from tcalc.optimizer import optimize as optimize_ast
+from tcalc.parser import Parser
+from tcalc.vm import execute
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+class CompiledExpression:
+    """
+    A parsed expression that can be evaluated any number of times
+    without lexing and parsing its source again.
+
+    `evaluate` runs the bytecode of the expression on `tcalc.vm`, `walk`
+    evaluates the AST with the tree walking `Evaluator` and serves as a
+    reference. Both compute with the numeric backend the expression was
+    compiled for, bound variables are converted to it.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        ast: AST,
+        backend: Backend = DECIMAL,
+        code: Code | None = None,
+    ) -> None:
+        self.source = source
+        self.ast = ast
+        self.backend = backend
+        # `code` of `ast` compiled before, e.g. loaded from `tcalc.diskcache`
+        self.code: Code = code if code is not None else compile_ast(ast, backend)
+        self.variables = frozenset(variables(ast))
+
+    def parse(self) -> AST:
+        return self.ast
+
+    def evaluate(self, /, **variables: Decimal | Time) -> Decimal | Time:
+        if variables:
+            coerce = self.backend.coerce
+            variables = {name: coerce(value) for name, value in variables.items()}
+        stats = instrumentation.active
+        if stats is None:
+            return execute(self.code, variables)
+
+        start = time.perf_counter()
+        try:
+            return execute(self.code, variables)
+        except Exception as err:
+            stats.add_error(err)
+            raise
+        finally:
+            stats.evaluations += 1
+            stats.add_time("evaluate", time.perf_counter() - start)
+
+    def walk(self, /, **variables: Decimal | Time) -> Decimal | Time:
+        coerce = self.backend.coerce
+        variables = {name: coerce(value) for name, value in variables.items()}
+        return Evaluator(self, variables, self.backend).eval()
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.source!r})"
+
+
+_cache: LRUCache[tuple[str, str, bool, str], CompiledExpression] = LRUCache(
+    DEFAULT_CACHE_SIZE
+)
+
+
+def parse(expr: str, lexer: str = "regex") -> AST:
+    return Parser(create_lexer(expr, lexer)).parse()
+
+
+def compile(
+    expr: str,
+    cache: bool = True,
+    lexer: str = "regex",
+    optimize: bool = True,
+    backend: str | Backend = "decimal",
+) -> CompiledExpression:
+    numeric = get_backend(backend)
+    key = (expr, lexer, optimize, numeric.name)
+    if cache:
+        compiled = _cache.get(key)
+        if compiled is not None:
+            return compiled
+
+    stats = instrumentation.active
+    if stats is None:
+        ast = parse(expr, lexer)
+        if optimize:
+            ast = optimize_ast(ast, numeric)
+        compiled = CompiledExpression(expr, ast, numeric)
+    else:
+        compiled = _compile_with_stats(expr, lexer, optimize, numeric, stats)
+
+    if cache:
+        _cache.put(key, compiled)
+    return compiled
+
+
+def _compile_with_stats(
+    expr: str, lexer: str, optimize: bool, backend: Backend, stats: Stats
+) -> CompiledExpression:
+    stats.compilations += 1
+    try:
+        timed = TimedLexer(create_lexer(expr, lexer), stats)
+        start = time.perf_counter()
+        try:
+            ast = Parser(timed).parse()
+        finally:
+            stats.add_time("parse", time.perf_counter() - start - timed.elapsed)
+        stats.nodes += sum(1 for _ in iter_nodes(ast))
+
+        if optimize:
+            start = time.perf_counter()
+            ast = optimize_ast(ast, backend)
+            stats.add_time("optimize", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        compiled = CompiledExpression(expr, ast, backend)
+        stats.add_time("compile", time.perf_counter() - start)
+    except Exception as err:
+        stats.add_error(err)
+        raise
+    return compiled
+
+
+def cache_info() -> CacheInfo:
+    return _cache.info()
+
+
+def cache_clear() -> None:
+    _cache.clear()
+
+
+def set_cache_size(maxsize: int) -> None:
+    _cache.resize(maxsize)
@@ -0,0 +1,195 @@
+"""
+Hash-consed expressions: equal subexpressions of a batch share one node.
+
+A `DAG` interns the syntax trees of many expressions, typically the lines
+of one batch input. A node is keyed by its operator and the ids of its
+children, so structurally equal subtrees get the same id wherever they
+occur and the trees of all lines form a single DAG:
+
+    (8:: - 0:30:) * 5
+    (8:: - 0:30:) * 4      `8:: - 0:30:` is one node of both lines
+
+Children are interned before their parent, so the value of a node is
+computed right when it is created, from the memoized values of its
+children, and every distinct subexpression is evaluated once. A line seen
+before is not even parsed again, its nodes count as interned. Failures
+are memoized as well; as their column belongs to the line the node was
+first seen in, `calculate` reports them by evaluating the failing line
+on its own.
+
+Trees are interned as parsed: with every distinct node evaluated once,
+the folding of `tcalc.optimizer` would gain nothing. `interned` counts
+the nodes of all trees, `distinct` the nodes that were created and
+evaluated; `ratio` is the deduplication achieved and is also recorded in
+`tcalc.instrumentation`. The DAG grows with the number of distinct
+nodes, use one per input.
+"""
+import operator
+import time
+from decimal import Decimal
+from typing import Any, Callable, Mapping
+
+from tcalc import instrumentation
+from tcalc.ast import (
+    AST,
+    BinaryOperator,
+    Constant,
+    Number,
+    Time,
+    UnaryOperator,
+    Variable,
+    postorder,
+)
+from tcalc.backends import DECIMAL, Backend
+from tcalc.compiled import compile, parse
+from tcalc.errors import Error, EvaluatorError
+from tcalc.expression import Time as TimeExpr
+from tcalc.token import Token, TokenType
+
+Value = Decimal | TimeExpr
+
+OPERATORS: dict[TokenType, Callable[[Any, Any], Any]] = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MULT: operator.mul,
+    TokenType.DIV: operator.truediv,
+}
+
+
+class DAG:
+    def __init__(
+        self,
+        backend: Backend = DECIMAL,
+        variables: Mapping[str, Value] | None = None,
+    ) -> None:
+        self.backend = backend
+        self.variables = variables if variables is not None else {}
+        self.ids: dict[tuple, int] = {}
+        # memoized value of every node, or the error evaluating it raised
+        self.values: list[Value | Exception] = []
+        # source -> id of its root and number of nodes, lines seen before
+        # are not parsed again
+        self.roots: dict[str, tuple[int, int]] = {}
+        self.interned = 0
+
+    @property
+    def distinct(self) -> int:
+        return len(self.values)
+
+    @property
+    def ratio(self) -> float:
+        """Nodes interned per distinct node"""
+        return self.interned / self.distinct if self.distinct else 1.0
+
+    def intern(self, ast: AST) -> int:
+        """Id of the node of `ast`, adding the nodes not seen yet"""
+        stats = instrumentation.active
+        interned, distinct = self.interned, len(self.values)
+        ids: list[int] = []
+        for node in postorder(ast):
+            if type(node) is BinaryOperator:
+                right = ids.pop()
+                key: tuple = (node.op.type, ids[-1], right)
+                ids[-1] = self._node(key, node.op)
+            elif type(node) is UnaryOperator:
+                key = (node.op.type, ids[-1])
+                ids[-1] = self._node(key, node.op)
+            else:
+                ids.append(self._leaf(node))
+        if stats is not None:
+            stats.interned += self.interned - interned
+            stats.distinct += len(self.values) - distinct
+        return ids.pop()
+
+    def value(self, node: int) -> Value:
+        """Memoized value of `node`, raises its memoized error"""
+        value = self.values[node]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    def calculate(self, expr: str, lexer: str = "regex") -> Value:
+        """Value of the expression `expr`, raises its error like `compile`"""
+        stats = instrumentation.active
+        seen = self.roots.get(expr)
+        if seen is not None:
+            root, size = seen
+            self.interned += size
+            if stats is not None:
+                stats.interned += size
+        else:
+            start = time.perf_counter() if stats is not None else 0.0
+            interned = self.interned
+            root = self.intern(parse(expr, lexer))
+            self.roots[expr] = (root, self.interned - interned)
+            if stats is not None:
+                stats.evaluations += 1
+                stats.add_time("evaluate", time.perf_counter() - start)
+        value = self.values[root]
+        if isinstance(value, Exception):
+            # raised again at the position of this line
+            return compile(expr, lexer=lexer, backend=self.backend).evaluate(
+                **self.variables
+            )
+        return value
+
+    def _leaf(self, node: AST) -> int:
+        if type(node) is Number:
+            key: tuple = (Number, node.value)
+        elif type(node) is Time:
+            key = (Time, node.hours, node.minutes, node.seconds)
+        elif type(node) is Variable:
+            key = (Variable, node.name)
+        elif type(node) is Constant:
+            # equal values may print differently, e.g. 1 and 1.0
+            key = (Constant, type(node.value), repr(node.value))
+        else:
+            assert False, "unreachable line"
+        self.interned += 1
+        index = self.ids.get(key)
+        if index is not None:
+            return index
+        try:
+            value: Value | Exception = self._literal(node)
+        except (Error, ArithmeticError) as err:
+            value = err
+        return self._add(key, value)
+
+    def _node(self, key: tuple, op: Token) -> int:
+        self.interned += 1
+        index = self.ids.get(key)
+        if index is not None:
+            return index
+        operands = [self.values[child] for child in key[1:]]
+        for operand in operands:
+            if isinstance(operand, Exception):
+                return self._add(key, operand)
+        try:
+            if len(operands) == 1:
+                value = -operands[0] if key[0] is TokenType.MINUS else operands[0]
+            else:
+                value = OPERATORS[key[0]](*operands)
+        except TypeError:
+            msg = f"unsupported operands for {op.value}"
+            value = EvaluatorError(msg, op.column)
+        except ArithmeticError as err:
+            value = err
+        return self._add(key, value)
+
+    def _literal(self, node: AST) -> Value:
+        if type(node) is Number:
+            return self.backend.number(node.value)
+        elif type(node) is Time:
+            return self.backend.time(node.hours, node.minutes, node.seconds)
+        elif type(node) is Constant:
+            return node.value
+        try:
+            return self.backend.coerce(self.variables[node.name])  # type: ignore
+        except KeyError:
+            msg = f"undefined variable {node.name}"  # type: ignore
+            raise EvaluatorError(msg, node.column) from None  # type: ignore
+
+    def _add(self, key: tuple, value: Value | Exception) -> int:
+        index = self.ids[key] = len(self.values)
+        self.values.append(value)
+        return index
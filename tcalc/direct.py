@@ -0,0 +1,115 @@
+"""
+Evaluation straight from the token stream, without building an AST.
+
+`DirectEvaluator` is `tcalc.parser.Parser` computing values instead of
+creating nodes: its operator precedence loop keeps a stack of values and
+a stack of pending operators, and reducing an operator applies it to the
+values on top. For an expression evaluated once, e.g. by `tcalc EXPR`,
+this saves allocating a tree only to walk it once. Literals of single
+character tokens, as the char lexer produces, are still read into a leaf
+by the parser before they are converted.
+
+Reductions happen in the order `Evaluator` visits the nodes of the tree,
+so both compute the same values. Evaluation errors are only raised once
+the whole expression has been parsed: like the reference, an expression
+with a syntax error reports it, whatever it computes before. The parser
+and `tcalc.evaluator.Evaluator` stay the reference, tests/test_direct.py
+checks that both agree on a corpus of valid and malformed expressions.
+"""
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, Mapping
+
+from tcalc.ast import Number, Time
+from tcalc.errors import EvaluatorError
+from tcalc.expression import Time as TimeExpr
+from tcalc.parser import Lexer, Parser
+from tcalc.token import Token, TokenType
+
+if TYPE_CHECKING:
+    from tcalc.backends import Backend
+
+# the value of an operation that failed, the error is raised at the end
+_FAILED: Any = object()
+
+
+class DirectEvaluator(Parser):
+    def __init__(
+        self,
+        lexer: Lexer,
+        variables: Mapping[str, Decimal | TimeExpr] | None = None,
+        backend: "Backend | None" = None,
+    ) -> None:
+        super().__init__(lexer)
+        self.variables = variables if variables is not None else {}
+        # literals of the decimal backend by default, without importing
+        # `tcalc.backends` for `tcalc EXPR`
+        if backend is None:
+            self._number: Any = Decimal
+            self._time: Any = _decimal_time
+        else:
+            self._number = backend.number
+            self._time = backend.time
+        self._error: Exception | None = None
+
+    def eval(self) -> Decimal | TimeExpr:
+        value = self.parse()
+        if self._error is not None:
+            raise self._error
+        return value  # type: ignore
+
+    def _fail(self, err: Exception) -> Any:
+        if self._error is None:
+            self._error = err
+        return _FAILED
+
+    def _parse_operand(self) -> Any:
+        token = self._lexer.peek()
+        if token.type is TokenType.NUMBER:
+            self._lexer.consume()
+            return self._number(token.value)
+        elif token.type is TokenType.TIME:
+            self._lexer.consume()
+            hours, minutes, seconds = token.value.split(":")
+            return self._time(hours or "0", minutes or "0", seconds or "0")
+        elif token.type is TokenType.NAME:
+            self._lexer.consume()
+            try:
+                return self.variables[token.value]
+            except KeyError:
+                msg = f"undefined variable {token.value}"
+                return self._fail(EvaluatorError(msg, token.column))
+
+        node = super()._parse_operand()  # a literal of single characters
+        if type(node) is Number:
+            return self._number(node.value)
+        assert isinstance(node, Time)
+        return self._time(node.hours, node.minutes, node.seconds)
+
+    def _make_unary(self, op: Token, expr: Any) -> Any:
+        if expr is _FAILED or op.type is TokenType.PLUS:
+            return expr
+        return -expr
+
+    def _make_binary(self, left: Any, op: Token, right: Any) -> Any:
+        if left is _FAILED or right is _FAILED:
+            return _FAILED
+        try:
+            if op.type is TokenType.PLUS:
+                return left + right
+            elif op.type is TokenType.MINUS:
+                return left - right
+            elif op.type is TokenType.MULT:
+                return left * right
+            elif op.type is TokenType.DIV:
+                return left / right
+            else:
+                assert False, "unreachable line"
+        except TypeError:
+            msg = f"unsupported operands for {op.value}"
+            return self._fail(EvaluatorError(msg, op.column))
+        except ArithmeticError as err:
+            return self._fail(err)
+
+
+def _decimal_time(hours: str, minutes: str, seconds: str) -> TimeExpr:
+    return TimeExpr(Decimal(hours), Decimal(minutes), Decimal(seconds))
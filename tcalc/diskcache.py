@@ -0,0 +1,133 @@
+"""
+On-disk cache of compiled worksheets.
+
+`tcalc -f sheet.tc` stores the AST and bytecode of every line of the
+sheet in a cache directory, so a later run of the unchanged file loads
+them without lexing and parsing:
+
+  $TCALC_CACHE_DIR, else $XDG_CACHE_HOME/tcalc, else ~/.cache/tcalc
+
+An entry is named by the SHA-256 of the file content, the lexer, the
+numeric backend and the version of tcalc. Editing the file or upgrading
+tcalc gives a new name, so entries are never stale; the ones no longer
+used are removed, least recently used first, once the directory holds
+more than `max_bytes`. Entries are written atomically. One that cannot
+be read, e.g. written by an incompatible Python, is removed and counts
+as a miss. The cache is an optimization only, failing to write it is
+not an error.
+
+Entries are pickles: the directory is created private to the user, and
+must not be shared with others.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Iterable
+
+import tcalc
+from tcalc.backends import Backend
+from tcalc.compiled import CompiledExpression
+
+CACHE_FORMAT = 1
+DEFAULT_MAX_BYTES = 64 << 20
+SUFFIX = ".tcc"
+
+
+def default_directory() -> str:
+    directory = os.environ.get("TCALC_CACHE_DIR")
+    if directory:
+        return directory
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "tcalc")
+
+
+class DiskCache:
+    def __init__(
+        self, directory: str | None = None, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        self.directory = directory if directory is not None else default_directory()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, data: bytes, lexer: str, backend: Backend) -> str:
+        digest = hashlib.sha256()
+        header = f"{CACHE_FORMAT}\0{tcalc.__version__}\0{lexer}\0{backend.name}\0"
+        digest.update(header.encode())
+        digest.update(data)
+        return os.path.join(self.directory, digest.hexdigest() + SUFFIX)
+
+    def load(
+        self, data: bytes, lexer: str, backend: Backend
+    ) -> dict[str, CompiledExpression] | None:
+        """The compiled lines of the file content `data` by source, if cached"""
+        path = self.path(data, lexer, backend)
+        try:
+            with open(path, "rb") as fp:
+                entries = pickle.load(fp)
+            os.utime(path)  # recently used
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # truncated or unreadable, written again after this run
+            self.misses += 1
+            _remove(path)
+            return None
+        self.hits += 1
+        return {
+            source: CompiledExpression(source, ast, backend, code)
+            for source, ast, code in entries
+        }
+
+    def save(
+        self,
+        data: bytes,
+        lexer: str,
+        backend: Backend,
+        compiled: Iterable[CompiledExpression],
+    ) -> None:
+        entries = [(c.source, c.ast, c.code) for c in compiled]
+        path = self.path(data, lexer, backend)
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(SUFFIX + ".tmp", dir=self.directory)
+            try:
+                with os.fdopen(fd, "wb") as fp:
+                    pickle.dump(entries, fp, pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+            except BaseException:
+                _remove(tmp)
+                raise
+            self.prune()
+        except OSError:
+            pass
+
+    def prune(self) -> None:
+        """Remove the least recently used entries beyond `max_bytes`"""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(SUFFIX) and entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            _remove(path)
+            total -= size
+
+    def clear(self) -> None:
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(SUFFIX):
+                    _remove(entry.path)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,136 @@
+"""
+Library interface for embedding tcalc in services.
+
+An `Engine` holds evaluation settings and nothing else, so one instance
+can be shared by any number of threads and tasks. Failures of an
+expression are returned as values instead of being raised or printed:
+
+    >>> engine = Engine()
+    >>> engine.evaluate("1:30: * 2").value
+    03:00:00
+    >>> engine.evaluate("1 +").error
+    ParserError('invalid syntax', 4)
+
+`evaluate_many` is a lazy generator, `aevaluate_many` its asynchronous
+counterpart which evaluates blocks of `chunk_size` expressions in an
+executor, the default executor of the event loop unless one is given,
+so that the event loop is never blocked by evaluation.
+
+Compiled expressions are shared through the cache of `tcalc.compile`,
+which is thread safe. Decimal arithmetic uses the calling thread's
+context, or `context` if one is given. Constants are not folded with a
+context of their own: the cache is shared, and folding would round them
+in whatever context the expression happened to be compiled.
+"""
+import asyncio
+import decimal
+from concurrent.futures import Executor
+from itertools import islice
+from typing import Any, AsyncIterator, Iterable, Iterator, NamedTuple
+
+from tcalc.compiled import compile
+from tcalc.errors import Error
+
+CHUNK_SIZE = 256
+
+
+class Result(NamedTuple):
+    expr: str
+    value: Any = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def unwrap(self) -> Any:
+        """The value, the error is raised if there is one"""
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class Settings(NamedTuple):
+    lexer: str = "regex"
+    backend: str = "decimal"
+    optimize: bool = True
+    context: decimal.Context | None = None
+
+
+class Engine:
+    def __init__(
+        self,
+        lexer: str = "regex",
+        backend: str = "decimal",
+        optimize: bool = True,
+        context: decimal.Context | None = None,
+        executor: Executor | None = None,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        optimize = optimize and context is None
+        # a plain tuple, which can also be sent to worker processes
+        self.settings = Settings(lexer, backend, optimize, context)
+        self.executor = executor
+        self.chunk_size = chunk_size
+
+    def evaluate(self, expr: str, /, **variables: Any) -> Result:
+        return evaluate(self.settings, expr, variables)
+
+    def evaluate_many(
+        self, exprs: Iterable[str], /, **variables: Any
+    ) -> Iterator[Result]:
+        """Yield the result of every expression as it is evaluated"""
+        # the context is entered per expression, a generator must not
+        # leave it set in the thread of its consumer between results
+        settings = self.settings
+        for expr in exprs:
+            yield evaluate(settings, expr, variables)
+
+    async def aevaluate_many(
+        self, exprs: Iterable[str], /, **variables: Any
+    ) -> AsyncIterator[Result]:
+        """
+        Yield the result of every expression, evaluated in the executor
+        `chunk_size` at a time. The next chunk is evaluated while the
+        results of the previous one are consumed.
+        """
+        loop = asyncio.get_running_loop()
+        exprs_iter = iter(exprs)
+        chunks = iter(lambda: list(islice(exprs_iter, self.chunk_size)), [])
+        pending = None
+        for chunk in chunks:
+            future = loop.run_in_executor(
+                self.executor, evaluate_chunk, self.settings, chunk, variables
+            )
+            if pending is not None:
+                for result in await pending:
+                    yield result
+            pending = future
+        if pending is not None:
+            for result in await pending:
+                yield result
+
+
+def evaluate(settings: Settings, expr: str, variables: dict[str, Any]) -> Result:
+    try:
+        compiled = compile(
+            expr,
+            lexer=settings.lexer,
+            optimize=settings.optimize,
+            backend=settings.backend,
+        )
+        if settings.context is None:
+            return Result(expr, compiled.evaluate(**variables))
+        with decimal.localcontext(settings.context):
+            return Result(expr, compiled.evaluate(**variables))
+    except (Error, ArithmeticError, ValueError) as err:
+        # ValueError: a variable that is not a number or a time
+        return Result(expr, error=err)
+
+
+def evaluate_chunk(
+    settings: Settings, exprs: list[str], variables: dict[str, Any]
+) -> list[Result]:
+    return [evaluate(settings, expr, variables) for expr in exprs]
@@ -12,3 +12,7 @@ class LexerError(Error):
     def __init__(self, msg: str, column: int = -1):
         self.msg = msg
         self.column = column
+
+
+class EvaluatorError(Error):
+    pass
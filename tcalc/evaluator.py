@@ -1,51 +1,137 @@
 from decimal import Decimal
-from typing import Protocol
+from typing import Mapping, Protocol
 
-from tcalc.ast import AST, BinaryOperator, Time, UnaryOperator, Number
+from tcalc import arena
+from tcalc.arena import Arena
+from tcalc.ast import (
+    AST,
+    BinaryOperator,
+    Constant,
+    Time,
+    UnaryOperator,
+    Number,
+    Variable,
+    postorder,
+)
+from tcalc.backends import DECIMAL, Backend
+from tcalc.errors import EvaluatorError
 from tcalc.token import TokenType
 from tcalc.expression import Time as TimeExpr
 
 
 class Parser(Protocol):
-    def parse(self) -> AST:
+    def parse(self) -> AST | Arena:
         pass
 
 
 class Evaluator:
-    def __init__(self, parser: Parser) -> None:
+    def __init__(
+        self,
+        parser: Parser,
+        variables: Mapping[str, Decimal | TimeExpr] | None = None,
+        backend: Backend = DECIMAL,
+    ) -> None:
         self.parser = parser
+        self.variables = variables if variables is not None else {}
+        self.backend = backend
 
     def eval(self) -> Decimal | TimeExpr:
         ast = self.parser.parse()
         result = self.visit(ast)
         return result
 
-    def visit(self, ast: AST) -> Decimal | TimeExpr:
-        if type(ast) is BinaryOperator:
+    def visit(self, ast: AST | Arena) -> Decimal | TimeExpr:
+        if isinstance(ast, Arena):
+            return self._visit_arena(ast)
+        # nodes arrive children first, operands are taken from `values`
+        values: list[Decimal | TimeExpr] = []
+        for node in postorder(ast):
+            if type(node) is BinaryOperator:
+                right = values.pop()
+                left = values.pop()
+                values.append(self._binary(node, left, right))
+            elif type(node) is UnaryOperator:
+                if node.op.type is TokenType.MINUS:
+                    values[-1] = -values[-1]
+                elif node.op.type is not TokenType.PLUS:
+                    assert False, "unreachable line"
+            else:
+                values.append(self._value(node))
+        return values.pop()
+
+    def _visit_arena(self, ast: Arena) -> Decimal | TimeExpr:
+        # the arena is in postfix order already
+        backend = self.backend
+        pool = ast.pool
+        values: list[Decimal | TimeExpr] = []
+        for op, left, _, column in ast:
+            if op == arena.CONSTANT:
+                values.append(pool[left])
+            elif op == arena.NUMBER:
+                values.append(backend.number(pool[left]))
+            elif op == arena.TIME:
+                values.append(backend.time(*pool[left].split(":")))
+            elif op == arena.VARIABLE:
+                try:
+                    values.append(self.variables[pool[left]])
+                except KeyError:
+                    msg = f"undefined variable {pool[left]}"
+                    raise EvaluatorError(msg, column)
+            elif op == arena.NEG:
+                values[-1] = -values[-1]
+            elif op != arena.POS:
+                right = values.pop()
+                values[-1] = _apply_arena(op, values[-1], right, column)
+        return values.pop()
+
+    def _binary(
+        self, ast: BinaryOperator, left: Decimal | TimeExpr, right: Decimal | TimeExpr
+    ) -> Decimal | TimeExpr:
+        try:
             if ast.op.type is TokenType.PLUS:
-                return self.visit(ast.left) + self.visit(ast.right)  # type: ignore
+                return left + right  # type: ignore
             elif ast.op.type is TokenType.MINUS:
-                return self.visit(ast.left) - self.visit(ast.right)  # type: ignore
+                return left - right  # type: ignore
             elif ast.op.type is TokenType.MULT:
-                return self.visit(ast.left) * self.visit(ast.right)  # type: ignore
+                return left * right  # type: ignore
             elif ast.op.type is TokenType.DIV:
-                return self.visit(ast.left) / self.visit(ast.right)  # type: ignore
-            else:
-                assert False, "unreachable line"
-        elif type(ast) is UnaryOperator:
-            if ast.op.type is TokenType.PLUS:
-                return self.visit(ast.expr)
-            elif ast.op.type is TokenType.MINUS:
-                return -self.visit(ast.expr)
+                return left / right  # type: ignore
             else:
                 assert False, "unreachable line"
-        elif type(ast) is Number:
-            return Decimal(ast.value)
+        except TypeError:
+            msg = f"unsupported operands for {ast.op.value}"
+            raise EvaluatorError(msg, ast.op.column)
+
+    def _value(self, ast: AST) -> Decimal | TimeExpr:
+        if type(ast) is Number:
+            return self.backend.number(ast.value)
+        elif type(ast) is Constant:
+            return ast.value
+        elif type(ast) is Variable:
+            try:
+                return self.variables[ast.name]
+            except KeyError:
+                raise EvaluatorError(f"undefined variable {ast.name}", ast.column)
         elif type(ast) is Time:
-            return TimeExpr(
-                Decimal(ast.hours),
-                Decimal(ast.minutes),
-                Decimal(ast.seconds),
-            )
+            return self.backend.time(ast.hours, ast.minutes, ast.seconds)
+        else:
+            assert False, "unreachable line"
+
+
+def _apply_arena(
+    op: int, left: Decimal | TimeExpr, right: Decimal | TimeExpr, column: int
+) -> Decimal | TimeExpr:
+    try:
+        if op == arena.ADD:
+            return left + right  # type: ignore
+        elif op == arena.SUB:
+            return left - right  # type: ignore
+        elif op == arena.MUL:
+            return left * right  # type: ignore
+        elif op == arena.DIV:
+            return left / right  # type: ignore
         else:
             assert False, "unreachable line"
+    except TypeError:
+        msg = f"unsupported operands for {arena.OP_TOKENS[op][1]}"
+        raise EvaluatorError(msg, column)
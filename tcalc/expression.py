@@ -1,6 +1,9 @@
-from decimal import Decimal
+from decimal import ROUND_HALF_EVEN, Decimal
 from typing import Any, Union
 
+# Resolution of a Time value: one tick is a microsecond
+TICKS_PER_SECOND = 1_000_000
+
 
 class Time:
     """
@@ -19,6 +22,10 @@ class Time:
 
       H, M and S are unsigned Integers.
 
+      Internally a Time Expression is a single signed integer count of
+      ticks (microseconds). It is immutable, hashable and only normalized
+      into hours, minutes and seconds when it is formatted.
+
     TIME EXPRESSION ARITHMETIC
 
       The following operations are legal:
@@ -47,91 +54,158 @@ class Time:
         = 00:11:06
     """
 
+    __slots__ = ("_ticks",)
+    _ticks: int
+
     def __init__(
         self, hours: Decimal, minutes: Decimal, seconds: Decimal, sign: bool = False
     ):
-        self.hour = hours
-        self.minute = minutes
-        self.second = seconds
-        self.fmt = "{:0>2}:{:0>2}:{:0>2}"
-        self.sign = sign
+        seconds = Decimal(hours) * 3600 + Decimal(minutes) * 60 + Decimal(seconds)
+        ticks = to_ticks(seconds)
+        object.__setattr__(self, "_ticks", -ticks if sign else ticks)
 
-    def time2sec(self) -> Decimal:
-        r = Decimal("0")
-        r += self.hour * 3600
-        r += self.minute * 60
-        r += self.second
-        return r
+    @classmethod
+    def from_ticks(cls, ticks: int) -> "Time":
+        t = object.__new__(cls)
+        object.__setattr__(t, "_ticks", ticks)
+        return t
+
+    @property
+    def ticks(self) -> int:
+        return self._ticks
 
-    def sec2time(self, s: Decimal) -> "Time":
-        h, s = divmod(s, 3600)
-        m, s = divmod(s, 60)
-        return Time(h, m, s)
+    @property
+    def sign(self) -> bool:
+        return self._ticks < 0
+
+    @property
+    def hour(self) -> Decimal:
+        return Decimal(abs(self._ticks) // (3600 * TICKS_PER_SECOND))
+
+    @property
+    def minute(self) -> Decimal:
+        return Decimal(abs(self._ticks) // (60 * TICKS_PER_SECOND) % 60)
+
+    @property
+    def second(self) -> Decimal:
+        return Decimal(abs(self._ticks) % (60 * TICKS_PER_SECOND)) / TICKS_PER_SECOND
+
+    def time2sec(self) -> Decimal:
+        return Decimal(abs(self._ticks)) / TICKS_PER_SECOND
 
     def __str__(self) -> str:
-        t = self.sec2time(self.time2sec())  # avoid malformed time
-        s = self.fmt.format(t.hour, t.minute, t.second)
-        if self.sign:
-            s = "-" + s
-        return s
+        return format_ticks(self._ticks)
 
     __repr__ = __str__
 
     def __add__(self, other: "Time") -> "Time":
-        t1 = self.time2sec()
-        t2 = other.time2sec()
-        if self.sign:
-            if other.sign:
-                td = -t1 - t2
-            else:
-                td = -t1 + t2
-        else:
-            if other.sign:
-                td = t1 - t2
-            else:
-                td = t1 + t2
-        if td < 0:
-            tnew = self.sec2time(-td)
-            tnew.sign = td < 0
-        else:
-            tnew = self.sec2time(td)
-        return tnew
+        if not isinstance(other, Time):
+            return NotImplemented
+        return Time.from_ticks(self._ticks + other._ticks)
 
     def __sub__(self, other: "Time") -> "Time":
-        t1 = self.time2sec()
-        t2 = other.time2sec()
-        if t2 > t1:
-            tnew = self.sec2time(t2 - t1)
-            tnew.sign = True
-        else:
-            tnew = self.sec2time(t1 - t2)
-        return tnew
-
-    def __mul__(self, other: Decimal) -> "Time":
-        t = self.time2sec()
-        return self.sec2time(t * other)
+        if not isinstance(other, Time):
+            return NotImplemented
+        return Time.from_ticks(self._ticks - other._ticks)
+
+    def __mul__(self, other: Decimal | int) -> "Time":
+        if isinstance(other, int):
+            return Time.from_ticks(self._ticks * other)
+        if isinstance(other, Decimal):
+            return Time.from_ticks(round_ticks(self._ticks * other))
+        return NotImplemented
 
     __rmul__ = __mul__
 
-    def __truediv__(self, other: Union[Decimal, "Time"]) -> Union[Decimal, "Time"]:
-        if isinstance(other, Decimal):
-            t = self.time2sec()
-            return self.sec2time(t / other)
-        elif isinstance(other, Time):
-            t1 = self.time2sec()
-            t2 = other.time2sec()
-            return t1 / t2
-        else:
-            raise ValueError("Unsupported operand {}".format(other))
-
-    def __rtruediv__(self, other: Any) -> None:
-        raise ValueError("Divison not allowed for {}".format(other))
+    def __truediv__(self, other: Union[Decimal, int, "Time"]) -> Union[Decimal, "Time"]:
+        if isinstance(other, (Decimal, int)):
+            if not other:
+                raise ZeroDivisionError("division by zero")
+            return Time.from_ticks(round_ticks(Decimal(self._ticks) / other))
+        if isinstance(other, Time):
+            if not other._ticks:
+                raise ZeroDivisionError("division by zero")
+            return Decimal(self._ticks) / Decimal(other._ticks)
+        return NotImplemented
 
     def __neg__(self) -> "Time":
-        self.sign = not self.sign
+        return Time.from_ticks(-self._ticks)
+
+    def __pos__(self) -> "Time":
         return self
 
+    def __abs__(self) -> "Time":
+        return Time.from_ticks(abs(self._ticks))
+
     def __eq__(self, other: Any) -> bool:
         if isinstance(other, Time):
-            return self.time2sec() == other.time2sec() and self.sign == other.sign
+            return self._ticks == other._ticks
         return False
+
+    def __lt__(self, other: "Time") -> bool:
+        if not isinstance(other, Time):
+            return NotImplemented
+        return self._ticks < other._ticks
+
+    def __le__(self, other: "Time") -> bool:
+        if not isinstance(other, Time):
+            return NotImplemented
+        return self._ticks <= other._ticks
+
+    def __gt__(self, other: "Time") -> bool:
+        if not isinstance(other, Time):
+            return NotImplemented
+        return self._ticks > other._ticks
+
+    def __ge__(self, other: "Time") -> bool:
+        if not isinstance(other, Time):
+            return NotImplemented
+        return self._ticks >= other._ticks
+
+    def __hash__(self) -> int:
+        return hash(self._ticks)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Time is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Time is immutable")
+
+    def __reduce__(self) -> tuple:
+        return Time.from_ticks, (self._ticks,)
+
+
+# "MM:SS" of every second of an hour and "HH:" of the first hundred hours,
+# whole seconds are formatted with two lookups. Entries are formatted on
+# first use, `tcalc EXPR` formats a single result.
+_MINUTES_SECONDS: list[str | None] = [None] * 3600
+_HOURS: list[str | None] = [None] * 100
+
+
+def format_ticks(ticks: int) -> str:
+    """Format a duration of `ticks` as [-]HH:MM:SS[.ffffff]"""
+    s, fraction = divmod(-ticks if ticks < 0 else ticks, TICKS_PER_SECOND)
+    if not fraction:
+        h, rest = divmod(s, 3600)
+        hours = _HOURS[h] if h < 100 else f"{h}:"
+        if hours is None:
+            hours = _HOURS[h] = f"{h:02d}:"
+        minutes_seconds = _MINUTES_SECONDS[rest]
+        if minutes_seconds is None:
+            m, s = divmod(rest, 60)
+            minutes_seconds = _MINUTES_SECONDS[rest] = f"{m:02d}:{s:02d}"
+        text = hours + minutes_seconds
+        return "-" + text if ticks < 0 else text
+    m, s = divmod(s, 60)
+    h, m = divmod(m, 60)
+    sec = "{}.{}".format(s, "{:06d}".format(fraction).rstrip("0"))
+    text = "{:02d}:{:02d}:{:0>2}".format(h, m, sec)
+    return "-" + text if ticks < 0 else text
+
+
+def to_ticks(seconds: Decimal) -> int:
+    return round_ticks(seconds * TICKS_PER_SECOND)
+
+
+def round_ticks(ticks: Decimal) -> int:
+    return int(ticks.to_integral_value(ROUND_HALF_EVEN))
@@ -0,0 +1,173 @@
+"""
+Counters and timings of the evaluation pipeline.
+
+Collection is off by default. The pipeline reads the module attribute
+`active` once per compiled expression or evaluation and takes its usual
+path when it is None, so disabled instrumentation costs a single check.
+
+    >>> import tcalc
+    >>> from tcalc import instrumentation
+    >>> with instrumentation.collect() as stats:
+    ...     tcalc.compile("1:: + 2").evaluate()
+    >>> stats.as_dict()
+
+Time is recorded per stage in seconds:
+
+  lex        scanning source into tokens
+  parse      building the AST, without the time spent in the lexer
+  optimize   rewriting the AST
+  compile    generating bytecode
+  evaluate   running the bytecode, mostly Decimal and Time arithmetic
+  format     converting results to text
+  output     writing results to stdout
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from tcalc.token import Token, TokenType
+
+STAGES = ("lex", "parse", "optimize", "compile", "evaluate", "format", "output")
+
+
+class Stats:
+    def __init__(self) -> None:
+        self.tokens = 0
+        self.nodes = 0
+        self.compilations = 0
+        self.evaluations = 0
+        # nodes interned into and created in a `tcalc.dag.DAG`
+        self.interned = 0
+        self.distinct = 0
+        self.errors: dict[str, int] = {}
+        self.times = dict.fromkeys(STAGES, 0.0)
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        self.times[stage] += seconds
+
+    def add_error(self, err: BaseException) -> None:
+        # decimal signals are subclasses, count them by their builtin base
+        if isinstance(err, ZeroDivisionError):
+            name = "ZeroDivisionError"
+        elif isinstance(err, ArithmeticError):
+            name = "ArithmeticError"
+        else:
+            name = type(err).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Interned nodes per distinct node, see `tcalc.dag`"""
+        return self.interned / self.distinct if self.distinct else 1.0
+
+    def merge(self, other: "Stats") -> None:
+        self.tokens += other.tokens
+        self.nodes += other.nodes
+        self.compilations += other.compilations
+        self.evaluations += other.evaluations
+        self.interned += other.interned
+        self.distinct += other.distinct
+        for name, count in other.errors.items():
+            self.errors[name] = self.errors.get(name, 0) + count
+        for stage, seconds in other.times.items():
+            self.times[stage] += seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "tokens": self.tokens,
+            "nodes": self.nodes,
+            "compilations": self.compilations,
+            "evaluations": self.evaluations,
+            "interned": self.interned,
+            "distinct": self.distinct,
+            "errors": dict(sorted(self.errors.items())),
+            "times": dict(self.times),
+        }
+
+    def to_json(self) -> str:
+        import json
+
+        return json.dumps(self.as_dict(), indent=2)
+
+    def format_table(self) -> str:
+        total = sum(self.times.values())
+        lines = [f"{'stage':<10} {'seconds':>10} {'share':>7}"]
+        for stage, seconds in self.times.items():
+            share = seconds / total if total else 0.0
+            lines.append(f"{stage:<10} {seconds:>10.6f} {share:>7.1%}")
+        lines.append(f"{'total':<10} {total:>10.6f}")
+        lines.append("")
+        for name in ("tokens", "nodes", "compilations", "evaluations"):
+            lines.append(f"{name:<18} {getattr(self, name):>10}")
+        if self.interned:
+            lines.append(f"{'interned':<18} {self.interned:>10}")
+            lines.append(f"{'distinct':<18} {self.distinct:>10}")
+            lines.append(f"{'dedup ratio':<18} {self.dedup_ratio:>10.2f}")
+        for name, count in sorted(self.errors.items()):
+            lines.append(f"{name:<18} {count:>10}")
+        return "\n".join(lines)
+
+
+class TimedLexer:
+    """Wraps a lexer, counts its tokens and records the time spent in it"""
+
+    def __init__(self, lexer: Any, stats: Stats) -> None:
+        self.lexer = lexer
+        self.stats = stats
+        self.elapsed = 0.0
+
+    def peek(self) -> Token:
+        start = time.perf_counter()
+        try:
+            return self.lexer.peek()
+        finally:
+            self._record(start)
+
+    def consume(self) -> Token:
+        start = time.perf_counter()
+        try:
+            token = self.lexer.consume()
+        finally:
+            self._record(start)
+        if token.type is not TokenType.EOF:
+            self.stats.tokens += 1
+        return token
+
+    def isEOF(self) -> bool:
+        start = time.perf_counter()
+        try:
+            return self.lexer.isEOF()
+        finally:
+            self._record(start)
+
+    def _record(self, start: float) -> None:
+        elapsed = time.perf_counter() - start
+        self.elapsed += elapsed
+        self.stats.times["lex"] += elapsed
+
+
+active: Stats | None = None
+
+
+def enable() -> Stats:
+    """Start collecting into a new `Stats`, which is returned"""
+    global active
+    active = Stats()
+    return active
+
+
+def disable() -> Stats | None:
+    """Stop collecting and return what was collected"""
+    global active
+    stats, active = active, None
+    return stats
+
+
+@contextmanager
+def collect() -> Iterator[Stats]:
+    global active
+    previous, active = active, Stats()
+    try:
+        yield active
+    finally:
+        active = previous
@@ -1,8 +1,10 @@
+import re
 from collections import deque
-from typing import Protocol
+from typing import Any, Protocol
 
 from tcalc.token import TokenType, Token, LUT
 from tcalc.errors import LexerError
+from tcalc.reader import InputReader as SourceReader
 
 
 class InputReader(Protocol):
@@ -65,3 +67,132 @@ class Lexer:
 
         token = Token(token_type, value, column)
         self._tokens.appendleft(token)
+
+
+TOKEN_PATTERN = re.compile(
+    r"""
+    [ \t\n]*
+    (?:
+        (?P<TIME>(?:[0-9]+(?:\.[0-9]*)?)?:[0-9]*:[0-9]*)
+      | (?P<NUMBER>[0-9]+(?:\.[0-9]*)?|\.[0-9]+)
+      | (?P<NAME>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<OP>[-+*/()])
+    )
+    """,
+    re.VERBOSE,
+)
+
+WHITESPACE = re.compile(r"[ \t\n]*")
+
+
+class RegexLexer:
+    """
+    Lexer that scans whole literals with a single compiled pattern.
+
+    Tokens are produced lazily, one ahead of the parser. NUMBER, TIME and
+    NAME tokens hold the full text of the literal, which spans from
+    `column` to `column + len(value)`.
+    """
+
+    def __init__(self, source: str) -> None:
+        self._source = source
+        self._pos = 0
+        self._next = self._scan()
+
+    def peek(self) -> Token:
+        return self._next
+
+    def consume(self) -> Token:
+        token = self._next
+        if token.type is not TokenType.EOF:
+            self._next = self._scan()
+        return token
+
+    def isEOF(self) -> bool:
+        return self._next.type is TokenType.EOF
+
+    def _scan(self) -> Token:
+        match = TOKEN_PATTERN.match(self._source, self._pos)
+        if match is None:
+            pos = WHITESPACE.match(self._source, self._pos).end()  # type: ignore
+            if pos == len(self._source):
+                return Token(TokenType.EOF, "", pos + 1)
+            raise LexerError(f"Unknown character: {self._source[pos]}", pos + 1)
+
+        self._pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)  # type: ignore
+        column = match.start(kind) + 1  # type: ignore
+        if kind == "OP":
+            return Token(LUT.Char2Token[value], value, column)
+        return Token(TokenType[kind], value, column)  # type: ignore
+
+
+BYTES_TOKEN_PATTERN = re.compile(TOKEN_PATTERN.pattern.encode(), re.VERBOSE)
+BYTES_WHITESPACE = re.compile(WHITESPACE.pattern.encode())
+
+OPERATOR_TOKENS = {
+    ord(char): (token_type, char)
+    for char, token_type in LUT.Char2Token.items()
+    if char in "+-*/()"
+}
+
+
+class SpanLexer:
+    """
+    `RegexLexer` over `buffer[start:end]` of a bytes-like object, e.g. an
+    mmap. Nothing is copied but the text of literals, which is decoded as
+    they are scanned: the parser would read it anyway.
+    Columns count bytes from `start`, they equal character columns up to
+    the first non-ASCII character, which is an error anyway.
+    """
+
+    def __init__(self, buffer: Any, start: int = 0, end: int | None = None) -> None:
+        self._buffer = buffer
+        self._start = start
+        self._end = len(buffer) if end is None else end
+        self._pos = start
+        self._next = self._scan()
+
+    def peek(self) -> Token:
+        return self._next
+
+    def consume(self) -> Token:
+        token = self._next
+        if token.type is not TokenType.EOF:
+            self._next = self._scan()
+        return token
+
+    def isEOF(self) -> bool:
+        return self._next.type is TokenType.EOF
+
+    def _scan(self) -> Token:
+        buffer = self._buffer
+        match = BYTES_TOKEN_PATTERN.match(buffer, self._pos, self._end)
+        if match is None:
+            space = BYTES_WHITESPACE.match(buffer, self._pos, self._end)
+            pos = space.end()  # type: ignore
+            if pos == self._end:
+                return Token(TokenType.EOF, "", pos - self._start + 1)
+            char = bytes(buffer[pos : pos + 4]).decode(errors="replace")[0]
+            raise LexerError(f"Unknown character: {char}", pos - self._start + 1)
+
+        self._pos = match.end()
+        kind: str = match.lastgroup  # type: ignore
+        start, end = match.span(kind)
+        column = start - self._start + 1
+        if kind == "OP":
+            token_type, char = OPERATOR_TOKENS[buffer[start]]
+            return Token(token_type, char, column)
+        return Token(TokenType[kind], buffer[start:end].decode("ascii"), column)
+
+
+LEXERS = ("regex", "char")
+
+
+def create_lexer(source: str, engine: str = "regex") -> RegexLexer | Lexer:
+    if engine == "regex":
+        return RegexLexer(source)
+    elif engine == "char":
+        return Lexer(SourceReader(source))
+    raise ValueError(f"Unknown lexer engine: {engine}")
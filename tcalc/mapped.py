@@ -0,0 +1,87 @@
+"""
+Zero-copy evaluation of expression files.
+
+A file is mapped with `mmap` and every line is lexed in place by
+`tcalc.lexer.SpanLexer`. Only the text of literals is decoded, as they
+are scanned, so the process does not hold a copy of the input and its
+memory stays flat however large the file is; pages of the mapping are
+backed by the file and can be dropped by the kernel.
+
+Every line is evaluated once, by walking its AST: without a source
+string there is nothing to cache compiled expressions by.
+"""
+import mmap
+import re
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from tcalc.backends import get_backend
+from tcalc.batch import LineError, format_result, line_error
+from tcalc.errors import Error
+from tcalc.evaluator import Evaluator
+from tcalc.lexer import SpanLexer
+from tcalc.output import get_format
+from tcalc.parser import Parser
+
+# like str.strip(), blank lines are echoed
+BLANK = re.compile(rb"[ \t\r\n\f\v]*")
+
+
+@contextmanager
+def map_file(path: str) -> Iterator[Any]:
+    """Map `path` read-only, empty files cannot be mapped and give b"" """
+    with open(path, "rb") as fp:
+        try:
+            buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield b""
+            return
+    try:
+        if hasattr(buffer, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            buffer.madvise(mmap.MADV_SEQUENTIAL)
+        yield buffer
+    finally:
+        buffer.close()
+
+
+def iter_lines(
+    buffer: Any, start: int = 0, end: int | None = None
+) -> Iterator[tuple[int, int]]:
+    """Yield (start, end) of every line in buffer[start:end], without "\\r\\n" """
+    end = len(buffer) if end is None else end
+    while start < end:
+        newline = buffer.find(b"\n", start, end)
+        stop = end if newline < 0 else newline
+        line_end = stop
+        if line_end > start and buffer[line_end - 1] == 13:  # "\r"
+            line_end -= 1
+        yield start, line_end
+        start = stop + 1
+
+
+def evaluate_span(buffer: Any, start: int, end: int, backend: str = "decimal") -> Any:
+    parser = Parser(SpanLexer(buffer, start, end))
+    return Evaluator(parser, backend=get_backend(backend)).eval()
+
+
+def evaluate_mapped(
+    buffer: Any,
+    start: int = 0,
+    end: int | None = None,
+    backend: str = "decimal",
+    fmt: str = "hms",
+) -> Iterator[tuple[str | None, LineError | None]]:
+    """Like `tcalc.batch.evaluate_lines` for the lines of buffer[start:end]"""
+    formatter = get_format(fmt)
+    blank = formatter.blank()
+    for lineno, (line_start, line_end) in enumerate(iter_lines(buffer, start, end), 1):
+        if BLANK.match(buffer, line_start, line_end).end() == line_end:  # type: ignore
+            yield blank, None
+            continue
+        try:
+            result = evaluate_span(buffer, line_start, line_end, backend)
+        except (Error, ArithmeticError) as err:
+            error = line_error(lineno, err)
+            yield formatter.error(error.kind, error.column, error.msg), error
+        else:
+            yield format_result(result, formatter), None
@@ -0,0 +1,306 @@
+"""
+Simplification of the AST between parsing and evaluation.
+
+The optimizer rewrites the tree bottom-up:
+
+  * literals become `Constant` nodes holding their `Decimal` or `Time`
+    value, so they are converted once instead of on every evaluation;
+  * subtrees made of constants only are folded into a single constant;
+  * unary plus is dropped and pairs of unary minus cancel out;
+  * time constants of an additive chain are summed into one constant,
+    e.g. `::30 + x + ::30` becomes `x + 00:01:00`;
+  * multiplying or dividing by one is dropped and integral factors of a
+    multiplicative chain are combined, e.g. `x * 1 * 2 * 3` becomes
+    `x * 6`.
+
+Only rewrites that give the same result for every possible binding are
+applied. Operations that fail, such as a division by zero, are left in
+the tree so that they are reported at their source position at runtime.
+
+Literals are converted and constants folded with the numeric backend the
+expression is compiled for. Chains are not reordered for backends that
+are not exact, see `tcalc.backends`.
+
+`optimize_arena` rewrites a `tcalc.arena.Arena` in one pass over its
+nodes. It applies the rewrites that only touch the last nodes of the
+postfix order: converting literals, folding constants, dropping unary
+plus, double minus and a right operand of one. Chains are left alone.
+"""
+from typing import Any
+
+from tcalc import arena
+from tcalc.arena import Arena
+from tcalc.ast import (
+    AST,
+    BinaryOperator,
+    Constant,
+    Time,
+    UnaryOperator,
+    Number,
+    Variable,
+)
+from tcalc.backends import DECIMAL, Backend
+from tcalc.token import Token, TokenType
+
+ADDITIVE = (TokenType.PLUS, TokenType.MINUS)
+
+
+class Optimizer:
+    def __init__(self, backend: Backend = DECIMAL) -> None:
+        self.backend = backend
+
+    def optimize(self, ast: AST) -> AST:
+        # iterative post-order rewrite, the results of children are taken
+        # from the `done` stack when their parent is visited the 2nd time.
+        # Additive chains are only combined at their outermost operator,
+        # `inner` marks the operators below it.
+        done: list[AST] = []
+        stack: list[tuple[AST, bool, bool]] = [(ast, False, False)]
+        while stack:
+            node, visited, inner = stack.pop()
+            if type(node) is BinaryOperator:
+                if visited:
+                    right = done.pop()
+                    left = done.pop()
+                    done.append(self._binary(left, node.op, right, inner))
+                else:
+                    additive = node.op.type in ADDITIVE
+                    stack.append((node, True, inner))
+                    for child in (node.right, node.left):
+                        stack.append((child, False, additive and _is_additive(child)))
+            elif type(node) is UnaryOperator:
+                if visited:
+                    done.append(self._unary(node.op, done.pop()))
+                else:
+                    stack.append((node, True, False))
+                    stack.append((node.expr, False, False))
+            elif type(node) is Number:
+                done.append(Constant(self.backend.number(node.value)))
+            elif type(node) is Time:
+                value = self.backend.time(node.hours, node.minutes, node.seconds)
+                done.append(Constant(value))
+            elif type(node) in (Constant, Variable):
+                done.append(node)
+            else:
+                assert False, "unreachable line"
+
+        return done.pop()
+
+    def _unary(self, op: Token, expr: AST) -> AST:
+        if op.type is TokenType.PLUS:
+            return expr
+        if type(expr) is Constant:
+            return Constant(-expr.value)
+        if type(expr) is UnaryOperator and expr.op.type is TokenType.MINUS:
+            return expr.expr
+        return UnaryOperator(op, expr)
+
+    def _binary(self, left: AST, op: Token, right: AST, inner: bool) -> AST:
+        if type(left) is Constant and type(right) is Constant:
+            try:
+                return Constant(_apply(op, left.value, right.value))
+            except (TypeError, ArithmeticError):
+                return BinaryOperator(left, op, right)
+
+        if op.type in ADDITIVE:
+            if inner or not self.backend.exact:
+                return BinaryOperator(left, op, right)
+            return self._additive_chain(BinaryOperator(left, op, right))
+
+        if op.type is TokenType.MULT:
+            if self._is_one(right):
+                return left
+            if self._is_one(left):
+                return right
+            if self.backend.exact:
+                return self._multiplicative_chain(left, op, right)
+
+        if op.type is TokenType.DIV and self._is_one(right):
+            return left
+
+        return BinaryOperator(left, op, right)
+
+    def _additive_chain(self, node: BinaryOperator) -> AST:
+        # flatten the chain into signed terms, `a - (b + c)` is `a - b - c`
+        terms: list[tuple[bool, Token | None, AST]] = []
+        stack: list[tuple[bool, Token | None, AST]] = [(False, None, node)]
+        while stack:
+            negative, op, term = stack.pop()
+            if type(term) is BinaryOperator and term.op.type in ADDITIVE:
+                right_negative = negative != (term.op.type is TokenType.MINUS)
+                stack.append((right_negative, term.op, term.right))
+                stack.append((negative, op, term.left))
+            else:
+                terms.append((negative, op, term))
+
+        times = [
+            i
+            for i, (_, _, term) in enumerate(terms)
+            if type(term) is Constant and self.backend.is_time(term.value)
+        ]
+        if len(times) < 2:
+            return node
+        skip = set(times)
+        rest = [term for i, term in enumerate(terms) if i not in skip]
+        # moving the times must not move an error: any other operand, e.g.
+        # a number or `1 / 0`, would fail at another operator than before
+        if not all(_cannot_fail(term) for _, _, term in rest):
+            return node
+
+        value = None
+        for i in times:
+            negative, _, term = terms[i]
+            term_value = -term.value if negative else term.value  # type: ignore
+            value = term_value if value is None else value + term_value
+        assert value is not None, "at least two times"
+        if not rest:
+            return Constant(value)
+
+        negative, _, result = rest[0]
+        if negative:
+            result = self._unary(Token(TokenType.MINUS, "-", -1), result)
+        for negative, op, term in rest[1:]:
+            result = BinaryOperator(result, _additive_op(negative, op), term)
+        # the folded times are added by the operator that first combined a
+        # time with a variable, so that a variable holding a number fails
+        # at the same operator as before
+        first = times[0] if times[0] else min(set(range(len(terms))) - skip)
+        op = terms[first][1]
+        assert op is not None
+        if op.type is TokenType.MINUS:
+            return BinaryOperator(result, op, Constant(-value))
+        return BinaryOperator(result, op, Constant(value))
+
+    def _multiplicative_chain(self, left: AST, op: Token, right: AST) -> AST:
+        # (x * 2) * 3 => x * 6, only for integral factors whose product
+        # does not depend on rounding
+        if (
+            self._is_integral(right)
+            and type(left) is BinaryOperator
+            and left.op.type is TokenType.MULT
+            and self._is_integral(left.right)
+        ):
+            factor = left.right.value * right.value  # type: ignore
+            return BinaryOperator(left.left, left.op, Constant(factor))
+        return BinaryOperator(left, op, right)
+
+    def _is_one(self, node: AST) -> bool:
+        return type(node) is Constant and self.backend.is_one(node.value)
+
+    def _is_integral(self, node: AST) -> bool:
+        return type(node) is Constant and self.backend.is_integral(node.value)
+
+
+def _apply(op: Token, left: Any, right: Any) -> Any:
+    if op.type is TokenType.PLUS:
+        return left + right  # type: ignore
+    elif op.type is TokenType.MINUS:
+        return left - right  # type: ignore
+    elif op.type is TokenType.MULT:
+        return left * right  # type: ignore
+    elif op.type is TokenType.DIV:
+        return left / right  # type: ignore
+    assert False, "unreachable line"
+
+
+def _additive_op(negative: bool, op: Token | None) -> Token:
+    column = op.column if op is not None else -1
+    if negative:
+        return Token(TokenType.MINUS, "-", column)
+    return Token(TokenType.PLUS, "+", column)
+
+
+def _cannot_fail(node: AST) -> bool:
+    if type(node) is UnaryOperator:
+        return type(node.expr) is Variable
+    return type(node) is Variable
+
+
+def _is_additive(node: AST) -> bool:
+    return type(node) is BinaryOperator and node.op.type in ADDITIVE
+
+
+class ArenaOptimizer:
+    def __init__(self, backend: Backend = DECIMAL) -> None:
+        self.backend = backend
+
+    def optimize(self, ast: Arena) -> Arena:
+        # nodes are copied in postfix order, `moved` maps old indexes to
+        # new ones. A node's operands are the last nodes copied, so a
+        # rewrite pops them and appends its result.
+        new = Arena()
+        moved = [-1] * len(ast)
+        backend = self.backend
+        pool = ast.pool
+        for index, (op, left, right, column) in enumerate(ast):
+            if op == arena.NUMBER:
+                moved[index] = new.add_leaf(arena.CONSTANT, backend.number(pool[left]))
+            elif op == arena.TIME:
+                value = backend.time(*pool[left].split(":"))
+                moved[index] = new.add_leaf(arena.CONSTANT, value)
+            elif op in arena.LEAVES:
+                moved[index] = new.add_leaf(op, pool[left], column)
+            elif op == arena.POS:
+                moved[index] = moved[left]
+            elif op == arena.NEG:
+                moved[index] = self._negate(new, moved[left], column)
+            else:
+                moved[index] = self._binary(
+                    new, op, moved[left], moved[right], column
+                )
+        new.root = moved[ast.root]
+        new.compact()
+        return new
+
+    def _negate(self, new: Arena, operand: int, column: int) -> int:
+        if new.ops[operand] == arena.CONSTANT:
+            value = new.literal(operand)
+            new.pop()
+            return new.add_leaf(arena.CONSTANT, -value)
+        if new.ops[operand] == arena.NEG:
+            inner = new.left[operand]
+            new.pop()
+            return inner
+        return new.add(arena.NEG, operand, -1, column)
+
+    def _binary(
+        self, new: Arena, op: int, left: int, right: int, column: int
+    ) -> int:
+        if new.ops[left] == arena.CONSTANT and new.ops[right] == arena.CONSTANT:
+            try:
+                value = _apply_arena(op, new.literal(left), new.literal(right))
+            except (TypeError, ArithmeticError):
+                pass
+            else:
+                new.pop()
+                new.pop()
+                return new.add_leaf(arena.CONSTANT, value)
+        elif op in (arena.MUL, arena.DIV) and self._is_one(new, right):
+            new.pop()
+            return left
+        return new.add(op, left, right, column)
+
+    def _is_one(self, new: Arena, index: int) -> bool:
+        return new.ops[index] == arena.CONSTANT and self.backend.is_one(
+            new.literal(index)
+        )
+
+
+def _apply_arena(op: int, left: Any, right: Any) -> Any:
+    if op == arena.ADD:
+        return left + right
+    elif op == arena.SUB:
+        return left - right
+    elif op == arena.MUL:
+        return left * right
+    elif op == arena.DIV:
+        return left / right
+    assert False, "unreachable line"
+
+
+def optimize(ast: AST, backend: Backend = DECIMAL) -> AST:
+    return Optimizer(backend).optimize(ast)
+
+
+def optimize_arena(ast: Arena, backend: Backend = DECIMAL) -> Arena:
+    return ArenaOptimizer(backend).optimize(ast)
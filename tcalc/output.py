@@ -0,0 +1,221 @@
+"""
+Output formats of results and a buffered writer.
+
+  hms       HH:MM:SS, as printed by `tcalc EXPR`
+  seconds   durations as seconds, e.g. 5400 or 0.5
+  iso       durations as ISO 8601, e.g. PT1H30M
+  csv       a `line,result,seconds,error` row per non-blank input line
+  jsonl     a JSON object per non-blank input line, with error records
+
+Numbers are printed as they are by every format. In hms, seconds and iso
+one line is written per input line, blank or failing lines give empty
+lines. The csv and jsonl records carry the number of their input line
+instead.
+
+A record is formatted in two steps so that worker processes can format
+lines without knowing their final line numbers: `result`, `error` and
+`blank` return the body of a record, `number` adds the line number to it.
+"""
+import sys
+import time
+from typing import IO, Any
+
+from tcalc import instrumentation
+from tcalc.expression import TICKS_PER_SECOND
+
+FORMATS = ("hms", "seconds", "iso", "csv", "jsonl")
+BUFFER_LINES = 4096
+
+
+def ticks_of(value: Any) -> int | None:
+    """Ticks of a duration of any backend, None for numbers"""
+    return getattr(value, "ticks", None)
+
+
+def format_seconds(ticks: int) -> str:
+    whole, fraction = divmod(-ticks if ticks < 0 else ticks, TICKS_PER_SECOND)
+    text = f"{whole}.{fraction:06d}".rstrip("0") if fraction else str(whole)
+    return "-" + text if ticks < 0 else text
+
+
+def format_iso(ticks: int) -> str:
+    """ISO 8601 duration in hours, minutes and seconds, e.g. -PT1H0.5S"""
+    s, fraction = divmod(-ticks if ticks < 0 else ticks, TICKS_PER_SECOND)
+    m, s = divmod(s, 60)
+    h, m = divmod(m, 60)
+    text = "PT"
+    if h:
+        text += f"{h}H"
+    if m:
+        text += f"{m}M"
+    if fraction:
+        text += f"{s}.{fraction:06d}".rstrip("0") + "S"
+    elif s or text == "PT":
+        text += f"{s}S"
+    return "-" + text if ticks < 0 else text
+
+
+class Format:
+    name = "hms"
+    header = ""
+    # whether records get line numbers by `number`
+    numbered = False
+
+    def result(self, value: Any) -> str:
+        return f"{value}\n"
+
+    def error(self, kind: str, column: int, msg: str) -> str:
+        return "\n"
+
+    def blank(self) -> str | None:
+        """The body of a blank input line, None to skip it"""
+        return "\n"
+
+    def number(self, lineno: int, body: str) -> str:
+        return body
+
+
+class SecondsFormat(Format):
+    name = "seconds"
+
+    def result(self, value: Any) -> str:
+        ticks = ticks_of(value)
+        return f"{value}\n" if ticks is None else format_seconds(ticks) + "\n"
+
+
+class IsoFormat(Format):
+    name = "iso"
+
+    def result(self, value: Any) -> str:
+        ticks = ticks_of(value)
+        return f"{value}\n" if ticks is None else format_iso(ticks) + "\n"
+
+
+class CsvFormat(Format):
+    name = "csv"
+    header = "line,result,seconds,error\n"
+    numbered = True
+
+    def result(self, value: Any) -> str:
+        ticks = ticks_of(value)
+        if ticks is None:
+            return f"{_csv_field(str(value))},,\n"
+        return f"{value},{format_seconds(ticks)},\n"
+
+    def error(self, kind: str, column: int, msg: str) -> str:
+        return f",,{_csv_field(f'{kind}: {msg}')}\n"
+
+    def blank(self) -> str | None:
+        return None
+
+    def number(self, lineno: int, body: str) -> str:
+        return f"{lineno},{body}"
+
+
+class JsonLinesFormat(Format):
+    name = "jsonl"
+    numbered = True
+
+    def result(self, value: Any) -> str:
+        ticks = ticks_of(value)
+        if ticks is None:
+            return f'"type": "number", "result": "{value}"}}\n'
+        seconds = format_seconds(ticks)
+        return f'"type": "time", "result": "{value}", "seconds": {seconds}}}\n'
+
+    def error(self, kind: str, column: int, msg: str) -> str:
+        import json
+
+        column_field = f', "column": {column}' if column > 0 else ""
+        return f'"error": "{kind}"{column_field}, "message": {json.dumps(msg)}}}\n'
+
+    def blank(self) -> str | None:
+        return None
+
+    def number(self, lineno: int, body: str) -> str:
+        return f'{{"line": {lineno}, {body}'
+
+
+def _csv_field(text: str) -> str:
+    if any(char in text for char in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+_FORMATS = {
+    fmt.name: fmt
+    for fmt in (Format(), SecondsFormat(), IsoFormat(), CsvFormat(), JsonLinesFormat())
+}
+
+HMS = _FORMATS["hms"]
+
+
+def get_format(name: str) -> Format:
+    try:
+        return _FORMATS[name]
+    except KeyError:
+        raise ValueError(f"unknown output format: {name}") from None
+
+
+class Writer:
+    """
+    Collects formatted records and writes them `buffer_lines` at a time
+    with a single `writelines` call. Records are numbered by the writer,
+    which counts the input lines it is given.
+    """
+
+    def __init__(
+        self,
+        fmt: str | Format = "hms",
+        stream: IO[str] | None = None,
+        buffer_lines: int = BUFFER_LINES,
+    ) -> None:
+        self.format = get_format(fmt) if isinstance(fmt, str) else fmt
+        self.stream = stream
+        self.buffer_lines = buffer_lines
+        self.lineno = 0
+        self._buffer: list[str] = []
+        if self.format.header:
+            self._buffer.append(self.format.header)
+
+    def start(self) -> None:
+        """Restart line numbers, for a new input"""
+        self.lineno = 0
+
+    def write(self, body: str | None) -> None:
+        """Add the record of the next input line, None for a skipped one"""
+        self.lineno += 1
+        if body is None:
+            return
+        if self.format.numbered:
+            body = self.format.number(self.lineno, body)
+        self._buffer.append(body)
+        if len(self._buffer) >= self.buffer_lines:
+            self.flush(False)
+
+    def writelines(self, bodies: list[str | None]) -> None:
+        if not self.format.numbered:
+            self.lineno += len(bodies)
+            self._buffer.extend(bodies)  # type: ignore
+            if len(self._buffer) >= self.buffer_lines:
+                self.flush(False)
+            return
+        for body in bodies:
+            self.write(body)
+
+    def flush(self, flush_stream: bool = True) -> None:
+        stream = self.stream if self.stream is not None else sys.stdout
+        stats = instrumentation.active
+        start = time.perf_counter() if stats is not None else 0.0
+        stream.writelines(self._buffer)
+        self._buffer.clear()
+        if flush_stream:
+            stream.flush()
+        if stats is not None:
+            stats.add_time("output", time.perf_counter() - start)
+
+    def __enter__(self) -> "Writer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.flush()
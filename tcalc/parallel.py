@@ -0,0 +1,308 @@
+"""
+Evaluation of large inputs in a pool of worker processes.
+
+Input files are split into chunks of roughly `CHUNK_SIZE` bytes on line
+boundaries, without reading them in the parent process; workers map the
+file and evaluate their chunk in place. Stdin cannot be split that way
+and is sent to the workers in blocks of `STDIN_BLOCK_LINES` lines.
+
+Results come back in input order: batch output is written as it would be
+by a single process and partial aggregates are merged chunk by chunk. At
+most `2 * jobs` chunks are in flight, so memory does not grow with the
+size of the input.
+
+Whether a key aggregates numbers or times is decided by its first value
+in the whole input, which a worker cannot know. Its partial aggregates
+are kept per key and type along with their line numbers, so the parent
+reports the lines of the wrong type exactly as a single process would.
+"""
+import io
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Callable, Iterator, NamedTuple
+
+from tcalc import instrumentation
+from tcalc.aggregate import Aggregate, Aggregator
+from tcalc.batch import (
+    LineError,
+    aggregate_records,
+    decode_error,
+    evaluate_lines,
+    line_error,
+    summarize_lines,
+)
+from tcalc.errors import EvaluatorError
+from tcalc.instrumentation import Stats
+from tcalc.output import Writer
+from tcalc.sketch import Summary
+
+CHUNK_SIZE = 1 << 20
+STDIN_BLOCK_LINES = 16384
+
+
+class Chunk(NamedTuple):
+    name: str
+    path: str | None
+    start: int
+    end: int
+    lines: list[str] | None = None
+
+    def read(self) -> list[str]:
+        if self.lines is not None:
+            return self.lines
+        with open(self.path, "rb") as fp:  # type: ignore
+            fp.seek(self.start)
+            data = fp.read(self.end - self.start)
+        try:
+            text = data.decode()
+        except UnicodeDecodeError as err:
+            raise decode_error(self.name, err) from None
+        # lines end as when reading the file in text mode, str.splitlines
+        # would also split on e.g. "\v" and "\x85"
+        return io.StringIO(text, newline=None).readlines()
+
+
+class ChunkResult(NamedTuple):
+    output: list[str | None]
+    errors: list[LineError]
+    line_count: int
+    # (key, partial aggregate, line numbers) per key and type of value
+    aggregates: list[tuple[str, Aggregate, list[int]]] | None = None
+    stats: Stats | None = None
+    summary: Summary | None = None
+
+
+def split_file(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Chunk]:
+    size = os.path.getsize(path)
+    with open(path, "rb") as fp:
+        start = 0
+        while start < size:
+            end = start + chunk_size
+            if end < size:
+                fp.seek(end)
+                fp.readline()  # move on to the end of the line
+                end = fp.tell()
+            else:
+                end = size
+            yield Chunk(path, path, start, end)
+            start = end
+
+
+def iter_chunks(files: list[str], chunk_size: int = CHUNK_SIZE) -> Iterator[Chunk]:
+    for name in files or ["-"]:
+        if name == "-":
+            while True:
+                try:
+                    lines = list(islice(sys.stdin, STDIN_BLOCK_LINES))
+                except UnicodeDecodeError as err:
+                    raise decode_error("<stdin>", err) from None
+                if not lines:
+                    break
+                yield Chunk("<stdin>", None, 0, 0, lines)
+        else:
+            yield from split_file(name, chunk_size)
+
+
+def evaluate_chunk(
+    chunk: Chunk,
+    lexer: str = "regex",
+    stats: bool = False,
+    backend: str = "decimal",
+    fmt: str = "hms",
+    shared: bool = False,
+) -> ChunkResult:
+    """
+    Evaluate the lines of `chunk`. The output holds record bodies, line
+    numbers are added by the parent process which knows where chunks start.
+    With `shared`, subexpressions are shared within the chunk.
+    """
+    if stats:
+        # collected per chunk and merged by the parent process
+        with instrumentation.collect() as collected:
+            result = evaluate_chunk(
+                chunk, lexer, backend=backend, fmt=fmt, shared=shared
+            )
+            return result._replace(stats=collected)
+
+    if (
+        chunk.path is not None
+        and lexer == "regex"
+        and instrumentation.active is None
+        and not shared
+    ):
+        return evaluate_mapped_chunk(chunk, backend, fmt)
+
+    lines = chunk.read()
+    output, errors = [], []
+    for line, error in evaluate_lines(lines, lexer, backend, fmt, shared):
+        output.append(line)
+        if error is not None:
+            errors.append(error)
+    return ChunkResult(output, errors, len(lines))
+
+
+def evaluate_mapped_chunk(
+    chunk: Chunk, backend: str = "decimal", fmt: str = "hms"
+) -> ChunkResult:
+    from tcalc.mapped import evaluate_mapped, map_file
+
+    output, errors = [], []
+    with map_file(chunk.path) as buffer:  # type: ignore
+        results = evaluate_mapped(buffer, chunk.start, chunk.end, backend, fmt)
+        for line, error in results:
+            output.append(line)
+            if error is not None:
+                errors.append(error)
+    return ChunkResult(output, errors, len(output))
+
+
+def aggregate_chunk(
+    chunk: Chunk, delimiter: str = "\t", lexer: str = "regex"
+) -> ChunkResult:
+    lines = chunk.read()
+    errors = []
+    # in the order of their first line, which decides the type of a new key
+    groups: dict[tuple[str, type], tuple[Aggregate, list[int]]] = {}
+    for lineno, key, value in aggregate_records(lines, delimiter, lexer):
+        if type(value) is LineError:
+            errors.append(value)
+            continue
+        group = groups.get((key, type(value)))
+        if group is None:
+            groups[key, type(value)] = (Aggregate(value), [lineno])  # type: ignore
+        else:
+            group[0].add(value)  # type: ignore
+            group[1].append(lineno)
+    aggregates = [
+        (key, aggregate, linenos)
+        for (key, _), (aggregate, linenos) in groups.items()
+    ]
+    return ChunkResult([], errors, len(lines), aggregates=aggregates)
+
+
+def summarize_chunk(
+    chunk: Chunk, summary: Summary, lexer: str = "regex"
+) -> ChunkResult:
+    """Summarize the lines of `chunk` into `summary`, a new one"""
+    lines = chunk.read()
+    errors = list(summarize_lines(lines, summary, lexer))
+    return ChunkResult([], errors, len(lines), summary=summary)
+
+
+def run_ordered(
+    fn: Callable[[Chunk], ChunkResult], chunks: Iterator[Chunk], jobs: int
+) -> Iterator[tuple[Chunk, ChunkResult]]:
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending: deque[tuple[Chunk, Future]] = deque()
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(fn, chunk)))
+            if len(pending) >= 2 * jobs:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+        while pending:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
+
+
+def _with_line_offsets(
+    results: Iterator[tuple[Chunk, ChunkResult]]
+) -> Iterator[tuple[Chunk, ChunkResult, int]]:
+    # chunks of one input arrive in order, a new input restarts counting
+    offset = 0
+    previous = None
+    for chunk, result in results:
+        if (chunk.name, chunk.path) != previous or (chunk.path and not chunk.start):
+            offset = 0
+        previous = (chunk.name, chunk.path)
+        yield chunk, result, offset
+        offset += result.line_count
+
+
+def evaluate_parallel(
+    files: list[str],
+    jobs: int,
+    lexer: str = "regex",
+    chunk_size: int = CHUNK_SIZE,
+    backend: str = "decimal",
+    fmt: str = "hms",
+    shared: bool = False,
+) -> int:
+    failed = 0
+    stats = instrumentation.active
+    worker = partial(
+        evaluate_chunk,
+        lexer=lexer,
+        stats=stats is not None,
+        backend=backend,
+        fmt=fmt,
+        shared=shared,
+    )
+    writer = Writer(fmt)
+    results = run_ordered(worker, iter_chunks(files, chunk_size), jobs)
+    for chunk, result, offset in _with_line_offsets(results):
+        if not offset:
+            writer.start()
+        writer.writelines(result.output)
+        if stats is not None and result.stats is not None:
+            stats.merge(result.stats)
+        for error in result.errors:
+            failed += 1
+            sys.stderr.write(error.format(chunk.name, offset))
+    writer.flush()
+
+    return 1 if failed else 0
+
+
+def aggregate_parallel(
+    files: list[str],
+    jobs: int,
+    delimiter: str = "\t",
+    lexer: str = "regex",
+    chunk_size: int = CHUNK_SIZE,
+) -> tuple[Aggregator, int]:
+    failed = 0
+    aggregator = Aggregator()
+    worker = partial(aggregate_chunk, delimiter=delimiter, lexer=lexer)
+    results = run_ordered(worker, iter_chunks(files, chunk_size), jobs)
+    for chunk, result, offset in _with_line_offsets(results):
+        errors = result.errors
+        for key, aggregate, linenos in result.aggregates:  # type: ignore
+            try:
+                aggregator.merge_group(key, aggregate)
+            except EvaluatorError as err:
+                # a single process reports every line of the other type
+                errors += [line_error(lineno, err) for lineno in linenos]
+                errors.sort()
+        for error in errors:
+            failed += 1
+            sys.stderr.write(error.format(chunk.name, offset))
+
+    return aggregator, failed
+
+
+def summarize_parallel(
+    files: list[str],
+    jobs: int,
+    summary: Summary,
+    lexer: str = "regex",
+    chunk_size: int = CHUNK_SIZE,
+) -> int:
+    """
+    Summarize `files` into `summary` in `jobs` processes, every chunk is
+    summarized into an empty copy of it and merged back. Returns the number
+    of lines that failed.
+    """
+    failed = 0
+    worker = partial(summarize_chunk, summary=summary.empty(), lexer=lexer)
+    results = run_ordered(worker, iter_chunks(files, chunk_size), jobs)
+    for chunk, result, offset in _with_line_offsets(results):
+        summary.merge(result.summary)  # type: ignore
+        for error in result.errors:
+            failed += 1
+            sys.stderr.write(error.format(chunk.name, offset))
+
+    return failed
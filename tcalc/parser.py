@@ -1,7 +1,9 @@
 """
 Expression       := Term, { ("+" | "-"), Term } ;
 Term             := Factor, { ("*" | "/") Factor } ;
-Factor           := { "-" | "+" } Factor | ValueLiteral | "(", Expression, ")" ;
+Factor           := { "-" | "+" } Factor | ValueLiteral | Variable
+                    | "(", Expression, ")" ;
+Variable         := Letter, { Letter | Digit } ;
 
 ValueLiteral     := TimeLiteral | NumberLiteral ;
 TimeLiteral      := { Digit }, ":", { Digit }, ":" { Digit };
@@ -11,15 +13,28 @@ Float            := NonZeroDigit, { Digit }, ".", Digit, { Digit } ;
 Integer          := NonZeroDigit, { Digit } | "0" ;
 Digit            := NonZeroDigit | "0" ;
 NonZeroDigit     := "1" | "2" | "3" | "4" | "5" | "6" | "7" | "8" | "9" ;
+Letter           := "A" | ... | "Z" | "a" | ... | "z" | "_" ;
 
 """
-from typing import Protocol, cast
+from typing import Protocol
 
-from tcalc.ast import AST, BinaryOperator, Time, UnaryOperator, Number
+from tcalc.ast import AST, BinaryOperator, Time, UnaryOperator, Number, Variable
 from tcalc.errors import ParserError
 from tcalc.token import Token, LUT, TokenType, is_numb
 
 
+# Binding strength of pending operators, a group is never reduced by an
+# operator but only by its closing parenthesis
+GROUP = 0
+PRECEDENCE = {
+    TokenType.PLUS: 1,
+    TokenType.MINUS: 1,
+    TokenType.MULT: 2,
+    TokenType.DIV: 2,
+}
+UNARY = 3
+
+
 class Lexer(Protocol):
     def peek(self) -> Token:
         pass
@@ -34,6 +49,8 @@ class Lexer(Protocol):
 class Parser:
     def __init__(self, lexer: Lexer) -> None:
         self._lexer = lexer
+        # column right after the last character of a literal being parsed
+        self._literal_end = 0
 
     def parse(self) -> AST:
         ast = self._parse_expression()
@@ -44,46 +61,87 @@ class Parser:
         raise ParserError(msg, self._lexer.peek().column)
 
     def _parse_expression(self) -> AST:
-        node = self._parse_term()
-
-        while self._lexer.peek().type in (TokenType.PLUS, TokenType.MINUS):
-            op = self._lexer.consume()
-            node = cast(AST, BinaryOperator(left=node, op=op, right=self._parse_term()))
-
-        return node
-
-    def _parse_term(self) -> AST:
-        node = self._parse_factor()
-
-        while self._lexer.peek().type in (TokenType.MULT, TokenType.DIV):
-            op = self._lexer.consume()
-            node = BinaryOperator(left=node, op=op, right=self._parse_factor())
-
-        return node
-
-    def _parse_factor(self) -> AST:
-        if self._lexer.peek().type is TokenType.LPAREN:
+        # Operator precedence parsing with explicit stacks instead of one
+        # recursive call per parenthesis and sign. Operands and operators
+        # alternate; pending operators are reduced once an operator of
+        # lower or equal precedence (or the end of a group) follows, which
+        # yields the same left associative tree as the grammar.
+        operands: list[AST] = []
+        operators: list[tuple[int, Token]] = []
+        depth = 0
+
+        while True:
+            token = self._lexer.peek()
+            if token.type is TokenType.LPAREN:
+                self._lexer.consume()
+                operators.append((GROUP, token))
+                depth += 1
+                continue
+            if token.type in (TokenType.MINUS, TokenType.PLUS):
+                operators.append((UNARY, self._lexer.consume()))
+                continue
+            operands.append(self._parse_operand())
+
+            while True:
+                token = self._lexer.peek()
+                if token.type in PRECEDENCE:
+                    self._reduce(operands, operators, PRECEDENCE[token.type])
+                    operators.append((PRECEDENCE[token.type], self._lexer.consume()))
+                    break
+                self._reduce(operands, operators, GROUP + 1)
+                if depth == 0:
+                    return operands.pop()
+                if token.type is not TokenType.RPAREN:
+                    raise ParserError("unmatched left parenthesis", token.column)
+                self._lexer.consume()
+                operators.pop()  # left parenthesis
+                depth -= 1
+
+    def _reduce(
+        self, operands: list[AST], operators: list[tuple[int, Token]], precedence: int
+    ) -> None:
+        while operators and GROUP != operators[-1][0] >= precedence:
+            level, op = operators.pop()
+            if level == UNARY:
+                operands[-1] = self._make_unary(op, operands[-1])
+            else:
+                right = operands.pop()
+                operands[-1] = self._make_binary(operands[-1], op, right)
+
+    # nodes are created by these methods and `_parse_operand`, subclasses
+    # override them to build another representation, see `tcalc.arena`
+
+    def _make_unary(self, op: Token, expr: AST) -> AST:
+        return UnaryOperator(op=op, expr=expr)
+
+    def _make_binary(self, left: AST, op: Token, right: AST) -> AST:
+        return BinaryOperator(left=left, op=op, right=right)
+
+    def _parse_operand(self) -> AST:
+        token = self._lexer.peek()
+        if token.type is TokenType.NUMBER:
+            return Number(self._lexer.consume().value)
+        elif token.type is TokenType.TIME:
+            hours, minutes, seconds = self._lexer.consume().value.split(":")
+            return Time(hours=hours, minutes=minutes, seconds=seconds)
+        elif token.type is TokenType.NAME:
             self._lexer.consume()
-            node = self._parse_expression()
-            token = self._lexer.consume()
-            if token.type is not TokenType.RPAREN:
-                raise ParserError("unmatched left parenthesis", token.column)
+            return Variable(token.value, token.column)
         elif (
-            is_numb(self._lexer.peek())
-            or self._lexer.peek().type is TokenType.DOT
-            or self._lexer.peek().type is TokenType.COLON
+            is_numb(token)
+            or token.type is TokenType.DOT
+            or token.type is TokenType.COLON
         ):
-            node = self._parse_value_literal()
-        elif self._lexer.peek().type in (TokenType.MINUS, TokenType.PLUS):
-            sign = self._lexer.consume()
-            node = cast(AST, UnaryOperator(op=sign, expr=self._parse_factor()))
-        else:
-            raise ParserError("invalid syntax", self._lexer.peek().column)
+            return self._parse_value_literal()
+        raise ParserError("invalid syntax", token.column)
 
-        return node
+    # literals of single characters, as the char lexer scans them; they end
+    # at the first character that does not follow right after the previous
+    # one, "1 2" is not 12
 
     def _parse_value_literal(self) -> Number | Time:
         token = self._lexer.peek()
+        self._literal_end = token.column
 
         if token.type is TokenType.DOT:
             return self._parse_numeric_literal()
@@ -94,8 +152,7 @@ class Parser:
         if is_numb(token):
             numb = self._parse_number()
 
-        token = self._lexer.peek()
-        if token.type is not TokenType.COLON:
+        if not self._adjacent(TokenType.COLON):
             return numb
 
         hours = numb.value
@@ -108,13 +165,13 @@ class Parser:
         hours: list[str] = []
         minutes: list[str] = []
         seconds: list[str] = []
-        while is_numb(self._lexer.peek()):
+        while self._adjacent_digit():
             hours.append(self._parse_digit())
-        self._lexer.consume()  # colon
-        while is_numb(self._lexer.peek()):
+        self._parse_colon()
+        while self._adjacent_digit():
             minutes.append(self._parse_digit())
-        self._lexer.consume()  # colon
-        while is_numb(self._lexer.peek()):
+        self._parse_colon()
+        while self._adjacent_digit():
             seconds.append(self._parse_digit())
         value = Time(
             hours="".join(hours),
@@ -129,22 +186,40 @@ class Parser:
 
     def _parse_number(self) -> Number:
         digits: list[str] = []
-        while is_numb(self._lexer.peek()):
+        while self._adjacent_digit():
             digits.append(self._parse_digit())
-        if self._lexer.peek().type is TokenType.DOT:
-            self._lexer.consume()
+        if self._adjacent(TokenType.DOT):
+            self._consume_char()
             digits.append(".")
-            while is_numb(self._lexer.peek()):
+            while self._adjacent_digit():
                 digits.append(self._parse_digit())
         value = "".join(digits)
         return Number(value)
 
+    def _parse_colon(self) -> None:
+        if not self._adjacent(TokenType.COLON):
+            raise ParserError("invalid syntax", self._lexer.peek().column)
+        self._consume_char()
+
     def _parse_digit(self) -> str:
         if self._lexer.peek().type is TokenType.ZERO:
-            self._lexer.consume()
+            self._consume_char()
             return "0"
         return self._parse_non_zero_digit()
 
     def _parse_non_zero_digit(self) -> str:
-        token = self._lexer.consume()
+        token = self._consume_char()
         return LUT.Token2Char[token.type]
+
+    def _adjacent(self, token_type: TokenType) -> bool:
+        token = self._lexer.peek()
+        return token.type is token_type and token.column == self._literal_end
+
+    def _adjacent_digit(self) -> bool:
+        token = self._lexer.peek()
+        return is_numb(token) and token.column == self._literal_end
+
+    def _consume_char(self) -> Token:
+        token = self._lexer.consume()
+        self._literal_end = token.column + 1
+        return token
@@ -0,0 +1,101 @@
+"""
+The `tcalc serve` daemon.
+
+An asyncio server on a Unix domain socket. The interpreter, the imported
+modules and the cache of compiled expressions stay warm between
+requests. Every connection may pipeline any number of requests, each
+one is answered in order; see `tcalc.client` for the protocol.
+Evaluation itself is synchronous, concurrent clients are served in turn.
+"""
+import asyncio
+import os
+import signal
+import socket
+import stat
+import sys
+
+from tcalc.batch import calculate, line_error
+from tcalc.client import default_socket_path
+from tcalc.errors import Error
+
+LINE_LIMIT = 1 << 20
+
+
+def respond(expr: str, lexer: str = "regex") -> str:
+    try:
+        result = calculate(expr, lexer)
+    except (Error, ArithmeticError) as err:
+        error = line_error(0, err)
+        msg = error.msg.replace("\n", " ")
+        return f"error\t{error.kind}\t{error.column}\t{msg}\n"
+    return f"ok\t{result}\n"
+
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:  # longer than LINE_LIMIT
+                writer.write(b"error\tValueError\t-1\trequest too long\n")
+                break
+            if not line:
+                break
+            expr = line.decode(errors="replace").rstrip("\r\n")
+            writer.write(respond(expr).encode())
+            # only waits once a client that does not read its responses
+            # filled the write buffer
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+def _in_use(path: str) -> bool:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        return False
+    finally:
+        sock.close()
+    return True
+
+
+async def start_server(path: str) -> asyncio.AbstractServer:
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        pass
+    else:
+        if not stat.S_ISSOCK(mode):
+            raise OSError(f"{path} exists and is not a socket")
+        if _in_use(path):
+            raise OSError(f"tcalc daemon already listening on {path}")
+        os.unlink(path)  # left behind by a daemon that was killed
+    return await asyncio.start_unix_server(handle, path, limit=LINE_LIMIT)
+
+
+async def serve(path: str) -> None:
+    server = await start_server(path)
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def main(path: str | None = None) -> int:
+    path = path or default_socket_path()
+    try:
+        asyncio.run(serve(path))
+    except OSError as err:
+        sys.stderr.write(f"{err}\n")
+        return 1
+    return 0
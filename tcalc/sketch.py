@@ -0,0 +1,228 @@
+"""
+Quantiles and histograms of streams of durations in constant memory.
+
+A `Summary` keeps, for any number of durations:
+
+  * count, sum, minimum and maximum, exact as integers of ticks;
+  * a `QuantileSketch` answering quantiles such as p99 within a relative
+    error of `alpha`, 1% by default;
+  * a `Histogram` counting the durations per fixed bucket.
+
+The sketch is a DDSketch: a duration of `t` ticks is counted in the bin
+`ceil(log(|t|) / log(gamma))` with `gamma = (1 + alpha) / (1 - alpha)`,
+negative durations in bins of their own. Any bin's midpoint is within
+`alpha` of every duration it counts, and 2048 bins span a microsecond to
+more than a million years at 1%. Should a stream need more than
+`max_bins`, the bins of the shortest durations are collapsed into one,
+which keeps memory bounded and only loses accuracy at the low end.
+
+Everything is counted, so summaries of parts of a stream, e.g. of files
+or worker processes, `merge` into exactly the summary of the whole.
+"""
+import math
+from bisect import bisect_left
+from decimal import Decimal
+from typing import Any, Iterable, Iterator
+
+from tcalc.expression import TICKS_PER_SECOND, Time
+
+DEFAULT_ALPHA = 0.01
+DEFAULT_MAX_BINS = 2048
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+# upper bounds of the default histogram buckets, in seconds
+DEFAULT_BUCKETS = (1, 10, 60, 300, 900, 1800, 3600, 7200, 14400, 28800, 86400)
+
+
+class QuantileSketch:
+    __slots__ = ("alpha", "max_bins", "count", "zeros", "positive", "negative")
+
+    def __init__(
+        self, alpha: float = DEFAULT_ALPHA, max_bins: int = DEFAULT_MAX_BINS
+    ) -> None:
+        if not 0 < alpha < 1:
+            raise ValueError("alpha must be between 0 and 1")
+        self.alpha = alpha
+        self.max_bins = max_bins
+        self.count = 0
+        self.zeros = 0
+        # bin index -> count, of positive durations and of negated negatives
+        self.positive: dict[int, int] = {}
+        self.negative: dict[int, int] = {}
+
+    @property
+    def gamma(self) -> float:
+        return (1 + self.alpha) / (1 - self.alpha)
+
+    def add(self, ticks: int, count: int = 1) -> None:
+        self.count += count
+        if ticks == 0:
+            self.zeros += count
+            return
+        bins = self.positive if ticks > 0 else self.negative
+        index = math.ceil(math.log(abs(ticks)) / math.log(self.gamma))
+        bins[index] = bins.get(index, 0) + count
+        if len(bins) > self.max_bins:
+            _collapse(bins, self.max_bins)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.alpha != self.alpha:
+            raise ValueError("cannot merge sketches of different accuracy")
+        self.count += other.count
+        self.zeros += other.zeros
+        for bins, others in zip(
+            (self.positive, self.negative), (other.positive, other.negative)
+        ):
+            for index, count in others.items():
+                bins[index] = bins.get(index, 0) + count
+            if len(bins) > self.max_bins:
+                _collapse(bins, self.max_bins)
+
+    def quantile(self, q: float) -> float:
+        """Ticks of the `q` quantile, 0 <= q <= 1, NaN if nothing was added"""
+        if not 0 <= q <= 1:
+            raise ValueError("quantile must be between 0 and 1")
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for ticks, count in self._bins():
+            seen += count
+            if seen > rank:
+                return ticks
+        assert False, "unreachable line"
+
+    def _bins(self) -> Iterator[tuple[float, int]]:
+        """(representative ticks, count) of every bin in ascending order"""
+        gamma = self.gamma
+        for index in sorted(self.negative, reverse=True):
+            yield -2 * gamma**index / (gamma + 1), self.negative[index]
+        if self.zeros:
+            yield 0.0, self.zeros
+        for index in sorted(self.positive):
+            yield 2 * gamma**index / (gamma + 1), self.positive[index]
+
+
+def _collapse(bins: dict[int, int], max_bins: int) -> None:
+    # fold the bins of the shortest durations into the smallest one kept
+    indexes = sorted(bins)
+    excess = indexes[: len(indexes) - max_bins + 1]
+    total = sum(bins.pop(index) for index in excess)
+    bins[excess[-1]] = total
+
+
+class Histogram:
+    """Counts per bucket, bucket i holds bounds[i-1] < ticks <= bounds[i]"""
+
+    __slots__ = ("bounds", "counts")
+
+    def __init__(self, bounds: Iterable[int]) -> None:
+        self.bounds = sorted(set(bounds))
+        # one more bucket for the durations above the last bound
+        self.counts = [0] * (len(self.bounds) + 1)
+
+    def add(self, ticks: int, count: int = 1) -> None:
+        self.counts[bisect_left(self.bounds, ticks)] += count
+
+    def merge(self, other: "Histogram") -> None:
+        if other.bounds != self.bounds:
+            raise ValueError("cannot merge histograms of different buckets")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+
+    def __iter__(self) -> Iterator[tuple[int | None, int]]:
+        """(upper bound, count) of every bucket, None for the last one"""
+        return zip([*self.bounds, None], self.counts)
+
+
+class Summary:
+    __slots__ = ("count", "total", "minimum", "maximum", "sketch", "histogram")
+
+    def __init__(
+        self,
+        buckets: Iterable[int] | None = None,
+        alpha: float = DEFAULT_ALPHA,
+        max_bins: int = DEFAULT_MAX_BINS,
+    ) -> None:
+        """`buckets` are the upper bounds of the histogram in ticks"""
+        if buckets is None:
+            buckets = (seconds * TICKS_PER_SECOND for seconds in DEFAULT_BUCKETS)
+        self.count = 0
+        self.total = 0
+        self.minimum: int | None = None
+        self.maximum: int | None = None
+        self.sketch = QuantileSketch(alpha, max_bins)
+        self.histogram = Histogram(buckets)
+
+    def empty(self) -> "Summary":
+        """A new summary with the same buckets and accuracy"""
+        return Summary(self.histogram.bounds, self.sketch.alpha, self.sketch.max_bins)
+
+    def add(self, value: Time) -> None:
+        ticks = value.ticks
+        self.count += 1
+        self.total += ticks
+        if self.minimum is None or ticks < self.minimum:
+            self.minimum = ticks
+        if self.maximum is None or ticks > self.maximum:
+            self.maximum = ticks
+        self.sketch.add(ticks)
+        self.histogram.add(ticks)
+
+    def merge(self, other: "Summary") -> None:
+        if (
+            other.sketch.alpha != self.sketch.alpha
+            or other.histogram.bounds != self.histogram.bounds
+        ):
+            raise ValueError("cannot merge summaries of different settings")
+        self.sketch.merge(other.sketch)
+        self.histogram.merge(other.histogram)
+        self.count += other.count
+        self.total += other.total
+        if other.minimum is not None:
+            if self.minimum is None or other.minimum < self.minimum:
+                self.minimum = other.minimum
+            if self.maximum is None or other.maximum > self.maximum:  # type: ignore
+                self.maximum = other.maximum
+
+    def quantile(self, q: float) -> Time | None:
+        """The `q` quantile, clamped to the exact minimum and maximum"""
+        minimum, maximum = self.minimum, self.maximum
+        if minimum is None or maximum is None:
+            return None  # nothing added
+        if q == 0 or q == 1:
+            ticks = minimum if q == 0 else maximum
+        else:
+            ticks = min(max(round(self.sketch.quantile(q)), minimum), maximum)
+        return Time.from_ticks(ticks)
+
+    @property
+    def mean(self) -> Decimal | Time | None:
+        if not self.count:
+            return None
+        return Time.from_ticks(self.total) / Decimal(self.count)
+
+    def as_dict(
+        self, quantiles: Iterable[float] = DEFAULT_QUANTILES
+    ) -> dict[str, Any]:
+        def text(ticks: int | None) -> str | None:
+            return str(Time.from_ticks(ticks)) if ticks is not None else None
+
+        return {
+            "count": self.count,
+            "sum": text(self.total),
+            "min": text(self.minimum),
+            "max": text(self.maximum),
+            "mean": str(self.mean) if self.count else None,
+            "quantiles": {
+                quantile_name(q): str(self.quantile(q)) if self.count else None
+                for q in quantiles
+            },
+            "histogram": [
+                {"le": text(bound), "count": count}
+                for bound, count in self.histogram
+            ],
+        }
+
+
+def quantile_name(q: float) -> str:
+    """p50 for 0.5, p99.9 for 0.999"""
+    return f"p{q * 100:g}"
@@ -0,0 +1,128 @@
+"""
+Evaluation of an expression for every row of a CSV or TSV table.
+
+The first row names the columns, the expression refers to them as
+variables and its result is appended to every row as a new column:
+
+    $ tcalc --csv shifts.csv "planned - (actual + break)"
+
+The expression is compiled once. Only the columns it refers to are
+converted, directly into values of the numeric backend without going
+through the lexer:
+
+  [+-]H:M:S    a duration, each part may be empty or have decimals,
+               e.g. 8:30:00, :45: or 1.5::
+  [+-]H:M      a duration of hours and minutes, as spreadsheets export
+  [+-]N        a number, e.g. 3 or 0.25
+
+Rows are read and written one at a time, so memory does not grow with
+the size of the table. Rows that fail get an empty result column.
+"""
+import csv
+import re
+from typing import IO, Any, Iterable, Iterator
+
+from tcalc.ast import variable_column
+from tcalc.backends import Backend
+from tcalc.batch import LineError, line_error
+from tcalc.compiled import CompiledExpression
+from tcalc.errors import Error, EvaluatorError
+from tcalc.output import HMS, Format
+
+PART = r"(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+)?"
+CELL_TIME = re.compile(rf"\s*([+-]?)({PART}):({PART})(?::({PART}))?\s*")
+CELL_NUMBER = re.compile(r"\s*([+-]?)([0-9]+(?:\.[0-9]*)?|\.[0-9]+)\s*")
+
+
+def delimiter_for(path: str) -> str:
+    return "\t" if path.lower().endswith((".tsv", ".tab")) else ","
+
+
+def parse_cell(text: str, backend: Backend) -> Any:
+    """Value of a cell, raises ValueError if it is neither a time nor a number"""
+    match = CELL_TIME.fullmatch(text)
+    if match is not None:
+        sign, hours, minutes, seconds = match.groups()
+        value = backend.time(hours or "0", minutes or "0", seconds or "0")
+    else:
+        match = CELL_NUMBER.fullmatch(text)
+        if match is None:
+            raise ValueError(f"not a time or number: {text!r}")
+        sign, number = match.groups()
+        value = backend.number(number)
+    return -value if sign == "-" else value
+
+
+def bind_columns(header: list[str], compiled: CompiledExpression) -> dict[str, int]:
+    """
+    Index of the column of every variable of `compiled`, raises an
+    `EvaluatorError` at the first variable there is no column for.
+    """
+    indexes = {name.strip(): index for index, name in enumerate(header)}
+    columns = {}
+    for name in sorted(compiled.variables):
+        if name not in indexes:
+            column = variable_column(compiled.ast, name)
+            raise EvaluatorError(f"undefined variable {name}", column)
+        columns[name] = indexes[name]
+    return columns
+
+
+def evaluate_rows(
+    rows: Iterable[list[str]],
+    compiled: CompiledExpression,
+    columns: dict[str, int],
+    fmt: Format = HMS,
+) -> Iterator[tuple[list[str], Exception | None]]:
+    """Yield every row with the result appended and its error, if any"""
+    backend = compiled.backend
+    for row in rows:
+        try:
+            variables = {}
+            for name, index in columns.items():
+                if index >= len(row):
+                    raise ValueError(f"missing column {name}")
+                try:
+                    variables[name] = parse_cell(row[index], backend)
+                except ValueError as err:
+                    raise ValueError(f"column {name}: {err}") from None
+            result = compiled.evaluate(**variables)
+        except (Error, ArithmeticError, ValueError) as err:
+            row.append("")
+            yield row, err
+        else:
+            row.append(fmt.result(result).rstrip("\n"))
+            yield row, None
+
+
+def row_error(lineno: int, err: Exception) -> LineError:
+    if isinstance(err, ValueError):
+        return LineError(lineno, -1, "ValueError", str(err))
+    return line_error(lineno, err)
+
+
+def evaluate_table(
+    stream: IO[str],
+    out: IO[str],
+    compiled: CompiledExpression,
+    delimiter: str = ",",
+    column: str = "result",
+    fmt: Format = HMS,
+) -> Iterator[LineError]:
+    """
+    Copy the table `stream` to `out` with a result column named `column`
+    appended and yield the errors of rows that failed. Raises the
+    `EvaluatorError` of `bind_columns` before anything is written.
+    """
+    reader = csv.reader(stream, delimiter=delimiter)
+    writer = csv.writer(out, delimiter=delimiter, lineterminator="\n")
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = bind_columns(header, compiled)
+    writer.writerow(header + [column])
+    for row, err in evaluate_rows(reader, compiled, columns, fmt):
+        writer.writerow(row)
+        if err is not None:
+            yield row_error(reader.line_num, err)
+
@@ -25,6 +25,10 @@ class TokenType(Enum):
     # Seperators
     DOT = auto()
     COLON = auto()
+    # Literals
+    NUMBER = auto()
+    TIME = auto()
+    NAME = auto()
     # EOF
     EOF = auto()
 
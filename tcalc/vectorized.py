@@ -0,0 +1,157 @@
+"""
+Evaluate a compiled expression over NumPy arrays.
+
+The AST is walked once per call and every operator is applied to whole
+arrays, so the cost per row is a handful of NumPy element operations
+instead of a full tree walk on Decimal and Time objects.
+
+Variables are bound by keyword. Arrays are interpreted by their dtype:
+
+  timedelta64        durations
+  integer            durations in seconds
+  floating           numbers
+
+Scalars follow the usual tcalc types: `tcalc.expression.Time` is a
+duration, `Decimal`, `int` and `float` are numbers. The values of the
+other numeric backends, e.g. constants folded by `compile(expr,
+backend="fraction")`, are accepted as well.
+
+Durations are held as int64 microsecond ticks, the resolution of
+`tcalc.expression.Time`, and numbers as float64. The same rules as for
+scalar evaluation apply: durations can be added to and subtracted from
+durations, multiplied and divided by numbers, and a duration divided by a
+duration is a number. Duration results are returned as
+`timedelta64[us]` arrays, number results as float64 arrays.
+"""
+from decimal import Decimal
+from fractions import Fraction
+from typing import Any, NamedTuple
+
+import numpy as np
+
+from tcalc.ast import (
+    AST,
+    BinaryOperator,
+    Constant,
+    Time,
+    UnaryOperator,
+    Number,
+    Variable,
+    postorder,
+)
+from tcalc.backends import DECIMAL, Fixed, FixedTime, ScalarTime
+from tcalc.compiled import CompiledExpression, compile
+from tcalc.errors import EvaluatorError
+from tcalc.expression import TICKS_PER_SECOND, Time as TimeExpr
+from tcalc.token import TokenType
+
+TIME = "time"
+NUMBER = "number"
+
+
+class ArrayValue(NamedTuple):
+    kind: str
+    data: Any
+
+
+class ArrayEvaluator:
+    def __init__(self, variables: dict[str, ArrayValue]) -> None:
+        self.variables = variables
+
+    def visit(self, ast: AST) -> ArrayValue:
+        values: list[ArrayValue] = []
+        for node in postorder(ast):
+            if type(node) is BinaryOperator:
+                right = values.pop()
+                left = values.pop()
+                values.append(self._binary(node, left, right))
+            elif type(node) is UnaryOperator:
+                if node.op.type is TokenType.MINUS:
+                    value = values.pop()
+                    values.append(ArrayValue(value.kind, -value.data))
+                elif node.op.type is not TokenType.PLUS:
+                    assert False, "unreachable line"
+            else:
+                values.append(self._value(node))
+        return values.pop()
+
+    def _binary(
+        self, ast: BinaryOperator, left: ArrayValue, right: ArrayValue
+    ) -> ArrayValue:
+        if ast.op.type is TokenType.PLUS:
+            if left.kind is right.kind:
+                return ArrayValue(left.kind, left.data + right.data)
+        elif ast.op.type is TokenType.MINUS:
+            if left.kind is right.kind:
+                return ArrayValue(left.kind, left.data - right.data)
+        elif ast.op.type is TokenType.MULT:
+            if left.kind is NUMBER and right.kind is NUMBER:
+                return ArrayValue(NUMBER, left.data * right.data)
+            elif left.kind is TIME and right.kind is NUMBER:
+                return ArrayValue(TIME, _round(left.data * right.data))
+            elif left.kind is NUMBER and right.kind is TIME:
+                return ArrayValue(TIME, _round(left.data * right.data))
+        elif ast.op.type is TokenType.DIV:
+            if np.any(right.data == 0):
+                raise ZeroDivisionError("division by zero")
+            if left.kind is TIME and right.kind is NUMBER:
+                return ArrayValue(TIME, _round(left.data / right.data))
+            elif left.kind is right.kind:
+                return ArrayValue(NUMBER, np.true_divide(left.data, right.data))
+        else:
+            assert False, "unreachable line"
+        msg = f"unsupported operands for {ast.op.value}"
+        raise EvaluatorError(msg, ast.op.column)
+
+    def _value(self, ast: AST) -> ArrayValue:
+        if type(ast) is Number:
+            return ArrayValue(NUMBER, np.float64(ast.value))
+        elif type(ast) is Constant:
+            return bind(ast.value)
+        elif type(ast) is Variable:
+            try:
+                return self.variables[ast.name]
+            except KeyError:
+                raise EvaluatorError(f"undefined variable {ast.name}", ast.column)
+        elif type(ast) is Time:
+            time = TimeExpr(
+                Decimal(ast.hours),
+                Decimal(ast.minutes),
+                Decimal(ast.seconds),
+            )
+            return ArrayValue(TIME, np.int64(time.ticks))
+        else:
+            assert False, "unreachable line"
+
+
+def _round(ticks: Any) -> Any:
+    return np.rint(ticks).astype(np.int64)
+
+
+def bind(value: Any) -> ArrayValue:
+    if isinstance(value, (TimeExpr, ScalarTime, FixedTime)):
+        return ArrayValue(TIME, np.int64(value.ticks))
+    if isinstance(value, (Decimal, Fraction, Fixed, int, float)):
+        # a number of any backend, as a Decimal first
+        return ArrayValue(NUMBER, np.float64(DECIMAL.coerce(value)))
+
+    data = np.asarray(value)
+    if data.dtype.kind == "m":
+        return ArrayValue(TIME, data.astype("timedelta64[us]").view(np.int64))
+    if data.dtype.kind in "iu":
+        return ArrayValue(TIME, data.astype(np.int64) * TICKS_PER_SECOND)
+    if data.dtype.kind == "f":
+        return ArrayValue(NUMBER, data.astype(np.float64))
+    raise TypeError(f"Unsupported array type: {data.dtype}")
+
+
+def evaluate_array(expr: CompiledExpression | str, /, **variables: Any) -> Any:
+    if isinstance(expr, str):
+        expr = compile(expr)
+
+    bound = {name: bind(value) for name, value in variables.items()}
+    result = ArrayEvaluator(bound).visit(expr.ast)
+
+    if result.kind is TIME:
+        return np.asarray(result.data, dtype=np.int64).view("timedelta64[us]")
+    return np.asarray(result.data, dtype=np.float64)
@@ -0,0 +1,60 @@
+from decimal import Decimal
+from typing import Mapping
+
+from tcalc.bytecode import (
+    ADD,
+    BINARY_SYMBOLS,
+    CONST,
+    DIV,
+    LOAD,
+    MUL,
+    NEG,
+    SUB,
+    Code,
+)
+from tcalc.errors import EvaluatorError
+from tcalc.expression import Time
+
+
+def execute(
+    code: Code, variables: Mapping[str, Decimal | Time] | None = None
+) -> Decimal | Time:
+    constants = code.constants
+    stack: list[Decimal | Time] = []
+    push = stack.append
+    pop = stack.pop
+    pc = -1
+    try:
+        for opcode, arg in code.instructions:
+            pc += 1
+            if opcode == CONST:
+                push(constants[arg])
+            elif opcode == ADD:
+                right = pop()
+                stack[-1] = stack[-1] + right  # type: ignore
+            elif opcode == SUB:
+                right = pop()
+                stack[-1] = stack[-1] - right  # type: ignore
+            elif opcode == MUL:
+                right = pop()
+                stack[-1] = stack[-1] * right  # type: ignore
+            elif opcode == DIV:
+                right = pop()
+                stack[-1] = stack[-1] / right  # type: ignore
+            elif opcode == NEG:
+                stack[-1] = -stack[-1]
+            elif opcode == LOAD:
+                push(variables[arg])  # type: ignore
+            else:
+                assert False, "unreachable line"
+    except TypeError:
+        opcode, arg = code.instructions[pc]
+        if opcode == LOAD:
+            raise EvaluatorError(f"undefined variable {arg}", code.columns[pc])
+        msg = f"unsupported operands for {BINARY_SYMBOLS[opcode]}"
+        raise EvaluatorError(msg, code.columns[pc])
+    except KeyError:
+        _, arg = code.instructions[pc]
+        raise EvaluatorError(f"undefined variable {arg}", code.columns[pc])
+
+    return stack[-1]
@@ -0,0 +1,257 @@
+"""
+Worksheets: named expressions that refer to each other.
+
+    shift = 8:: - 0:30:
+    week = shift * 5
+
+Every line is compiled once and the names it refers to form a dependency
+graph. When a definition changes only that line and the lines that depend
+on it, directly or through other lines, are evaluated again, in
+dependency order. Lines may refer to names defined further down; a name
+that is never defined is an error of the lines using it, as is a line
+that depends on itself.
+
+Lines without a name are evaluated like any other line but cannot be
+referred to. Blank lines and lines starting with "#" are ignored.
+"""
+import re
+from decimal import Decimal
+from typing import Iterable, Iterator, Mapping, NamedTuple
+
+from tcalc.ast import variable_column
+from tcalc.compiled import CompiledExpression, compile
+from tcalc.errors import Error, EvaluatorError
+from tcalc.expression import Time
+
+ASSIGNMENT = re.compile(r"\s*([A-Za-z_][A-Za-z0-9_]*)\s*=")
+
+
+class Definition(NamedTuple):
+    """A line of a worksheet, `key` is its name or its line number"""
+
+    key: str
+    name: str | None
+    source: str
+    lineno: int = 1
+    offset: int = 0  # of `source` in the line, for error columns
+
+
+def parse_line(line: str, lineno: int = 1) -> Definition | None:
+    text = line.rstrip("\r\n")
+    if not text.strip() or text.lstrip().startswith("#"):
+        return None
+    match = ASSIGNMENT.match(text)
+    if match is None:
+        return Definition(str(lineno), None, text, lineno)
+    name = match.group(1)
+    return Definition(name, name, text[match.end() :], lineno, match.end())
+
+
+def parse_sheet(lines: Iterable[str]) -> dict[str, Definition]:
+    definitions = {}
+    for lineno, line in enumerate(lines, 1):
+        definition = parse_line(line, lineno)
+        if definition is not None:
+            definitions[definition.key] = definition
+    return definitions
+
+
+class Cell:
+    def __init__(self, definition: Definition, compiled: CompiledExpression | None):
+        self.definition = definition
+        self.compiled = compiled
+        self.value: Decimal | Time | None = None
+        self.error: Exception | None = None
+
+    @property
+    def dependencies(self) -> frozenset[str]:
+        return self.compiled.variables if self.compiled is not None else frozenset()
+
+
+class Worksheet:
+    def __init__(
+        self,
+        lexer: str = "regex",
+        backend: str = "decimal",
+        compiled: Mapping[str, CompiledExpression] | None = None,
+    ) -> None:
+        self.lexer = lexer
+        self.backend = backend
+        # sources compiled ahead, e.g. loaded from `tcalc.diskcache`
+        self.compiled = compiled if compiled is not None else {}
+        self.cells: dict[str, Cell] = {}
+        # name -> keys of the cells referring to it, defined or not
+        self.dependents: dict[str, set[str]] = {}
+        self.evaluations = 0
+
+    def __getitem__(self, name: str) -> Decimal | Time:
+        cell = self.cells[name]
+        if cell.error is not None:
+            raise cell.error
+        return cell.value  # type: ignore
+
+    def values(self) -> dict[str, Decimal | Time]:
+        return {
+            cell.definition.name: cell.value  # type: ignore
+            for cell in self.cells.values()
+            if cell.definition.name is not None and cell.error is None
+        }
+
+    def define(self, definition: Definition) -> list[str]:
+        """Add or replace a line and return the keys evaluated again"""
+        self._set(definition)
+        return self._update({definition.key})
+
+    def remove(self, key: str) -> list[str]:
+        self._remove(key)
+        return self._update({key})
+
+    def load(self, lines: Iterable[str]) -> list[str]:
+        """
+        Replace the whole sheet by `lines`, lines whose text did not change
+        keep their values unless something they depend on changed.
+        """
+        definitions = parse_sheet(lines)
+        changed = set()
+        for key in list(self.cells):
+            if key not in definitions:
+                self._remove(key)
+                changed.add(key)
+        for key, definition in definitions.items():
+            cell = self.cells.get(key)
+            if cell is None or cell.definition.source != definition.source:
+                self._set(definition)
+                changed.add(key)
+            elif cell.definition != definition:
+                cell.definition = definition  # moved to another line
+        # keep the order of the file
+        self.cells = {key: self.cells[key] for key in definitions}
+        return self._update(changed)
+
+    def evaluate(self, expr: str) -> Decimal | Time:
+        """Evaluate `expr` with the values of the sheet, without adding it"""
+        cell = Cell(Definition("", None, expr), self._compile(expr))
+        return self._evaluate(cell)
+
+    def compiled_cells(self) -> list[CompiledExpression]:
+        """The compiled expressions of the lines that compiled"""
+        return [cell.compiled for cell in self.cells.values() if cell.compiled]
+
+    def _compile(self, source: str) -> CompiledExpression:
+        compiled = self.compiled.get(source)
+        if compiled is not None:
+            return compiled
+        return compile(source, lexer=self.lexer, backend=self.backend)
+
+    def _set(self, definition: Definition) -> None:
+        if definition.key in self.cells:
+            self._unlink(definition.key)  # replaced in place, keeping its order
+        try:
+            cell = Cell(definition, self._compile(definition.source))
+        except Error as err:
+            cell = Cell(definition, None)
+            cell.error = err
+        self.cells[definition.key] = cell
+        for name in cell.dependencies:
+            self.dependents.setdefault(name, set()).add(definition.key)
+
+    def _remove(self, key: str) -> None:
+        self._unlink(key)
+        del self.cells[key]
+
+    def _unlink(self, key: str) -> None:
+        for name in self.cells[key].dependencies:
+            self.dependents[name].discard(key)
+
+    def _update(self, changed: set[str]) -> list[str]:
+        dirty = set()
+        stack = list(changed)
+        while stack:
+            key = stack.pop()
+            if key in dirty:
+                continue
+            dirty.add(key)
+            cell = self.cells.get(key)
+            if cell is not None and cell.definition.name is not None:
+                stack.extend(self.dependents.get(cell.definition.name, ()))
+            elif cell is None:
+                stack.extend(self.dependents.get(key, ()))
+        dirty &= self.cells.keys()
+        affected = set(dirty)
+
+        for key in self._order(dirty):
+            cell = self.cells[key]
+            if key in dirty:
+                # part of a cycle
+                cell.value = None
+                cell.error = EvaluatorError("circular reference", -1)
+                continue
+            if cell.compiled is None:
+                continue
+            try:
+                cell.value, cell.error = self._evaluate(cell), None
+            except (Error, ArithmeticError) as err:
+                cell.value, cell.error = None, err
+        return [key for key in self.cells if key in affected]
+
+    def _order(self, dirty: set[str]) -> Iterator[str]:
+        """
+        Yield `dirty` in dependency order and remove them from it, the keys
+        in a cycle are yielded before the keys depending on them and remain
+        in `dirty`
+        """
+        pending = {}
+        for key in dirty:
+            pending[key] = {
+                dependency
+                for dependency in self.cells[key].dependencies
+                if dependency in dirty and dependency in self.cells
+            }
+        ready = [key for key, waiting in pending.items() if not waiting]
+        while pending:
+            if ready:
+                keys = [ready.pop()]
+                dirty.discard(keys[0])
+            else:
+                # only cycles and the keys depending on them are left
+                keys = [key for key in pending if _in_cycle(key, pending)]
+            for key in keys:
+                del pending[key]
+                yield key
+            for key in keys:
+                name = self.cells[key].definition.name
+                for dependent in self.dependents.get(name, ()) if name else ():
+                    waiting = pending.get(dependent)
+                    if waiting is not None and key in waiting:
+                        waiting.discard(key)
+                        if not waiting:
+                            ready.append(dependent)
+
+    def _evaluate(self, cell: Cell) -> Decimal | Time:
+        self.evaluations += 1
+        compiled: CompiledExpression = cell.compiled  # type: ignore
+        values = {}
+        for name in compiled.variables:
+            dependency = self.cells.get(name)
+            if dependency is None:
+                continue  # reported as undefined
+            if dependency.error is not None:
+                column = variable_column(compiled.ast, name)
+                raise EvaluatorError(f"{name} has an error", column)
+            values[name] = dependency.value
+        return compiled.evaluate(**values)  # type: ignore
+
+
+
+def _in_cycle(key: str, pending: Mapping[str, set[str]]) -> bool:
+    """Whether `key` depends on itself through the `pending` dependencies"""
+    seen = set()
+    stack = list(pending[key])
+    while stack:
+        dependency = stack.pop()
+        if dependency == key:
+            return True
+        if dependency not in seen:
+            seen.add(dependency)
+            stack.extend(pending.get(dependency, ()))
+    return False
@@ -0,0 +1,40 @@
+import unittest
+from decimal import Decimal
+
+from tcalc.aggregate import Aggregator
+from tcalc.errors import EvaluatorError
+from tcalc.expression import Time
+
+
+class TestAggregator(unittest.TestCase):
+    def test_running_totals(self):
+        aggregator = Aggregator()
+        for key, seconds in (("a", 30), ("b", 5), ("a", -10), ("a", 40)):
+            aggregator.add(key, Time(0, 0, seconds))
+        a = aggregator.groups["a"]
+        self.assertEqual(a.count, 3)
+        self.assertEqual(a.total, Time(0, 1, 0))
+        self.assertEqual(a.minimum, Time(0, 0, 10, sign=True))
+        self.assertEqual(a.maximum, Time(0, 0, 40))
+        self.assertEqual(a.mean, Time(0, 0, 20))
+        self.assertEqual(len(aggregator), 2)
+
+    def test_merge(self):
+        left, right, whole = Aggregator(), Aggregator(), Aggregator()
+        values = [("a", Decimal(n)) for n in range(10)] + [("b", Decimal(-1))]
+        for i, (key, value) in enumerate(values):
+            (left if i % 2 else right).add(key, value)
+            whole.add(key, value)
+        left.merge(right)
+        for key, expected in whole:
+            merged = left.groups[key]
+            self.assertEqual(
+                (merged.count, merged.total, merged.minimum, merged.maximum),
+                (expected.count, expected.total, expected.minimum, expected.maximum),
+            )
+
+    def test_mixed_types(self):
+        aggregator = Aggregator()
+        aggregator.add("a", Time(1, 0, 0))
+        with self.assertRaises(EvaluatorError):
+            aggregator.add("a", Decimal(1))
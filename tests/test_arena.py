@@ -0,0 +1,109 @@
+import random
+import tracemalloc
+import unittest
+from decimal import Decimal
+
+from tcalc.arena import ArenaParser, from_tree, to_tree
+from tcalc.ast import format_tree
+from tcalc.backends import get_backend
+from tcalc.compiled import parse
+from tcalc.errors import EvaluatorError
+from tcalc.evaluator import Evaluator
+from tcalc.expression import Time
+from tcalc.lexer import create_lexer
+from tcalc.optimizer import optimize_arena
+
+SOURCES = (
+    "(1:: + :45: + :15:) / 2",
+    "1:: + 2 * (3:: - :30:) / -k",
+    "--+-x * 1 / 1",
+    "::30 + x + ::30 - (y - :1:)",
+    "1:: / 7 * 7 + x",
+    "+(1 + 2) * 3.5 - .5",
+    "k * 3 * 5 - 1",
+)
+VARIABLES = {"x": Time(1, 30, 0), "y": Time(0, 0, 7), "k": Decimal("1.5")}
+
+
+def parse_arena(source, lexer="regex"):
+    return ArenaParser(create_lexer(source, lexer)).parse()
+
+
+def evaluate(ast, backend="decimal"):
+    numeric = get_backend(backend)
+    variables = {name: numeric.coerce(value) for name, value in VARIABLES.items()}
+    return str(Evaluator(None, variables, numeric).visit(ast))
+
+
+class TestArena(unittest.TestCase):
+    def test_same_tree(self):
+        for lexer in ("regex", "char"):
+            for source in SOURCES:
+                if lexer == "char" and any(name in source for name in "xyk"):
+                    continue  # no variables
+                with self.subTest(source=source, lexer=lexer):
+                    tree = parse(source, lexer)
+                    expected = format_tree(tree)
+                    arena = parse_arena(source, lexer)
+                    self.assertEqual(format_tree(to_tree(arena)), expected)
+                    self.assertEqual(format_tree(to_tree(from_tree(tree))), expected)
+
+    def test_layout(self):
+        arena = parse_arena("x * 2 + x")
+        self.assertEqual(len(arena), 5)
+        self.assertEqual(arena.root, 4)
+        self.assertEqual(arena.pool, ["x", "2"])  # literals are stored once
+        self.assertEqual(arena.variables(), {"x"})
+        self.assertEqual(arena.nbytes(), 5 * 13)
+
+    def test_same_results(self):
+        for backend in ("decimal", "fraction", "fixed", "float"):
+            for source in SOURCES:
+                with self.subTest(source=source, backend=backend):
+                    expected = evaluate(parse(source), backend)
+                    arena = parse_arena(source)
+                    self.assertEqual(evaluate(arena, backend), expected)
+                    optimized = optimize_arena(arena, get_backend(backend))
+                    self.assertEqual(evaluate(optimized, backend), expected)
+
+    def test_optimize(self):
+        self.assertEqual(
+            format_tree(to_tree(optimize_arena(parse_arena("(1:: + :45: + :15:) / 2")))),
+            "Const(01:00:00)",
+        )
+        optimized = optimize_arena(parse_arena("--+-x * 1 / 1 + (2 - 2)"))
+        self.assertEqual(
+            format_tree(to_tree(optimized)).splitlines(),
+            ["BinOp(+)", "  UnaryOp(-)", "    Var(x)", "  Const(0)"],
+        )
+        self.assertEqual(len(optimized.pool), 2)  # folded operands are dropped
+
+    def test_errors(self):
+        with self.assertRaises(ZeroDivisionError):
+            evaluate(optimize_arena(parse_arena("1:: / (1 - 1)")))
+        with self.assertRaises(EvaluatorError) as cm:
+            evaluate(parse_arena("1 + 1:: * z"))
+        self.assertEqual(cm.exception.column, 11)
+        with self.assertRaises(EvaluatorError) as cm:
+            evaluate(parse_arena("1 + 1::"))
+        self.assertEqual(cm.exception.msg, "unsupported operands for +")
+        self.assertEqual(cm.exception.column, 3)
+
+    def test_memory(self):
+        rng = random.Random(1)
+        source = " + ".join(
+            f"{rng.randrange(24)}:{rng.randrange(60)}:{rng.randrange(60)} * 2"
+            for _ in range(5000)
+        )
+        sizes = []
+        for build in (parse, parse_arena):
+            tracemalloc.start()
+            ast = build(source)
+            sizes.append(tracemalloc.get_traced_memory()[0])
+            tracemalloc.stop()
+            del ast
+        self.assertLess(sizes[1] * 3, sizes[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
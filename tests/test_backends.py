@@ -0,0 +1,100 @@
+import unittest
+from decimal import Decimal
+from fractions import Fraction
+
+import tcalc
+from tcalc.backends import BACKENDS, Fixed, FixedTime, get_backend, round_div
+from tcalc.errors import EvaluatorError
+from tcalc.expression import Time
+
+
+def calc(expr, backend, **variables):
+    return tcalc.compile(expr, cache=False, backend=backend).evaluate(**variables)
+
+
+class TestBackends(unittest.TestCase):
+    def test_results(self):
+        for expr, expect in (
+            ("1:: / 3 * 3", ("01:00:00", "01:00:00", "01:00:00", "01:00:00")),
+            ("1:: / 7 * 7", ("00:59:59.999998", "01:00:00", "00:59:59.999998", None)),
+            ("1 / 3", ("0.3333333333333333333333333333", "1/3", "0.333333", None)),
+            ("0.1 + 0.2", ("0.3", "3/10", "0.3", "0.30000000000000004")),
+            ("1:: / 2::", ("0.5", "1/2", "0.5", "0.5")),
+            ("1:30: * 1.5 - ::1 / 2", ("02:14:59.5",) * 4),
+            ("-(2 * 3)", ("-6", "-6", "-6", "-6.0")),
+        ):
+            for backend, result in zip(BACKENDS, expect):
+                if result is None:
+                    continue
+                with self.subTest(expr=expr, backend=backend):
+                    self.assertEqual(str(calc(expr, backend)), result)
+
+    def test_vm_walk_and_optimizer_agree(self):
+        x = Time.from_ticks(1_500_001)
+        for expr in (
+            "::1 + x + ::2 - 1:: / 7",
+            "(x * 3) * 5 / 7",
+            "x * 1 / 1.0 + -(-x)",
+            "x / (x + ::1)",
+        ):
+            for backend in BACKENDS:
+                with self.subTest(expr=expr, backend=backend):
+                    optimized = tcalc.compile(expr, cache=False, backend=backend)
+                    plain = tcalc.compile(
+                        expr, cache=False, optimize=False, backend=backend
+                    )
+                    results = {
+                        str(optimized.evaluate(x=x)),
+                        str(optimized.walk(x=x)),
+                        str(plain.evaluate(x=x)),
+                    }
+                    self.assertEqual(len(results), 1, results)
+
+    def test_errors(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                with self.assertRaises(ZeroDivisionError):
+                    calc("1:: / 0", backend)
+                with self.assertRaises(ZeroDivisionError):
+                    calc("1 / (1 - 1)", backend)
+                with self.assertRaises(EvaluatorError):
+                    calc("1:: + 1", backend)
+                with self.assertRaises(EvaluatorError):
+                    calc("2 / 1::", backend)
+
+    def test_coerce_variables(self):
+        hour = Time(Decimal(1), Decimal(0), Decimal(0))
+        for backend, variables, expect in (
+            ("fraction", {"x": hour, "n": 1}, "01:00:00"),
+            ("fixed", {"x": hour, "n": Decimal("0.5")}, "00:30:00"),
+            ("float", {"x": hour, "n": Fraction(1, 4)}, "00:15:00"),
+            ("decimal", {"x": FixedTime(3), "n": 3}, "00:00:0.000009"),
+        ):
+            with self.subTest(backend=backend):
+                self.assertEqual(str(calc("x / 3 * n * 3", backend, **variables)), expect)
+
+    def test_cache_is_per_backend(self):
+        tcalc.cache_clear()
+        self.assertEqual(str(tcalc.compile("1 / 4").evaluate()), "0.25")
+        fraction = tcalc.compile("1 / 4", backend="fraction")
+        self.assertEqual(str(fraction.evaluate()), "1/4")
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_backend("quad")
+
+
+class TestFixed(unittest.TestCase):
+    def test_round_div_half_even(self):
+        for n, d, expect in ((5, 2, 2), (7, 2, 4), (-5, 2, -2), (-7, 2, -4), (1, 3, 0)):
+            with self.subTest(n=n, d=d):
+                self.assertEqual(round_div(n, d), expect)
+        with self.assertRaises(ZeroDivisionError):
+            round_div(1, 0)
+
+    def test_literals_round_half_even(self):
+        fixed = get_backend("fixed")
+        self.assertEqual(fixed.number("0.0000005"), Fixed(0))
+        self.assertEqual(fixed.number("0.0000015"), Fixed(2))
+        self.assertEqual(fixed.time("0", "0", "0.0000025"), FixedTime(2))
+        self.assertEqual(str(fixed.number("12.5")), "12.5")
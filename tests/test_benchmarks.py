@@ -0,0 +1,43 @@
+import unittest
+from unittest import mock
+
+from benchmarks.suite import Result, compare, run, scan, TokenStream
+from benchmarks.workloads import WORKLOADS
+from tcalc.parser import Parser
+from tcalc.compiled import parse
+
+
+class TestWorkloads(unittest.TestCase):
+    def test_workloads_are_valid_and_stable(self):
+        for name, generate in WORKLOADS.items():
+            with self.subTest(workload=name):
+                exprs = generate()
+                self.assertEqual(exprs, generate())
+                for expr in exprs[:50]:
+                    ast = Parser(TokenStream(scan(expr))).parse()
+                    self.assertEqual(str(ast), str(parse(expr)))
+
+
+class TestSuite(unittest.TestCase):
+    def test_run(self):
+        # the workers of the scaling stages are traced as well, keep it short
+        with mock.patch("benchmarks.suite.SCALING_COPIES", 1):
+            results = run(["many_small"], repeat=1)
+        self.assertIn("many_small/cli", results)
+        self.assertIn("many_small/batch-j2", results)
+        self.assertTrue(all(r.ops_per_sec > 0 for r in results.values()))
+
+    def test_compare_flags_regressions(self):
+        baseline = {
+            "a/lexer": {"ops_per_sec": 1000.0, "peak_kib": 10.0},
+            "a/parser": {"ops_per_sec": 1000.0, "peak_kib": 10.0},
+        }
+        results = {
+            "a/lexer": Result(900.0, 11.0),
+            "a/parser": Result(500.0, 20.0),
+            "b/lexer": Result(1.0, 1.0),
+        }
+        self.assertEqual(
+            compare(results, baseline, 0.25),
+            {"a/parser": ["ops/s", "memory"], "b/lexer": ["no baseline"]},
+        )
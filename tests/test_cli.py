@@ -0,0 +1,161 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from tcalc import cli
+
+
+def run_batch(files, stdin=""):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with mock.patch("sys.stdin", io.StringIO(stdin)), mock.patch(
+        "sys.stdout", stdout
+    ), mock.patch("sys.stderr", stderr):
+        rc = cli.evaluate_batch(files)
+    return rc, stdout.getvalue(), stderr.getvalue()
+
+
+class TestBatch(unittest.TestCase):
+    def test_stdin(self):
+        rc, out, err = run_batch(["-"], "1:: + 1::\n2:30: * 3\n")
+        self.assertEqual(rc, 0)
+        self.assertEqual(out, "02:00:00\n07:30:00\n")
+        self.assertEqual(err, "")
+
+    def test_errors_do_not_stop_the_run(self):
+        rc, out, err = run_batch([], "1 + \n\n1:: / 0\n1 $\n1:: + 1\n2::\n")
+        self.assertEqual(rc, 1)
+        self.assertEqual(out, "\n\n\n\n\n02:00:00\n")
+        self.assertEqual(
+            err.splitlines(),
+            [
+                "<stdin>:1:5: ParserError: invalid syntax",
+                "<stdin>:3: ZeroDivisionError: division by zero",
+                "<stdin>:4:3: LexerError: Unknown character: $",
+                "<stdin>:5:5: EvaluatorError: unsupported operands for +",
+            ],
+        )
+
+    def test_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i, content in enumerate(("1::\n(2\n", ":30: * 2\n")):
+                paths.append(os.path.join(tmp, f"{i}.txt"))
+                with open(paths[-1], "w") as fp:
+                    fp.write(content)
+            rc, out, err = run_batch(paths)
+        self.assertEqual(rc, 1)
+        self.assertEqual(out, "01:00:00\n\n01:00:00\n")
+        self.assertTrue(err.startswith(f"{paths[0]}:2:"))
+
+    def test_missing_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "missing.txt")
+            for jobs in (1, 2):
+                with self.subTest(jobs=jobs), mock.patch(
+                    "sys.stderr", io.StringIO()
+                ) as stderr:
+                    rc = cli.evaluate_batch([path], jobs=jobs)
+                self.assertEqual(rc, 1)
+                self.assertEqual(
+                    stderr.getvalue(), f"tcalc: {path}: No such file or directory\n"
+                )
+
+    def test_not_utf8(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "latin1.txt")
+            with open(path, "wb") as fp:
+                fp.write(b"1::\n\xff 2\n")
+            for jobs in (1, 2):
+                with self.subTest(jobs=jobs), mock.patch(
+                    "sys.stdout", io.StringIO()
+                ), mock.patch("sys.stderr", io.StringIO()) as stderr:
+                    rc = cli.evaluate_batch([path], lexer="char", jobs=jobs)
+                self.assertEqual(rc, 1)
+                self.assertEqual(
+                    stderr.getvalue(),
+                    f"tcalc: {path}: not utf-8 text: invalid start byte\n",
+                )
+
+
+class TestAggregate(unittest.TestCase):
+    def run_aggregate(self, stdin, **kwargs):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with mock.patch("sys.stdin", io.StringIO(stdin)), mock.patch(
+            "sys.stdout", stdout
+        ), mock.patch("sys.stderr", stderr):
+            rc = cli.aggregate([], **kwargs)
+        return rc, stdout.getvalue().splitlines(), stderr.getvalue().splitlines()
+
+    def test_aggregate(self):
+        rc, out, err = self.run_aggregate(
+            "alice\t8:: - :30:\nbob\t7:45:\nalice\t7:30:\ncarol\t2\ncarol\t3.5\n"
+        )
+        self.assertEqual(rc, 0)
+        self.assertEqual(
+            out,
+            [
+                "key\tcount\tsum\tmin\tmax\tmean",
+                "alice\t2\t15:00:00\t07:30:00\t07:30:00\t07:30:00",
+                "bob\t1\t07:45:00\t07:45:00\t07:45:00\t07:45:00",
+                "carol\t2\t5.5\t2\t3.5\t2.75",
+            ],
+        )
+
+    def test_errors(self):
+        rc, out, err = self.run_aggregate(
+            "a;1:: +\nb 1::\na;::1\na;1\n", delimiter=";"
+        )
+        self.assertEqual(rc, 1)
+        self.assertEqual(out[1:], ["a\t1\t00:00:01\t00:00:01\t00:00:01\t00:00:01"])
+        self.assertEqual(
+            err,
+            [
+                "<stdin>:1:8: ParserError: invalid syntax",
+                "<stdin>:2: ParserError: missing delimiter after key",
+                "<stdin>:4: EvaluatorError: cannot aggregate numbers and times",
+            ],
+        )
+
+    def test_missing_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "missing.txt")
+            commands = [
+                (cli.aggregate, [path]),
+                (cli.summarize, [path], [0.5]),
+                (cli.evaluate_sheet, path),
+            ]
+            for fn, *args in commands:
+                with self.subTest(fn.__name__), mock.patch(
+                    "sys.stdout", io.StringIO()
+                ) as stdout, mock.patch("sys.stderr", io.StringIO()) as stderr:
+                    rc = fn(*args)
+                self.assertEqual(rc, 1)
+                self.assertEqual(stdout.getvalue(), "")
+                self.assertEqual(
+                    stderr.getvalue(), f"tcalc: {path}: No such file or directory\n"
+                )
+
+    def test_not_utf8(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "latin1.txt")
+            with open(path, "wb") as fp:
+                fp.write(b"a\t1::\n\xff\t2::\n")
+            commands = [
+                (cli.aggregate, [path]),
+                (cli.aggregate, [path], "\t", "regex", 2),
+                (cli.summarize, [path], [0.5]),
+                (cli.evaluate_sheet, path),
+            ]
+            for fn, *args in commands:
+                with self.subTest(fn.__name__, args=args), mock.patch(
+                    "sys.stdout", io.StringIO()
+                ) as stdout, mock.patch("sys.stderr", io.StringIO()) as stderr:
+                    rc = fn(*args)
+                self.assertEqual(rc, 1)
+                self.assertEqual(stdout.getvalue(), "")
+                self.assertEqual(
+                    stderr.getvalue(),
+                    f"tcalc: {path}: not utf-8 text: invalid start byte\n",
+                )
@@ -0,0 +1,74 @@
+import unittest
+from decimal import Decimal
+
+import tcalc
+from tcalc.cache import LRUCache
+from tcalc.errors import EvaluatorError, ParserError
+from tcalc.expression import Time
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_eviction_order(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        info = cache.info()
+        self.assertEqual((info.hits, info.misses, info.evictions), (2, 1, 1))
+        self.assertEqual((info.maxsize, info.currsize), (2, 2))
+
+    def test_resize(self):
+        cache = LRUCache(3)
+        for key in "abc":
+            cache.put(key, key)
+        cache.resize(1)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get("c"), "c")
+        cache.resize(0)
+        cache.put("d", "d")
+        self.assertEqual(len(cache), 0)
+
+
+class TestCompile(unittest.TestCase):
+    def setUp(self):
+        tcalc.cache_clear()
+
+    def tearDown(self):
+        tcalc.set_cache_size(tcalc.compiled.DEFAULT_CACHE_SIZE)
+
+    def test_evaluate_repeatedly(self):
+        expr = tcalc.compile("(1:: + :45: + :15:) / 2")
+        self.assertEqual(str(expr.evaluate()), "01:00:00")
+        self.assertEqual(str(expr.evaluate()), "01:00:00")
+        self.assertEqual(tcalc.compile("1 / 4").evaluate(), Decimal("0.25"))
+
+    def test_variables(self):
+        expr = tcalc.compile("(x + 0:15:) * k")
+        self.assertEqual(expr.variables, {"x", "k"})
+        result = expr.evaluate(x=Time(1, 0, 0), k=Decimal(2))
+        self.assertEqual(str(result), "02:30:00")
+        with self.assertRaises(EvaluatorError) as cm:
+            expr.evaluate(x=Time(1, 0, 0))
+        self.assertEqual(cm.exception.column, 15)
+
+    def test_cache_hits(self):
+        first = tcalc.compile("1:: * 2")
+        self.assertIs(tcalc.compile("1:: * 2"), first)
+        self.assertIsNot(tcalc.compile("1:: * 2", cache=False), first)
+        info = tcalc.cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+
+    def test_cache_size(self):
+        tcalc.set_cache_size(1)
+        tcalc.compile("1")
+        tcalc.compile("2")
+        self.assertEqual(tcalc.cache_info().evictions, 1)
+
+    def test_errors_are_not_cached(self):
+        for _ in range(2):
+            with self.assertRaises(ParserError):
+                tcalc.compile("1 +")
+        self.assertEqual(tcalc.cache_info().currsize, 0)
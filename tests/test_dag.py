@@ -0,0 +1,112 @@
+import io
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from tcalc import cli, instrumentation
+from tcalc.backends import get_backend
+from tcalc.batch import evaluate_lines
+from tcalc.compiled import compile, parse
+from tcalc.dag import DAG
+from tcalc.errors import EvaluatorError, ParserError
+
+LINES = [
+    "(8:: - 0:30:) * 5\n",
+    "(8:: - 0:30:) * 4\n",
+    "\n",
+    "1 / (1:: - 1::)\n",
+    "  x + 1\n",
+    "(8:: - 0:30:) * 5\n",
+    "-(::30 * 2) + (::30 * 2)\n",
+    "1 +\n",
+    "1 / 0\n",
+]
+
+
+class TestDAG(unittest.TestCase):
+    def test_shared_nodes(self):
+        dag = DAG()
+        first = dag.intern(parse("(8:: - 0:30:) * 5"))
+        size = dag.distinct
+        second = dag.intern(parse("(8:: - 0:30:) * 4"))
+        self.assertNotEqual(first, second)
+        # only the literal 4 and the product are new
+        self.assertEqual(dag.distinct, size + 2)
+        self.assertEqual(dag.intern(parse("(8:: - 0:30:) * 5")), first)
+        self.assertEqual(dag.interned, 15)
+        self.assertEqual(dag.ratio, 15 / 7)
+
+    def test_evaluated_once(self):
+        dag = DAG()
+        subtract = dag.intern(parse("8:: - 0:30:"))
+        self.assertEqual(str(dag.value(subtract)), "07:30:00")
+        values = len(dag.values)
+        dag.intern(parse("(8:: - 0:30:) - (8:: - 0:30:)"))
+        self.assertEqual(len(dag.values), values + 1)
+
+    def test_calculate(self):
+        dag = DAG()
+        for line in LINES:
+            expr = line.rstrip("\n")
+            if not expr.strip():
+                continue
+            with self.subTest(expr=expr):
+                try:
+                    expected = compile(expr).evaluate()
+                except Exception as err:
+                    with self.assertRaises(type(err)) as context:
+                        dag.calculate(expr)
+                    self.assertEqual(str(context.exception), str(err))
+                else:
+                    self.assertEqual(str(dag.calculate(expr)), str(expected))
+
+    def test_error_columns_of_each_line(self):
+        dag = DAG()
+        with self.assertRaises(EvaluatorError) as first:
+            dag.calculate("1:: * 1::")
+        with self.assertRaises(EvaluatorError) as second:
+            dag.calculate("2 + 1:: * 1::")
+        self.assertEqual(first.exception.column, 5)
+        self.assertEqual(second.exception.column, 9)
+        with self.assertRaises(ParserError):
+            dag.calculate("1 +")
+
+    def test_variables(self):
+        dag = DAG(get_backend("fraction"), {"x": Decimal("1.5")})
+        self.assertEqual(str(dag.calculate("x * 2 + x * 2")), "6")
+
+    def test_stats(self):
+        with instrumentation.collect() as stats:
+            list(evaluate_lines(LINES, shared=True))
+        self.assertEqual(stats.interned, 34)
+        self.assertLess(stats.distinct, stats.interned)
+        self.assertEqual(stats.dedup_ratio, stats.interned / stats.distinct)
+        self.assertIn("dedup ratio", stats.format_table())
+
+
+class TestSharedBatch(unittest.TestCase):
+    def test_same_output(self):
+        for backend in ("decimal", "fraction", "float"):
+            with self.subTest(backend=backend):
+                self.assertEqual(
+                    list(evaluate_lines(LINES, backend=backend, shared=True)),
+                    list(evaluate_lines(LINES, backend=backend)),
+                )
+
+    def test_cli(self):
+        argv = ["tcalc", "--batch", "--share", "-"]
+        with mock.patch("sys.argv", argv), mock.patch(
+            "sys.stdin", io.StringIO("".join(LINES))
+        ), mock.patch("sys.stdout", new_callable=io.StringIO) as stdout, mock.patch(
+            "sys.stderr", new_callable=io.StringIO
+        ) as stderr:
+            self.assertEqual(cli.main(), 1)
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(lines[:2], ["37:30:00", "30:00:00"])
+        self.assertEqual(len(lines), len(LINES))
+        error = "<stdin>:5:3: EvaluatorError: undefined variable x\n"
+        self.assertIn(error, stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import io
+import random
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from tcalc import cli
+from tcalc.backends import get_backend
+from tcalc.direct import DirectEvaluator
+from tcalc.errors import Error
+from tcalc.evaluator import Evaluator
+from tcalc.expression import Time
+from tcalc.lexer import create_lexer
+from tcalc.parser import Parser
+
+VARIABLES = {"x": Time(1, 30, 0), "k": Decimal("1.5")}
+# hand picked cases, valid and malformed, besides the generated ones
+CORPUS = [
+    "(1:: + :45: + :15:) / 2",
+    "2:30: * 3",
+    "--+-x * 1 / 1",
+    "+(1 + 2) * 3.5 - .5",
+    "1:: / 7 * 7 + k",
+    "::30 - 1:: * -k",
+    "+ 1:: 1::",
+    "1:: 1::",
+    "1:: * 1::",
+    "1:: * 1:: +",
+    "1 / 0 + 1:: * 1::",
+    "1:: * 1:: + 1 / 0",
+    "y + 1 / 0",
+    "1 / (1:: - 1::)",
+    "((1::)",
+    "(1::))",
+    "()",
+    "1 +",
+    "* 2",
+    "1 $ 2",
+    "",
+]
+OPERANDS = ["1::", ":30:", "::15", "1.5:2:", "2", "0.5", ".25", "0", "x", "k", "y"]
+OPERATORS = ["+", "-", "*", "/"]
+
+
+def generate(rng, depth=0):
+    roll = rng.random()
+    if depth > 3 or roll < 0.3:
+        return rng.choice(OPERANDS)
+    if roll < 0.4:
+        return rng.choice("+-") + generate(rng, depth + 1)
+    if roll < 0.55:
+        return f"({generate(rng, depth + 1)})"
+    op = rng.choice(OPERATORS)
+    return f"{generate(rng, depth + 1)} {op} {generate(rng, depth + 1)}"
+
+
+def malform(rng, expr):
+    """Drop, repeat or insert a token"""
+    tokens = expr.split(" ")
+    i = rng.randrange(len(tokens))
+    roll = rng.random()
+    if roll < 0.3 and len(tokens) > 1:
+        del tokens[i]
+    elif roll < 0.6:
+        tokens.insert(i, tokens[i])
+    else:
+        tokens.insert(i, rng.choice(OPERANDS + OPERATORS + ["(", ")"]))
+    return " ".join(tokens)
+
+
+def outcome(make, expr, lexer, backend):
+    numeric = get_backend(backend)
+    variables = {name: numeric.coerce(value) for name, value in VARIABLES.items()}
+    try:
+        return "ok", str(make(create_lexer(expr, lexer), variables, numeric).eval())
+    except Error as err:
+        return type(err).__name__, err.msg, err.column
+    except ZeroDivisionError:
+        return ("ZeroDivisionError",)
+    except ArithmeticError:
+        return ("ArithmeticError",)
+
+
+def reference(tokens, variables, backend):
+    return Evaluator(Parser(tokens), variables, backend)
+
+
+def corpus(n=400, seed=25):
+    rng = random.Random(seed)
+    exprs = list(CORPUS)
+    for _ in range(n):
+        expr = generate(rng)
+        exprs.append(expr)
+        exprs.append(malform(rng, expr))
+    return exprs
+
+
+class TestDirectEvaluator(unittest.TestCase):
+    def test_same_as_reference(self):
+        exprs = corpus()
+        kinds = set()
+        for lexer in ("regex", "char"):
+            for backend in ("decimal", "fraction", "float"):
+                for expr in exprs:
+                    expected = outcome(reference, expr, lexer, backend)
+                    kinds.add(expected[0])
+                    with self.subTest(expr=expr, lexer=lexer, backend=backend):
+                        self.assertEqual(
+                            outcome(DirectEvaluator, expr, lexer, backend), expected
+                        )
+        # the corpus covers results and every kind of failure
+        self.assertLessEqual(
+            {"ok", "ParserError", "EvaluatorError", "ZeroDivisionError"}, kinds
+        )
+
+    def test_malformed_rejected(self):
+        for lexer in ("regex", "char"):
+            for expr in ("+ 1:: 1::", "1:: 1::", "(1) 2", "1::(2)", "1:: 1", "1 2"):
+                with self.subTest(expr=expr, lexer=lexer):
+                    self.assertEqual(
+                        outcome(DirectEvaluator, expr, lexer, "decimal")[0],
+                        "ParserError",
+                    )
+
+    def test_syntax_error_before_evaluation_error(self):
+        result = outcome(DirectEvaluator, "1:: * 1:: +", "regex", "decimal")
+        self.assertEqual(result, ("ParserError", "invalid syntax", 12))
+        result = outcome(DirectEvaluator, "y + 1:: * 1::", "regex", "decimal")
+        self.assertEqual(result, ("EvaluatorError", "undefined variable y", 1))
+
+    def test_cli_fast_path(self):
+        for expr, out in (("(1:: + :45: + :15:) / 2", "01:00:00\n"), ("+ 1:: 1::", "")):
+            stdout = io.StringIO()
+            with mock.patch("sys.argv", ["tcalc", expr]), mock.patch(
+                "sys.stdout", stdout
+            ), mock.patch("sys.stderr", io.StringIO()):
+                cli.main()
+            self.assertEqual(stdout.getvalue(), out)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from tcalc import cli
+from tcalc.backends import get_backend
+from tcalc.compiled import compile
+from tcalc.diskcache import SUFFIX, DiskCache, default_directory
+from tcalc.worksheet import Worksheet
+
+SHEET = b"shift = 8:: - 0:30:\nweek = shift * 5\nweek / 5\nbad = 1 +\n"
+DECIMAL = get_backend("decimal")
+
+
+def compile_sheet(data, compiled=None):
+    sheet = Worksheet(compiled=compiled)
+    sheet.load(io.StringIO(data.decode()))
+    return sheet
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = os.path.join(tmp.name, "cache")
+        self.cache = DiskCache(self.directory)
+
+    def entries(self):
+        return [name for name in os.listdir(self.directory) if name.endswith(SUFFIX)]
+
+    def test_round_trip(self):
+        self.assertIsNone(self.cache.load(SHEET, "regex", DECIMAL))
+        sheet = compile_sheet(SHEET)
+        self.cache.save(SHEET, "regex", DECIMAL, sheet.compiled_cells())
+        self.assertEqual(os.stat(self.directory).st_mode & 0o777, 0o700)
+
+        compiled = self.cache.load(SHEET, "regex", DECIMAL)
+        self.assertEqual(sorted(compiled), [" 8:: - 0:30:", " shift * 5", "week / 5"])
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        with mock.patch("tcalc.worksheet.compile", wraps=compile) as compiler:
+            cached = compile_sheet(SHEET, compiled)
+        # only the line that failed to compile is compiled again
+        self.assertEqual([c.args[0] for c in compiler.call_args_list], [" 1 +"])
+        self.assertEqual(str(cached["week"]), "37:30:00")
+        self.assertEqual(cached.cells["bad"].error.msg, "invalid syntax")
+
+    def test_keys(self):
+        sheet = compile_sheet(SHEET)
+        self.cache.save(SHEET, "regex", DECIMAL, sheet.compiled_cells())
+        self.assertIsNone(self.cache.load(SHEET + b"x = 1\n", "regex", DECIMAL))
+        self.assertIsNone(self.cache.load(SHEET, "char", DECIMAL))
+        self.assertIsNone(self.cache.load(SHEET, "regex", get_backend("float")))
+        with mock.patch("tcalc.__version__", "99.0"):
+            self.assertIsNone(self.cache.load(SHEET, "regex", DECIMAL))
+        self.assertIsNotNone(self.cache.load(SHEET, "regex", DECIMAL))
+
+    def test_corrupt_entry(self):
+        sheet = compile_sheet(SHEET)
+        self.cache.save(SHEET, "regex", DECIMAL, sheet.compiled_cells())
+        path = self.cache.path(SHEET, "regex", DECIMAL)
+        with open(path, "r+b") as fp:
+            fp.truncate(10)
+        self.assertIsNone(self.cache.load(SHEET, "regex", DECIMAL))
+        self.assertFalse(os.path.exists(path))
+
+    def test_prune(self):
+        sheets = [f"x = {n}\n".encode() for n in range(4)]
+        for n, data in enumerate(sheets):
+            compiled = compile_sheet(data).compiled_cells()
+            self.cache.save(data, "regex", DECIMAL, compiled)
+            os.utime(self.cache.path(data, "regex", DECIMAL), ns=(n, n))
+        self.assertEqual(len(self.entries()), 4)
+        size = os.path.getsize(self.cache.path(sheets[0], "regex", DECIMAL))
+
+        self.cache.load(sheets[0], "regex", DECIMAL)  # most recently used
+        self.cache.max_bytes = 2 * size
+        self.cache.prune()
+        self.assertIsNotNone(self.cache.load(sheets[0], "regex", DECIMAL))
+        self.assertIsNotNone(self.cache.load(sheets[3], "regex", DECIMAL))
+        self.assertEqual(len(self.entries()), 2)
+
+        self.cache.clear()
+        self.assertEqual(self.entries(), [])
+
+    def test_unwritable(self):
+        with open(self.directory, "w"):
+            pass
+        self.cache.save(SHEET, "regex", DECIMAL, compile_sheet(SHEET).compiled_cells())
+        self.assertIsNone(self.cache.load(SHEET, "regex", DECIMAL))
+
+    def test_default_directory(self):
+        with mock.patch.dict(os.environ, {"TCALC_CACHE_DIR": "/tmp/x"}):
+            self.assertEqual(default_directory(), "/tmp/x")
+        env = {"TCALC_CACHE_DIR": "", "XDG_CACHE_HOME": "/tmp/cache"}
+        with mock.patch.dict(os.environ, env):
+            self.assertEqual(default_directory(), "/tmp/cache/tcalc")
+
+    def test_cli(self):
+        path = os.path.join(os.path.dirname(self.directory), "sheet.tc")
+        with open(path, "wb") as fp:
+            fp.write(SHEET)
+        outputs = []
+        for _ in range(2):
+            stdout, stderr = io.StringIO(), io.StringIO()
+            with mock.patch("sys.stdout", stdout), mock.patch("sys.stderr", stderr):
+                rc = cli.evaluate_sheet(path, cache_dir=self.directory)
+            self.assertEqual(rc, 1)
+            outputs.append((stdout.getvalue(), stderr.getvalue()))
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(len(self.entries()), 1)
+        self.assertEqual(outputs[0][1], f"{path}:4:10: ParserError: invalid syntax\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
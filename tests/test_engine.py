@@ -0,0 +1,128 @@
+import asyncio
+import decimal
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import tcalc
+from tcalc.engine import Engine, Result
+from tcalc.errors import EvaluatorError, LexerError, ParserError
+
+
+class TestEngine(unittest.TestCase):
+    def test_evaluate(self):
+        engine = Engine()
+        result = engine.evaluate("1:30: * 2")
+        self.assertTrue(result.ok)
+        self.assertEqual(str(result.value), "03:00:00")
+        self.assertEqual(engine.evaluate("x * 2", x=Decimal(3)).value, 6)
+
+    def test_names_of_parameters(self):
+        engine = Engine()
+        self.assertEqual(engine.evaluate("expr * self", expr=2, self=3).value, 6)
+        results = engine.evaluate_many(["exprs * 2"], exprs=1)
+        self.assertEqual([result.value for result in results], [2])
+
+    def test_errors_are_values(self):
+        engine = Engine()
+        cases = [
+            ("1 +", {}, ParserError),
+            ("1 $ 2", {}, LexerError),
+            ("x + 1", {}, EvaluatorError),
+            ("1 / 0", {}, ArithmeticError),
+            ("x + 1", {"x": "one"}, ValueError),
+        ]
+        for expr, variables, error in cases:
+            with self.subTest(expr=expr, variables=variables):
+                result = engine.evaluate(expr, **variables)
+                self.assertFalse(result.ok)
+                self.assertIsNone(result.value)
+                self.assertIsInstance(result.error, error)
+                with self.assertRaises(error):
+                    result.unwrap()
+
+    def test_export(self):
+        self.assertIs(tcalc.Engine, Engine)
+        self.assertIs(tcalc.Result, Result)
+
+    def test_evaluate_many_is_lazy(self):
+        consumed = []
+
+        def exprs():
+            for n in range(3):
+                consumed.append(n)
+                yield f"{n} + 1"
+
+        results = Engine().evaluate_many(exprs())
+        self.assertEqual(consumed, [])
+        self.assertEqual(next(results).value, 1)
+        self.assertEqual(consumed, [0])
+        self.assertEqual([r.value for r in results], [2, 3])
+
+    def test_context(self):
+        context = decimal.Context(prec=3)
+        engine = Engine(context=context)
+        self.assertEqual(str(engine.evaluate("1 / 3").value), "0.333")
+        self.assertEqual(
+            [str(r.value) for r in engine.evaluate_many(["2 / 3"])], ["0.667"]
+        )
+
+    def test_threads(self):
+        engine = Engine()
+        exprs = [f"{n}:: + :{n}: * 2" for n in range(50)]
+        expected = [str(r.value) for r in engine.evaluate_many(exprs)]
+        results = {}
+
+        def work(index):
+            results[index] = [str(r.value) for r in engine.evaluate_many(exprs)]
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(list(results.values()), [expected] * 8)
+
+    def test_chunk_size(self):
+        with self.assertRaises(ValueError):
+            Engine(chunk_size=0)
+
+
+class TestAsync(unittest.TestCase):
+    def collect(self, engine, exprs, **variables):
+        async def run():
+            return [r async for r in engine.aevaluate_many(exprs, **variables)]
+
+        return asyncio.run(run())
+
+    def test_aevaluate_many(self):
+        exprs = [f"{n} * 2" for n in range(10)] + ["1 +"]
+        results = self.collect(Engine(chunk_size=3), exprs)
+        self.assertEqual([r.expr for r in results], exprs)
+        self.assertEqual([r.value for r in results[:-1]], list(range(0, 20, 2)))
+        self.assertIsInstance(results[-1].error, ParserError)
+
+    def test_empty(self):
+        self.assertEqual(self.collect(Engine(), []), [])
+
+    def test_executor(self):
+        with ThreadPoolExecutor(2, thread_name_prefix="tcalc-test") as executor:
+            engine = Engine(executor=executor, chunk_size=2)
+            results = self.collect(engine, ["x + 1"] * 5, x=Decimal(1))
+        self.assertEqual([r.value for r in results], [2] * 5)
+
+    def test_event_loop_not_blocked(self):
+        names = set()
+        engine = Engine(chunk_size=1)
+
+        async def run():
+            async for _ in engine.aevaluate_many(["1 + 1"] * 4):
+                names.add(threading.current_thread().name)
+
+        asyncio.run(run())
+        self.assertEqual(names, {threading.main_thread().name})
+
+
+if __name__ == "__main__":
+    unittest.main()
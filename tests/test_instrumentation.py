@@ -0,0 +1,84 @@
+import io
+import json
+import unittest
+from unittest import mock
+
+import tcalc
+from tcalc import cli, instrumentation
+from tcalc.instrumentation import STAGES, Stats
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        tcalc.cache_clear()
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(instrumentation.active)
+        self.assertEqual(str(tcalc.compile("1:: + ::1").evaluate()), "01:00:01")
+
+    def test_counters(self):
+        with instrumentation.collect() as stats:
+            tcalc.compile("1:: + 2:: * 3").evaluate()
+            tcalc.compile("(x + 1::) / 2", cache=False).evaluate(
+                x=tcalc.compile("::30").evaluate()
+            )
+        self.assertIsNone(instrumentation.active)
+        self.assertEqual(stats.compilations, 3)
+        self.assertEqual(stats.evaluations, 3)
+        self.assertEqual(stats.tokens, 5 + 7 + 1)
+        self.assertEqual(stats.nodes, 5 + 5 + 1)
+        self.assertTrue(all(stats.times[stage] >= 0 for stage in STAGES))
+        self.assertGreater(stats.times["lex"], 0)
+
+    def test_errors_by_type(self):
+        with instrumentation.collect() as stats:
+            for expr in ("1 +", "1 $", "1:: / 0", "1:: + 1"):
+                with self.assertRaises(Exception):
+                    tcalc.compile(expr).evaluate()
+        self.assertEqual(
+            stats.errors,
+            {
+                "ParserError": 1,
+                "LexerError": 1,
+                "ZeroDivisionError": 1,
+                "EvaluatorError": 1,
+            },
+        )
+
+    def test_merge(self):
+        left, right = Stats(), Stats()
+        left.tokens, right.tokens = 1, 2
+        left.add_error(ZeroDivisionError())
+        right.add_error(ZeroDivisionError())
+        right.add_time("parse", 0.5)
+        left.merge(right)
+        self.assertEqual(left.tokens, 3)
+        self.assertEqual(left.errors, {"ZeroDivisionError": 2})
+        self.assertEqual(left.times["parse"], 0.5)
+
+
+class TestStatsFlag(unittest.TestCase):
+    def run_cli(self, *argv):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with mock.patch("sys.argv", ["tcalc", *argv]), mock.patch(
+            "sys.stdout", stdout
+        ), mock.patch("sys.stderr", stderr):
+            rc = cli.main()
+        return rc, stdout.getvalue(), stderr.getvalue()
+
+    def test_table(self):
+        tcalc.cache_clear()
+        rc, out, err = self.run_cli("--stats", "1:: + 1::")
+        self.assertEqual((rc, out), (0, "02:00:00\n"))
+        self.assertIn("evaluations", err)
+        for stage in STAGES:
+            self.assertIn(stage, err)
+        self.assertIsNone(instrumentation.active)
+
+    def test_json(self):
+        tcalc.cache_clear()
+        rc, out, err = self.run_cli("--stats", "--stats-format", "json", "1 / 0")
+        self.assertEqual(rc, 2)
+        data = json.loads(err[err.index("{"):])
+        self.assertEqual(data["evaluations"], 1)
+        self.assertEqual(data["errors"], {"ZeroDivisionError": 1})
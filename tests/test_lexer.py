@@ -0,0 +1,62 @@
+import unittest
+
+from tcalc.compiled import compile
+from tcalc.errors import LexerError
+from tcalc.lexer import RegexLexer
+from tcalc.token import Token, TokenType
+
+
+def scan(source):
+    lexer = RegexLexer(source)
+    tokens = [lexer.consume()]
+    while tokens[-1].type is not TokenType.EOF:
+        tokens.append(lexer.consume())
+    return tokens
+
+
+class TestRegexLexer(unittest.TestCase):
+    def test_literals(self):
+        self.assertEqual(
+            scan("(1:30: + 2.5) * .5"),
+            [
+                Token(TokenType.LPAREN, "(", 1),
+                Token(TokenType.TIME, "1:30:", 2),
+                Token(TokenType.PLUS, "+", 8),
+                Token(TokenType.NUMBER, "2.5", 10),
+                Token(TokenType.RPAREN, ")", 13),
+                Token(TokenType.MULT, "*", 15),
+                Token(TokenType.NUMBER, ".5", 17),
+                Token(TokenType.EOF, "", 19),
+            ],
+        )
+
+    def test_time_literals(self):
+        for source in ("::", "1::", ":2:", "::3", "1.5::", "12:34:56"):
+            with self.subTest(source=source):
+                self.assertEqual(
+                    scan(source)[0], Token(TokenType.TIME, source, 1)
+                )
+
+    def test_lazy(self):
+        lexer = RegexLexer("1 + $")
+        self.assertEqual(lexer.consume().type, TokenType.NUMBER)
+        with self.assertRaises(LexerError) as cm:
+            lexer.consume()
+        self.assertEqual(cm.exception.column, 5)
+
+    def test_same_results_as_char_lexer(self):
+        for source in (
+            "(1:: + :45: + :15:) / 2",
+            "2:30: * 3",
+            "1:: - 2::",
+            "--1 * -(2 + 3)",
+            "1.5:: / 2",
+            "0:0:666",
+            "1 / 3",
+            "1:: / 2::",
+        ):
+            with self.subTest(source=source):
+                self.assertEqual(
+                    str(compile(source, lexer="regex").evaluate()),
+                    str(compile(source, lexer="char").evaluate()),
+                )
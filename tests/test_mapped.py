@@ -0,0 +1,96 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from tcalc import cli
+from tcalc.batch import evaluate_lines
+from tcalc.errors import LexerError
+from tcalc.lexer import RegexLexer, SpanLexer
+from tcalc.mapped import evaluate_mapped, iter_lines, map_file
+from tcalc.token import TokenType
+
+LINES = [
+    "1:: + 1::\n",
+    "\n",
+    "  \r\n",
+    "(1:30: - 2.5::) * .5\r\n",
+    "1 $\n",
+    "3 / 0\n",
+    "x + 1\n",
+    "1 +",
+]
+
+
+def scan(lexer):
+    tokens = [lexer.consume()]
+    while tokens[-1].type is not TokenType.EOF:
+        tokens.append(lexer.consume())
+    return [(token.type, token.value, token.column) for token in tokens]
+
+
+class TestSpanLexer(unittest.TestCase):
+    def test_same_tokens(self):
+        for source in ("(1:30: + 2.5) * .5", "  x/::3 ", "", "1.5::-:2:"):
+            with self.subTest(source=source):
+                buffer = b"##" + source.encode() + b"##"
+                lexer = SpanLexer(buffer, 2, 2 + len(source))
+                self.assertEqual(scan(lexer), scan(RegexLexer(source)))
+
+    def test_non_ascii(self):
+        with self.assertRaises(LexerError) as cm:
+            scan(SpanLexer("1 + é".encode()))
+        self.assertEqual(cm.exception.column, 5)
+
+    def test_iter_lines(self):
+        buffer = b"a\r\nbc\n\nd"
+        spans = list(iter_lines(buffer))
+        self.assertEqual([buffer[s:e] for s, e in spans], [b"a", b"bc", b"", b"d"])
+
+
+class TestMapped(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "input.txt")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, lines):
+        with open(self.path, "w", newline="") as fp:
+            fp.writelines(lines)
+
+    def test_like_stream(self):
+        self.write(LINES)
+        with map_file(self.path) as buffer:
+            mapped = list(evaluate_mapped(buffer))
+        with open(self.path, newline="") as fp:
+            self.assertEqual(mapped, list(evaluate_lines(fp)))
+
+    def test_empty_file(self):
+        self.write([])
+        with map_file(self.path) as buffer:
+            self.assertEqual(list(evaluate_mapped(buffer)), [])
+
+    def test_batch_output(self):
+        self.write(LINES)
+        out = []
+        for files in ([self.path], ["-"]):
+            stdout, stderr = io.StringIO(), io.StringIO()
+            stdin = io.StringIO("".join(LINES), newline="")
+            with mock.patch("sys.stdout", stdout), mock.patch(
+                "sys.stderr", stderr
+            ), mock.patch("sys.stdin", stdin):
+                rc = cli.evaluate_batch(files)
+            out.append((rc, stdout.getvalue(), stderr.getvalue()))
+        self.assertEqual(out[0][:2], out[1][:2])
+        self.assertEqual(
+            out[0][2], out[1][2].replace("<stdin>", self.path)
+        )
+        self.assertEqual(out[0][1].count("\n"), len(LINES))
+        self.assertIn(f"{self.path}:6: ZeroDivisionError", out[0][2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from decimal import Decimal
+
+from tcalc.ast import Constant, format_tree
+from tcalc.compiled import compile, parse
+from tcalc.expression import Time
+from tcalc.optimizer import optimize
+
+
+def optimized(source):
+    return format_tree(optimize(parse(source))).splitlines()
+
+
+class TestOptimizer(unittest.TestCase):
+    def test_fold_constants(self):
+        ast = optimize(parse("(1:: + :45: + :15:) / 2 * -(1 + 1)"))
+        self.assertIs(type(ast), Constant)
+        self.assertEqual(ast.value, Time(2, 0, 0, sign=True))
+
+    def test_unary_chains(self):
+        self.assertEqual(optimized("--+-x"), ["UnaryOp(-)", "  Var(x)"])
+        self.assertEqual(optimized("-+-x"), ["Var(x)"])
+
+    def test_additive_time_chain(self):
+        self.assertEqual(
+            optimized("::30 + x + ::30 - (y - :1:)"),
+            ["BinOp(+)", "  BinOp(-)", "    Var(x)", "    Var(y)", "  Const(00:02:00)"],
+        )
+        self.assertEqual(
+            optimized("-x + ::30 - ::30"),
+            ["BinOp(+)", "  UnaryOp(-)", "    Var(x)", "  Const(00:00:00)"],
+        )
+
+    def test_additive_chain_errors(self):
+        # folding the times of a chain must not change which error is raised
+        # nor where it is reported
+        for source, variables in (
+            ("1 + ::1 - 1/0 + ::1", {}),
+            ("1:: + 1 + ::1 + ::1", {}),
+            ("1:: + x + ::1", {"x": Decimal(1)}),
+            ("x - 1:: + ::1", {"x": Decimal(1)}),
+            ("1:: - x + ::1", {"x": Decimal(1)}),
+            ("-x + ::1 + ::1", {"x": Decimal(1)}),
+        ):
+            with self.subTest(source=source):
+                errors = []
+                for expression in (compile(source, optimize=False), compile(source)):
+                    with self.assertRaises(Exception) as cm:
+                        expression.evaluate(**variables)
+                    errors.append((type(cm.exception), cm.exception.column))
+                self.assertEqual(errors[0], errors[1])
+
+    def test_multiplicative_chain(self):
+        self.assertEqual(
+            optimized("x * 1 * 2 * 3"), ["BinOp(*)", "  Var(x)", "  Const(6)"]
+        )
+        self.assertEqual(optimized("1 * x / 1"), ["Var(x)"])
+        self.assertEqual(
+            optimized("x * 1.0"), ["BinOp(*)", "  Var(x)", "  Const(1.0)"]
+        )
+
+    def test_errors_are_kept(self):
+        self.assertEqual(
+            optimized("1:: / 0"), ["BinOp(/)", "  Const(01:00:00)", "  Const(0)"]
+        )
+        with self.assertRaises(ZeroDivisionError):
+            compile("1:: / 0").evaluate()
+
+    def test_same_results(self):
+        variables = {"x": Time(1, 30, 0), "y": Time(0, 0, 7), "k": Decimal("1.5")}
+        for source in (
+            "::30 + ::30 + ::30 + x * 1 * 2",
+            "x - (::10 - y) - (::5 + ::5)",
+            "-(-(x + ::1)) * k / 1",
+            "(x * 2 * 3) / (y * 1)",
+            "1:: / 7 * 7 + x",
+            "k * 3 * 5 - 1",
+        ):
+            with self.subTest(source=source):
+                self.assertEqual(
+                    str(compile(source, optimize=False).evaluate(**variables)),
+                    str(compile(source).evaluate(**variables)),
+                )
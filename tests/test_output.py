@@ -0,0 +1,145 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from tcalc import cli
+from tcalc.backends import get_backend
+from tcalc.expression import TICKS_PER_SECOND, Time, format_ticks
+from tcalc.output import Writer, format_iso, format_seconds, get_format
+from tcalc.parallel import evaluate_parallel
+
+LINES = "1:: + 1::\n\n1 +\n:30: * 3\n3 / 2\n1:: / 0\n"
+
+
+def run_batch(fn, *args, **kwargs):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with mock.patch("sys.stdout", stdout), mock.patch("sys.stderr", stderr):
+        rc = fn(*args, **kwargs)
+    return rc, stdout.getvalue(), stderr.getvalue()
+
+
+class TestFormatting(unittest.TestCase):
+    def test_format_ticks(self):
+        for seconds, text in (
+            (0, "00:00:00"),
+            (5400, "01:30:00"),
+            (-3661, "-01:01:01"),
+            (360000, "100:00:00"),
+        ):
+            with self.subTest(seconds=seconds):
+                self.assertEqual(format_ticks(seconds * TICKS_PER_SECOND), text)
+        self.assertEqual(format_ticks(9_500_000), "00:00:9.5")
+
+    def test_seconds(self):
+        self.assertEqual(format_seconds(5400 * TICKS_PER_SECOND), "5400")
+        self.assertEqual(format_seconds(-1_500_000), "-1.5")
+        self.assertEqual(format_seconds(2), "0.000002")
+
+    def test_iso(self):
+        self.assertEqual(format_iso(0), "PT0S")
+        self.assertEqual(format_iso(5400 * TICKS_PER_SECOND), "PT1H30M")
+        self.assertEqual(format_iso(-3_600_500_000), "-PT1H0.5S")
+        self.assertEqual(format_iso(90 * 3600 * TICKS_PER_SECOND), "PT90H")
+
+    def test_backends(self):
+        for name in ("decimal", "fraction", "fixed", "float"):
+            with self.subTest(backend=name):
+                value = get_backend(name).time("1", "30", "0")
+                self.assertEqual(get_format("seconds").result(value), "5400\n")
+                self.assertEqual(get_format("iso").result(value), "PT1H30M\n")
+
+    def test_numbers_unchanged(self):
+        for name in ("seconds", "iso"):
+            self.assertEqual(get_format(name).result(Decimal("1.5")), "1.5\n")
+
+    def test_csv_quoting(self):
+        body = get_format("csv").error("LexerError", 3, 'Unknown character: "')
+        self.assertEqual(body, ',,"LexerError: Unknown character: """\n')
+
+
+class TestWriter(unittest.TestCase):
+    def test_buffered(self):
+        stream = mock.Mock()
+        written = []
+        stream.writelines.side_effect = lambda lines: written.append(list(lines))
+        writer = Writer("hms", stream, buffer_lines=3)
+        writer.write("a\n")
+        writer.write("b\n")
+        self.assertEqual(written, [])
+        writer.writelines(["c\n", "d\n"])
+        self.assertEqual(written, [["a\n", "b\n", "c\n", "d\n"]])
+        stream.flush.assert_not_called()
+        writer.flush()
+        stream.flush.assert_called_once()
+
+    def test_numbering(self):
+        stream = io.StringIO()
+        with Writer("csv", stream) as writer:
+            writer.write(get_format("csv").result(Time(1, 0, 0)))
+            writer.write(None)
+            writer.writelines([get_format("csv").result(Decimal(2))])
+            writer.start()
+            writer.write(get_format("csv").result(Decimal(3)))
+        self.assertEqual(
+            stream.getvalue(),
+            "line,result,seconds,error\n1,01:00:00,3600,\n3,2,,\n1,3,,\n",
+        )
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "input.txt")
+        with open(self.path, "w") as fp:
+            fp.write(LINES * 50)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_jsonl(self):
+        rc, out, err = run_batch(cli.evaluate_batch, [self.path], fmt="jsonl")
+        self.assertEqual(rc, 1)
+        records = [json.loads(line) for line in out.splitlines()]
+        self.assertEqual(len(records), 250)
+        self.assertEqual(
+            records[:5],
+            [
+                {"line": 1, "type": "time", "result": "02:00:00", "seconds": 7200},
+                {
+                    "line": 3,
+                    "error": "ParserError",
+                    "column": 4,
+                    "message": "invalid syntax",
+                },
+                {"line": 4, "type": "time", "result": "01:30:00", "seconds": 5400},
+                {"line": 5, "type": "number", "result": "1.5"},
+                {
+                    "line": 6,
+                    "error": "ZeroDivisionError",
+                    "message": "division by zero",
+                },
+            ],
+        )
+        self.assertEqual(records[-1]["line"], 300)
+
+    def test_parallel_like_serial(self):
+        for fmt in ("hms", "seconds", "iso", "csv", "jsonl"):
+            with self.subTest(fmt=fmt):
+                files = [self.path, self.path]
+                expected = run_batch(cli.evaluate_batch, files, fmt=fmt)
+                result = run_batch(
+                    evaluate_parallel, files, jobs=2, chunk_size=256, fmt=fmt
+                )
+                self.assertEqual(result, expected)
+
+    def test_single_expression(self):
+        rc, out, _ = run_batch(cli.evaluate, "1:30: * 3", fmt="iso")
+        self.assertEqual((rc, out), (0, "PT4H30M\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
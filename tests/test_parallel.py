@@ -0,0 +1,89 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from tcalc import cli
+from tcalc.parallel import aggregate_parallel, evaluate_parallel, split_file
+
+LINES = [f"{i % 24}:{i % 60}: * {i % 7}\n" for i in range(500)]
+LINES[123] = "1 +\n"
+LINES[321] = "\n"
+
+
+def capture(fn, *args, **kwargs):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with mock.patch("sys.stdout", stdout), mock.patch("sys.stderr", stderr):
+        rc = fn(*args, **kwargs)
+    return rc, stdout.getvalue(), stderr.getvalue()
+
+
+class TestParallel(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "input.txt")
+        with open(self.path, "w") as fp:
+            fp.writelines(LINES)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_split_on_line_boundaries(self):
+        chunks = list(split_file(self.path, chunk_size=100))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(chunks[0].start, 0)
+        self.assertEqual(chunks[-1].end, os.path.getsize(self.path))
+        lines = []
+        for previous, chunk in zip(chunks, chunks[1:]):
+            self.assertEqual(previous.end, chunk.start)
+        for chunk in chunks:
+            lines += chunk.read()
+        self.assertEqual(lines, LINES)
+
+    def test_ordered_output(self):
+        files = [self.path, self.path]
+        expected = capture(cli.evaluate_batch, files)
+        result = capture(evaluate_parallel, files, jobs=2, chunk_size=256)
+        self.assertEqual(result, expected)
+        self.assertIn(f"{self.path}:124:4: ParserError", result[2])
+
+    def test_merged_aggregates(self):
+        with open(self.path, "w") as fp:
+            fp.writelines(f"k{i % 3}\t{line}" for i, line in enumerate(LINES))
+        aggregator, failed = capture(
+            aggregate_parallel, [self.path], jobs=2, chunk_size=256
+        )[0]
+        expected = capture(cli.aggregate, [self.path])[1]
+        self.assertEqual(failed, 2)
+        self.assertEqual(capture(cli.write_aggregates, aggregator)[1], expected)
+
+    def test_mixed_types_across_chunks(self):
+        # a key seen as a number in one chunk and as a time in others
+        records = [f"k{i % 3}\t{i % 5}:{i % 7}:\n" for i in range(200)]
+        records[50] = "k1\t42\n"
+        records[120] = "k4\t2\n"
+        records[121:130] = [f"k4\t::{i}\n" for i in range(9)]
+        records[190] = "k4\t3\n"
+        with open(self.path, "w") as fp:
+            fp.writelines(records)
+        expected = capture(cli.aggregate, [self.path])
+        self.assertEqual(expected[0], 1)
+        self.assertIn(f"{self.path}:51: EvaluatorError", expected[2])
+        result = capture(cli.aggregate, [self.path], jobs=2)
+        self.assertEqual(result, expected)
+        result = capture(aggregate_parallel, [self.path], jobs=2, chunk_size=64)
+        (aggregator, failed), _, err = result
+        self.assertEqual(failed, expected[2].count("\n"))
+        self.assertEqual(err, expected[2])
+        self.assertEqual(capture(cli.write_aggregates, aggregator)[1], expected[1])
+
+    def test_lines_as_in_text_mode(self):
+        lines = ["1:: \v+ 1::\r\n", "2::\x85\n", "3\u2028\n", ":1:\r", "4\n"]
+        with open(self.path, "w", newline="") as fp:
+            fp.writelines(lines * 50)
+        with open(self.path) as fp:
+            expected = fp.readlines()
+        for chunk_size in (7, 100):
+            chunks = split_file(self.path, chunk_size)
+            self.assertEqual([line for c in chunks for line in c.read()], expected)
@@ -0,0 +1,82 @@
+import re
+import sys
+import unittest
+
+from tcalc.ast import render
+from tcalc.compiled import compile, parse
+from tcalc.errors import ParserError
+from tcalc.expression import Time
+
+DEPTH = sys.getrecursionlimit() * 10
+
+
+class TestParser(unittest.TestCase):
+    def test_precedence(self):
+        for source, expected in (
+            ("1 - 2 - 3", "BinOp(-, BinOp(-, 1, 2), 3)"),
+            ("1 + 2 * 3", "BinOp(+, 1, BinOp(*, 2, 3))"),
+            ("-2 * 3", "BinOp(*, UnaryOp(-, 2), 3)"),
+            ("2 * -+3 / 4", "BinOp(/, BinOp(*, 2, UnaryOp(-, UnaryOp(+, 3))), 4)"),
+            ("(1 + 2) * 3", "BinOp(*, BinOp(+, 1, 2), 3)"),
+        ):
+            with self.subTest(source=source):
+                self.assertEqual(_compact(render(parse(source))), expected)
+
+    def test_errors(self):
+        for source, msg, column in (
+            ("(1", "unmatched left parenthesis", 3),
+            ("(1 2)", "unmatched left parenthesis", 4),
+            ("1)", "invalid syntax", 2),
+            ("()", "invalid syntax", 2),
+            ("1 +", "invalid syntax", 4),
+            ("+ 1:: 1::", "invalid syntax", 7),
+        ):
+            with self.subTest(source=source):
+                with self.assertRaises(ParserError) as cm:
+                    parse(source)
+                error = cm.exception
+                self.assertEqual((error.msg, error.column), (msg, column))
+
+    def test_whitespace_ends_literals(self):
+        # the char lexer scans literals by character, as separate tokens
+        for source, column in (
+            ("1:: 1", 5),
+            ("1 2", 3),
+            ("1 .5", 3),
+            ("1. 5", 4),
+            ("1 :1:", 3),
+            (":: 1", 4),
+        ):
+            for lexer in ("regex", "char"):
+                with self.subTest(source=source, lexer=lexer):
+                    with self.assertRaises(ParserError) as cm:
+                        parse(source, lexer)
+                    self.assertEqual(cm.exception.column, column)
+
+    def test_deep_nesting(self):
+        source = "(" * DEPTH + "1::" + ")" * DEPTH + " / 2"
+        self.assertEqual(compile(source, cache=False).walk(), Time(0, 30, 0))
+        self.assertEqual(compile(source, cache=False).evaluate(), Time(0, 30, 0))
+
+    def test_unary_chain(self):
+        source = "-" * (DEPTH + 1) + "1::"
+        expected = Time(1, 0, 0, sign=True)
+        expr = compile(source, cache=False, optimize=False)
+        self.assertEqual(expr.walk(), expected)
+        self.assertEqual(compile(source, cache=False).evaluate(), expected)
+
+    def test_long_sum(self):
+        source = " + ".join(["x"] * DEPTH)
+        x = Time(0, 0, 1)
+        expr = compile(source, cache=False, optimize=False)
+        self.assertEqual(expr.walk(x=x), Time(0, 0, DEPTH))
+        self.assertEqual(expr.evaluate(x=x), Time(0, 0, DEPTH))
+        self.assertTrue(str(expr.ast).startswith("BinOp("))
+
+
+def _compact(rendered):
+    # BinOp(Token(type=<TokenType.PLUS: 11>, value='+', column=3), Numb(1), ...
+    # => BinOp(+, 1, ...
+    token = r"Token\(type=<[^>]*>, value='(.)', column=\d+\)"
+    rendered = re.sub(token, r"\1", rendered)
+    return re.sub(r"Numb\((\d+)\)", r"\1", rendered)
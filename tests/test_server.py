@@ -0,0 +1,152 @@
+import asyncio
+import io
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from tcalc import cli
+from tcalc.client import private_dir, request
+from tcalc.server import respond, start_server
+
+
+class TestRespond(unittest.TestCase):
+    def test_result(self):
+        self.assertEqual(respond("1:: + 1::"), "ok\t02:00:00\n")
+
+    def test_errors(self):
+        for expr, expect in (
+            ("1 +", "error\tParserError\t4\tinvalid syntax\n"),
+            ("1 $", "error\tLexerError\t3\tUnknown character: $\n"),
+            ("1:: / 0", "error\tZeroDivisionError\t-1\tdivision by zero\n"),
+            ("y", "error\tEvaluatorError\t1\tundefined variable y\n"),
+        ):
+            with self.subTest(expr=expr):
+                self.assertEqual(respond(expr), expect)
+
+
+class TestServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "tcalc.sock")
+        self.server = await start_server(self.path)
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.tmpdir.cleanup()
+
+    async def send(self, lines):
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        writer.write("".join(line + "\n" for line in lines).encode())
+        writer.write_eof()
+        responses = (await reader.read()).decode().splitlines()
+        writer.close()
+        return responses
+
+    async def test_pipelined_requests(self):
+        responses = await self.send(["1:: + 1::", "1 +", "2 * 3"] * 100)
+        self.assertEqual(
+            responses,
+            ["ok\t02:00:00", "error\tParserError\t4\tinvalid syntax", "ok\t6"] * 100,
+        )
+
+    async def test_concurrent_clients(self):
+        results = await asyncio.gather(
+            *(self.send([f"{i}:: * 2"] * 20) for i in range(10))
+        )
+        for i, responses in enumerate(results):
+            self.assertEqual(responses, [f"ok\t{2 * i:02d}:00:00"] * 20)
+
+    async def test_client(self):
+        response = await asyncio.to_thread(request, ":90: + 1", self.path)
+        self.assertEqual(
+            response, "error\tEvaluatorError\t6\tunsupported operands for +"
+        )
+
+    async def test_refuses_second_server(self):
+        with self.assertRaises(OSError):
+            await start_server(self.path)
+
+    async def test_keeps_other_files(self):
+        path = os.path.join(self.tmpdir.name, "notasocket.txt")
+        with open(path, "w") as fp:
+            fp.write("keep me\n")
+        with self.assertRaisesRegex(OSError, "not a socket"):
+            await start_server(path)
+        with open(path) as fp:
+            self.assertEqual(fp.read(), "keep me\n")
+
+    async def test_replaces_stale_socket(self):
+        path = os.path.join(self.tmpdir.name, "stale.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(path)  # never listening, as after a crash
+        server = await start_server(path)
+        server.close()
+        await server.wait_closed()
+
+
+class TestSocketPath(unittest.TestCase):
+    def test_private_dir(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "tcalc")
+            self.assertEqual(private_dir(path), path)
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o700)
+            self.assertEqual(private_dir(path), path)
+
+            os.chmod(path, 0o777)
+            with self.assertRaises(PermissionError):
+                private_dir(path)
+
+            link = os.path.join(tmpdir, "link")
+            os.symlink(path, link)
+            with self.assertRaises(PermissionError):
+                private_dir(link)
+
+
+class TestClientFallback(unittest.TestCase):
+    def test_no_daemon(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "missing.sock")
+            self.assertIsNone(request("1::", path))
+
+            stdout, stderr = io.StringIO(), io.StringIO()
+            with mock.patch.dict(os.environ, {"TCALC_SOCKET": path}), mock.patch(
+                "sys.stdout", stdout
+            ), mock.patch("sys.stderr", stderr):
+                self.assertEqual(cli.evaluate_client("1:: * 3"), 0)
+                self.assertEqual(cli.evaluate_client("1 / 0"), 2)
+            self.assertEqual(stdout.getvalue(), "03:00:00\n")
+            self.assertEqual(stderr.getvalue(), "Divison by Zero!\n")
+
+    def test_unusable_socket(self):
+        def listen(path):
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(path)
+            server.listen()
+            return server
+
+        def hang_up(server):
+            conn, _ = server.accept()
+            conn.close()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # listening, but never answering
+            path = os.path.join(tmpdir, "silent.sock")
+            with listen(path):
+                self.assertIsNone(request("1::", path, timeout=0.05))
+
+            path = os.path.join(tmpdir, "closing.sock")
+            with listen(path) as server:
+                thread = threading.Thread(target=hang_up, args=(server,))
+                thread.start()
+                self.assertIsNone(request("1::", path, timeout=5))
+                thread.join()
+
+            # a file that is no socket
+            path = os.path.join(tmpdir, "file.sock")
+            with open(path, "w"):
+                pass
+            self.assertIsNone(request("1::", path))
@@ -0,0 +1,183 @@
+import io
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from tcalc import cli
+from tcalc.batch import summarize_lines
+from tcalc.expression import TICKS_PER_SECOND, Time
+from tcalc.parallel import summarize_parallel
+from tcalc.sketch import Histogram, QuantileSketch, Summary, quantile_name
+
+
+def durations(n, seed=1):
+    rng = random.Random(seed)
+    return [int(rng.lognormvariate(18, 1.5)) for _ in range(n)]
+
+
+def state(summary):
+    return (
+        summary.count,
+        summary.total,
+        summary.minimum,
+        summary.maximum,
+        summary.sketch.zeros,
+        summary.sketch.positive,
+        summary.sketch.negative,
+        summary.histogram.counts,
+    )
+
+
+class TestQuantileSketch(unittest.TestCase):
+    def test_relative_error(self):
+        values = durations(20000)
+        sketch = QuantileSketch(alpha=0.01)
+        for ticks in values:
+            sketch.add(ticks)
+        values.sort()
+        for q in (0, 0.1, 0.5, 0.9, 0.99, 0.999, 1):
+            with self.subTest(q=q):
+                exact = values[int(q * (len(values) - 1))]
+                self.assertLessEqual(abs(sketch.quantile(q) - exact), 0.01 * exact)
+
+    def test_negative_and_zero(self):
+        sketch = QuantileSketch()
+        for ticks in (-100, -10, 0, 0, 10, 100):
+            sketch.add(ticks)
+        self.assertAlmostEqual(sketch.quantile(0), -100, delta=1)
+        self.assertEqual(sketch.quantile(0.5), 0)
+        self.assertAlmostEqual(sketch.quantile(1), 100, delta=1)
+
+    def test_bounded_bins(self):
+        sketch = QuantileSketch(max_bins=64)
+        for ticks in range(1, 10**6, 7):
+            sketch.add(ticks)
+        self.assertLessEqual(len(sketch.positive), 64)
+        self.assertEqual(sum(sketch.positive.values()), sketch.count)
+        # the high end keeps its accuracy
+        self.assertAlmostEqual(sketch.quantile(0.99), 0.99 * 10**6, delta=10**4)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            QuantileSketch(alpha=1)
+        with self.assertRaises(ValueError):
+            QuantileSketch().quantile(1.5)
+        with self.assertRaises(ValueError):
+            QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+class TestHistogram(unittest.TestCase):
+    def test_buckets(self):
+        histogram = Histogram([10, 100])
+        for ticks in (-5, 10, 11, 100, 1000):
+            histogram.add(ticks)
+        self.assertEqual(list(histogram), [(10, 2), (100, 2), (None, 1)])
+        with self.assertRaises(ValueError):
+            histogram.merge(Histogram([10]))
+
+
+class TestSummary(unittest.TestCase):
+    def test_exact_totals(self):
+        summary = Summary()
+        for seconds in (30, 5, -10, 40):
+            summary.add(Time(0, 0, seconds))
+        data = summary.as_dict()
+        self.assertEqual(data["count"], 4)
+        self.assertEqual(data["sum"], "00:01:05")
+        self.assertEqual(data["min"], "-00:00:10")
+        self.assertEqual(data["max"], "00:00:40")
+        self.assertEqual(data["mean"], str(Time(0, 0, 16.25)))
+        self.assertEqual(data["histogram"][0], {"le": "00:00:01", "count": 1})
+        self.assertEqual(summary.quantile(1), Time(0, 0, 40))
+
+    def test_merge_is_exact(self):
+        parts = [Summary() for _ in range(3)]
+        whole = Summary()
+        for i, ticks in enumerate(durations(5000) + [0, -7]):
+            parts[i % 3].add(Time.from_ticks(ticks))
+            whole.add(Time.from_ticks(ticks))
+        merged = Summary()
+        for part in parts:
+            merged.merge(part)
+        self.assertEqual(state(merged), state(whole))
+        self.assertEqual(merged.quantile(0.99), whole.quantile(0.99))
+
+    def test_empty(self):
+        summary = Summary()
+        summary.merge(Summary())
+        data = summary.as_dict()
+        self.assertEqual(data["count"], 0)
+        self.assertIsNone(data["mean"])
+        self.assertEqual(data["quantiles"], {"p50": None, "p90": None, "p99": None})
+        for q in (0, 0.5, 1):
+            self.assertIsNone(summary.quantile(q))
+        self.assertIsNone(summary.mean)
+        with self.assertRaises(ValueError):
+            summary.merge(Summary([TICKS_PER_SECOND]))
+
+    def test_quantile_name(self):
+        self.assertEqual(quantile_name(0.5), "p50")
+        self.assertEqual(quantile_name(0.999), "p99.9")
+
+
+LINES = [f"{i % 24}:{i % 60}: * {i % 7}\n" for i in range(500)]
+LINES[123] = "1 +\n"
+LINES[321] = "\n"
+LINES[400] = "2 * 3\n"
+
+
+class TestStatsCommand(unittest.TestCase):
+    def capture(self, fn, *args):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with mock.patch("sys.stdout", stdout), mock.patch("sys.stderr", stderr):
+            rc = fn(*args)
+        return rc, stdout.getvalue(), stderr.getvalue()
+
+    def test_summarize_lines(self):
+        summary = Summary()
+        errors = list(summarize_lines(LINES, summary))
+        self.assertEqual(summary.count, 497)
+        self.assertEqual(
+            [(e.lineno, e.kind) for e in errors],
+            [(124, "ParserError"), (401, "EvaluatorError")],
+        )
+
+    def test_parallel_equals_serial(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "input.txt")
+            with open(path, "w") as fp:
+                fp.writelines(LINES)
+            serial = Summary()
+            for _ in summarize_lines(LINES * 2, serial):
+                pass
+            summary = Summary()
+            rc, out, err = self.capture(
+                summarize_parallel, [path, path], 2, summary, "regex", 256
+            )
+        self.assertEqual(rc, 4)
+        self.assertEqual(state(summary), state(serial))
+        self.assertIn(f"{path}:401: EvaluatorError: expected a duration", err)
+
+    def test_cli(self):
+        argv = ["tcalc", "stats", "-q", "50,100", "--buckets", ":1:,1::", "-"]
+        stdin = io.StringIO("1::\n:30:\n2:: + :30:\n")
+        with mock.patch("sys.argv", argv), mock.patch("sys.stdin", stdin):
+            rc, out, err = self.capture(cli.main)
+        self.assertEqual(rc, 0)
+        summary, histogram = out.split("\n\n")
+        rows = dict(line.split("\t") for line in summary.splitlines())
+        self.assertEqual(rows["count"], "3")
+        self.assertEqual(rows["sum"], "04:00:00")
+        self.assertEqual(rows["mean"], "01:20:00")
+        self.assertEqual(rows["p100"], "02:30:00")
+        p50 = Time(*rows["p50"].split(":")).ticks
+        hour = 3600 * TICKS_PER_SECOND
+        self.assertAlmostEqual(p50, hour, delta=hour // 100)
+        self.assertEqual(
+            histogram, "le\tcount\n00:01:00\t0\n01:00:00\t2\ninf\t1\n"
+        )
+
+if __name__ == "__main__":
+    unittest.main()
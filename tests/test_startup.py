@@ -0,0 +1,40 @@
+import subprocess
+import sys
+import unittest
+
+from benchmarks.startup import DEFERRED, IMPORT_BUDGET_MS, import_time
+
+SCRIPT = (
+    "import sys; from tcalc.cli import main; rc = main(); "
+    "print(' '.join(sys.modules), file=sys.stderr); sys.exit(rc)"
+)
+
+
+def run_script(*argv):
+    proc = subprocess.run(
+        [sys.executable, "-c", SCRIPT, *argv], capture_output=True, text=True
+    )
+    return proc.returncode, proc.stdout, proc.stderr.split()
+
+
+class TestStartup(unittest.TestCase):
+    def test_single_expression_defers_imports(self):
+        rc, out, modules = run_script("(1:: + :45: + :15:) / 2")
+        self.assertEqual((rc, out), (0, "01:00:00\n"))
+        for name in DEFERRED:
+            with self.subTest(module=name):
+                self.assertNotIn(name, modules)
+
+    def test_import_time_budget(self):
+        self.assertLessEqual(import_time(), IMPORT_BUDGET_MS)
+
+    def test_errors_on_the_fast_path(self):
+        for expr, expect in (("1 +", 1), ("1 / 0", 2), ("1 $", 3)):
+            with self.subTest(expr=expr):
+                rc, out, _ = run_script(expr)
+                self.assertEqual((rc, out), (expect, ""))
+
+    def test_options_still_parsed(self):
+        rc, out, modules = run_script("--lexer", "char", "1:: * 2")
+        self.assertEqual((rc, out), (0, "02:00:00\n"))
+        self.assertIn("argparse", modules)
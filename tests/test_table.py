@@ -0,0 +1,137 @@
+import io
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from tcalc import cli
+from tcalc.backends import get_backend
+from tcalc.compiled import compile
+from tcalc.errors import EvaluatorError
+from tcalc.expression import Time
+from tcalc.table import bind_columns, evaluate_table, parse_cell
+
+TABLE = (
+    "name,planned,actual,break\n"
+    "ann,8:00:00,7:15,0:30\n"
+    "bob,8::,x,:30:\n"
+    "cy,8:00,8:10:30.5,-0:15\n"
+    "dee,8::\n"
+)
+
+
+class TestTable(unittest.TestCase):
+    def test_parse_cell(self):
+        backend = get_backend("decimal")
+        for text, value in (
+            ("8:30:00", Time(8, 30, 0)),
+            (" 8:30 ", Time(8, 30, 0)),
+            (":45:", Time(0, 45, 0)),
+            ("1.5::", Time(1, 30, 0)),
+            ("-0:15", -Time(0, 15, 0)),
+            ("0:0:1.25", Time(0, 0, Decimal("1.25"))),
+            ("3", Decimal(3)),
+            ("-.5", Decimal("-0.5")),
+        ):
+            with self.subTest(text=text):
+                self.assertEqual(parse_cell(text, backend), value)
+        for text in ("", "x", "1:2:3:4", "1 2", "::-1"):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    parse_cell(text, backend)
+
+    def test_backends(self):
+        for name in ("decimal", "fraction", "fixed", "float"):
+            with self.subTest(backend=name):
+                backend = get_backend(name)
+                value = parse_cell("1:30", backend)
+                self.assertTrue(backend.is_time(value))
+                self.assertEqual(value.ticks, 5400 * 10**6)
+
+    def test_bind_columns(self):
+        compiled = compile("b - a * 2")
+        self.assertEqual(bind_columns([" a", "x", "b"], compiled), {"a": 0, "b": 2})
+        with self.assertRaises(EvaluatorError) as cm:
+            bind_columns(["a", "x"], compiled)
+        self.assertEqual(cm.exception.msg, "undefined variable b")
+        self.assertEqual(cm.exception.column, 1)
+
+    def test_evaluate_table(self):
+        out = io.StringIO()
+        compiled = compile("planned - (actual + break)")
+        errors = list(evaluate_table(io.StringIO(TABLE), out, compiled))
+        self.assertEqual(
+            out.getvalue(),
+            "name,planned,actual,break,result\n"
+            "ann,8:00:00,7:15,0:30,00:15:00\n"
+            "bob,8::,x,:30:,\n"
+            "cy,8:00,8:10:30.5,-0:15,00:04:29.5\n"
+            "dee,8::,\n",
+        )
+        self.assertEqual(
+            [error.format("t.csv") for error in errors],
+            [
+                "t.csv:3: ValueError: column actual: not a time or number: 'x'\n",
+                "t.csv:5: ValueError: missing column actual\n",
+            ],
+        )
+
+    def test_empty(self):
+        out = io.StringIO()
+        self.assertEqual(list(evaluate_table(io.StringIO(""), out, compile("a"))), [])
+        self.assertEqual(out.getvalue(), "")
+
+
+class TestCli(unittest.TestCase):
+    def run_csv(self, *args, **kwargs):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with mock.patch("sys.stdout", stdout), mock.patch("sys.stderr", stderr):
+            rc = cli.evaluate_csv(*args, **kwargs)
+        return rc, stdout.getvalue(), stderr.getvalue()
+
+    def test_tsv(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "shifts.tsv")
+            with open(path, "w") as fp:
+                fp.write("start\tend\n8::\t16:30\n")
+            rc, out, err = self.run_csv(
+                path, "(end - start) * 5", column="week", fmt="iso"
+            )
+        self.assertEqual((rc, err), (0, ""))
+        self.assertEqual(out, "start\tend\tweek\n8::\t16:30\tPT42H30M\n")
+
+    def test_column_named_self(self):
+        with mock.patch("sys.stdin", io.StringIO("self,expr\n1::,2\n")):
+            rc, out, err = self.run_csv("-", "self * expr")
+        self.assertEqual((rc, err), (0, ""))
+        self.assertEqual(out, "self,expr,result\n1::,2,02:00:00\n")
+
+    def test_missing_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "missing.csv")
+            rc, out, err = self.run_csv(path, "a + b")
+        self.assertEqual((rc, out), (1, ""))
+        self.assertEqual(err, f"tcalc: {path}: No such file or directory\n")
+
+    def test_not_utf8(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "latin1.csv")
+            with open(path, "wb") as fp:
+                fp.write(b"a\n1::\n\xff\n")
+            rc, out, err = self.run_csv(path, "a * 2")
+        self.assertEqual(rc, 1)
+        self.assertEqual(err, f"tcalc: {path}: not utf-8 text: invalid start byte\n")
+
+    def test_unknown_column(self):
+        with mock.patch("sys.stdin", io.StringIO(TABLE)):
+            rc, out, err = self.run_csv("-", "planned - overtime")
+        self.assertEqual(rc, 1)
+        self.assertEqual(out, "")
+        self.assertEqual(
+            err, "planned - overtime\n          ^\nundefined variable overtime\n"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
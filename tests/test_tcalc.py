@@ -1,65 +1,81 @@
 import unittest
+from decimal import Decimal
 
+from tcalc.compiled import compile
 from tcalc.expression import Time
-from tcalc.calc import (calc_infix, calc_postfix)
-from tcalc.token import (Token, tokenize)
+from tcalc.lexer import create_lexer
+from tcalc.token import Token, TokenType
+
+
+def calc(expr):
+    return compile(expr, cache=False).evaluate()
+
+
+def tokenize(expr):
+    lexer = create_lexer(expr)
+    tokens = []
+    while not lexer.isEOF():
+        tokens.append(lexer.consume())
+    return tokens
+
+
+def hms(hours, minutes=0, seconds=0):
+    return Time(Decimal(hours), Decimal(minutes), Decimal(seconds))
 
 
 class TestTcalc(unittest.TestCase):
 
     def test_time(self):
         for expect, given in (
-            (Time('01:23:45'), '1:23:45'),
-            (Time('00:11:06'), '::666'),
-            (Time('00:11:06'), ':11:6'),
+            (hms(1, 23, 45), '1:23:45'),
+            (hms(0, 11, 6), '::666'),
+            (hms(0, 11, 6), ':11:6'),
         ):
             with self.subTest(expect=expect, args=given):
-                self.assertEqual(expect, Time(given))
+                self.assertEqual(expect, calc(given))
 
     def test_tokenize(self):
         for expect, given in (
-            ([Token('OPERATOR', '+', 0)], '+'),
-            ([Token('SEPERATOR', '(', 0)], '('),
-            ([Token('NUMBER', 1.0, 0)], '1.0'),
-            ([Token('TIME', Time('1::'), 0)], '1::'),
-            ([Token('OPERATOR', '+', 0), Token('OPERATOR', '+', 2)], '+ +'),
+            ([Token(TokenType.PLUS, '+', 1)], '+'),
+            ([Token(TokenType.LPAREN, '(', 1)], '('),
+            ([Token(TokenType.NUMBER, '1.0', 1)], '1.0'),
+            ([Token(TokenType.TIME, '1::', 1)], '1::'),
+            ([Token(TokenType.PLUS, '+', 1), Token(TokenType.PLUS, '+', 3)], '+ +'),
         ):
             with self.subTest(expect=expect, args=given):
-                self.assertListEqual(expect, list(tokenize(given)))
+                self.assertListEqual(expect, tokenize(given))
 
-    def test_calc_postfix(self):
+    def test_calc_arithmetic(self):
         for expect, given in (
             # generic arithmetic
-            (Time('2::'),  '1:: 1:: +'),
-            (Time('::'),   '1:: 1:: -'),
-            (Time('2::'),  '1:: 2 *'),
-            (Time(':30:'), '1:: 2 /'),
+            (hms(2),        '1:: + 1::'),
+            (hms(0),        '1:: - 1::'),
+            (hms(2),        '1:: * 2'),
+            (hms(0, 30),    '1:: / 2'),
             # overflow
-            (Time('24::'), '23:59:59 ::1 +'),
+            (hms(24),       '23:59:59 + ::1'),
         ):
             with self.subTest(expect=expect, args=given):
-                self.assertEqual(expect, calc_postfix(tokenize(given)))
+                self.assertEqual(expect, calc(given))
 
     def test_calc_infix(self):
         for expect, given in (
-            (Time('3::'), '1:: + 1:: + 1::'),
-            (Time('8::'), '(1:: + 1:: ) * 4'),
-            (Time('1::'), '( 1:: + 1::) / 2'),
-            (4,           '(2 - 1) * 4'),
-            (0.5,         '1:: / 2::'),
+            (hms(3), '1:: + 1:: + 1::'),
+            (hms(8), '(1:: + 1:: ) * 4'),
+            (hms(1), '( 1:: + 1::) / 2'),
+            (4,      '(2 - 1) * 4'),
+            (0.5,    '1:: / 2::'),
         ):
             with self.subTest(expect=expect, args=given):
-                self.assertEqual(expect, calc_infix(tokenize(given)))
+                self.assertEqual(expect, calc(given))
 
     def test_calc(self):
-        for postfix, infix in (
+        for left, right in (
             ('1::0', '1:0:'),
             ('01', '1'),
-            ('2.0 2 + 2 -', '2.00'),
-            ('1:: 3 * 3 /', '(1/(1.0))*1::'),
-            ('1:: 2 /', '1::-1::/2'),
+            ('2.0 + 2 - 2', '2.00'),
+            ('1:: * 3 / 3', '(1/(1.0))*1::'),
+            ('1:: / 2', '1::-1::/2'),
         ):
-            with self.subTest(expect=infix, args=postfix):
-                self.assertEqual(
-                    calc_postfix(tokenize(postfix)),calc_infix(tokenize(infix))
-                )
+            with self.subTest(expect=right, args=left):
+                self.assertEqual(calc(left), calc(right))
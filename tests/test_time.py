@@ -69,4 +69,56 @@ class TestTime(unittest.TestCase):
         t2 = build_time("1:1:1")
         expected = build_time("::")
         result = t1 + -t2
-        self.assertEqual(result, expected)
\ No newline at end of file
+        self.assertEqual(result, expected)
+
+    def test_negate_returns_new_value(self):
+        t = build_time("1:1:1")
+        self.assertEqual(-t, build_time("1:1:1", True))
+        self.assertEqual(t, build_time("1:1:1"))
+
+    def test_sign_rules(self):
+        t = build_time("::1", True)
+        self.assertEqual(t * 2, build_time("::2", True))
+        self.assertEqual(t - build_time("::1"), build_time("::2", True))
+        self.assertEqual(t / build_time("::2"), Decimal("-0.5"))
+
+    def test_immutable(self):
+        t = build_time("1::")
+        with self.assertRaises(AttributeError):
+            t.sign = True
+        with self.assertRaises(AttributeError):
+            t.foo = 1
+
+    def test_hash(self):
+        self.assertEqual(hash(build_time("::3600")), hash(build_time("1::")))
+        self.assertEqual(len({build_time("1::"), build_time(":60:")}), 1)
+
+    def test_format(self):
+        for expected, t in (
+            ("01:00:00", build_time("1::")),
+            ("101:00:40", build_time("101::40")),
+            ("00:11:06", build_time("::666")),
+            ("-00:00:01", build_time("::1", True)),
+            ("01:30:00", build_time("1.5::")),
+            ("00:00:4.5", build_time("::9") / 2),
+            ("00:08:34.285714", build_time("1::") / 7),
+        ):
+            with self.subTest(expected=expected):
+                self.assertEqual(str(t), expected)
+
+    def test_unsupported_operands(self):
+        t = build_time("1::")
+        for op in (
+            lambda: t + Decimal(1),
+            lambda: Decimal(1) - t,
+            lambda: t * t,
+            lambda: Decimal(1) / t,
+        ):
+            with self.assertRaises(TypeError):
+                op()
+
+    def test_division_by_zero(self):
+        with self.assertRaises(ZeroDivisionError):
+            build_time("::") / Decimal(0)
+        with self.assertRaises(ZeroDivisionError):
+            build_time("1::") / build_time("::")
@@ -0,0 +1,70 @@
+import unittest
+from decimal import Decimal
+
+from tcalc.bytecode import ADD, CONST, LOAD, MUL, NEG, compile_ast, disassemble
+from tcalc.compiled import compile, parse
+from tcalc.errors import EvaluatorError
+from tcalc.expression import Time
+
+CORPUS = (
+    "(1:: + :45: + :15:) / 2",
+    "2:30: * 3",
+    "1:: - 2::",
+    "--1 * -(2 + 3)",
+    "+-+1::",
+    "1.5:: / 2",
+    "0:0:666",
+    "1 / 3",
+    "1:: / 2::",
+    "1:: / 7 * 7",
+    "(x + 0:15:) * k - x / 4",
+)
+
+
+class TestCompiler(unittest.TestCase):
+    def test_post_order(self):
+        code = compile_ast(parse("-(x + 1::) * 2"))
+        self.assertEqual(
+            [opcode for opcode, _ in code.instructions],
+            [LOAD, CONST, ADD, NEG, CONST, MUL],
+        )
+        self.assertEqual(code.constants, [Time(1, 0, 0), Decimal(2)])
+
+    def test_constant_pool(self):
+        code = compile_ast(parse("1:: + 1:: + :60: + 1 + 1.0"))
+        self.assertEqual(code.constants, [Time(1, 0, 0), Decimal(1), Decimal("1.0")])
+        self.assertEqual(
+            [arg for opcode, arg in code.instructions if opcode == CONST],
+            [0, 0, 0, 1, 2],
+        )
+
+    def test_disassemble(self):
+        code = compile_ast(parse("x * 2"))
+        self.assertEqual(
+            disassemble(code).splitlines(),
+            ["   0 LOAD   x", "   1 CONST  0 (2)", "   2 MUL   "],
+        )
+
+
+class TestVM(unittest.TestCase):
+    def test_same_results_as_evaluator(self):
+        variables = {"x": Time(1, 30, 0), "k": Decimal("1.5")}
+        for source in CORPUS:
+            with self.subTest(source=source):
+                expr = compile(source)
+                self.assertEqual(
+                    str(expr.evaluate(**variables)), str(expr.walk(**variables))
+                )
+
+    def test_errors(self):
+        for source, column in (("1 + 1::", 3), ("2 * (y / x)", 8)):
+            with self.subTest(source=source):
+                with self.assertRaises(EvaluatorError) as cm:
+                    compile(source).evaluate(x=Time(1, 0, 0), y=Decimal(1))
+                self.assertEqual(cm.exception.column, column)
+
+    def test_undefined_variable(self):
+        with self.assertRaises(EvaluatorError) as cm:
+            compile("1 + y").evaluate()
+        self.assertEqual(cm.exception.msg, "undefined variable y")
+        self.assertEqual(cm.exception.column, 5)
@@ -0,0 +1,167 @@
+import io
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from tcalc import cli
+from tcalc.worksheet import Worksheet, parse_line
+
+SHEET = [
+    "shift = 8:: - 0:30:\n",
+    "week = shift * 5\n",
+    "\n",
+    "# per day\n",
+    "week / 5\n",
+    "days = 5\n",
+    "pause = :30:\n",
+]
+
+
+def values(sheet):
+    return {key: str(cell.value) for key, cell in sheet.cells.items()}
+
+
+class TestWorksheet(unittest.TestCase):
+    def test_parse_line(self):
+        self.assertEqual(parse_line("x = 1 + 2").source, " 1 + 2")
+        self.assertEqual(parse_line("x = 1 + 2").offset, 3)
+        self.assertIsNone(parse_line("1 + 2", 3).name)
+        self.assertEqual(parse_line("1 + 2", 3).key, "3")
+        self.assertIsNone(parse_line("  # comment"))
+        self.assertIsNone(parse_line("  \n"))
+
+    def test_load(self):
+        sheet = Worksheet()
+        self.assertEqual(
+            sheet.load(SHEET), ["shift", "week", "5", "days", "pause"]
+        )
+        self.assertEqual(
+            values(sheet),
+            {
+                "shift": "07:30:00",
+                "week": "37:30:00",
+                "5": "07:30:00",
+                "days": "5",
+                "pause": "00:30:00",
+            },
+        )
+
+    def test_only_downstream_is_evaluated(self):
+        sheet = Worksheet()
+        sheet.load(SHEET)
+        evaluations = sheet.evaluations
+        changed = list(SHEET)
+        changed[0] = "shift = 9:: - pause\n"
+        self.assertEqual(sheet.load(changed), ["shift", "week", "5"])
+        self.assertEqual(sheet.evaluations - evaluations, 3)
+        self.assertEqual(str(sheet["week"]), "42:30:00")
+
+        evaluations = sheet.evaluations
+        self.assertEqual(sheet.load(changed), [])
+        self.assertEqual(sheet.evaluations, evaluations)
+
+    def test_define(self):
+        sheet = Worksheet()
+        sheet.load(SHEET)
+        self.assertEqual(sheet.define(parse_line("pause = :45:")), ["pause"])
+        self.assertEqual(
+            sheet.define(parse_line("week = shift * days")), ["week", "5"]
+        )
+        self.assertEqual(sheet.define(parse_line("days = 4")), ["week", "5", "days"])
+        self.assertEqual(str(sheet["week"]), "30:00:00")
+        self.assertEqual(sheet.evaluate("week / days"), sheet["shift"])
+
+    def test_forward_and_undefined_references(self):
+        sheet = Worksheet()
+        sheet.load(["total = hours * 2\n", "hours = 3::\n", "x = y\n"])
+        self.assertEqual(str(sheet["total"]), "06:00:00")
+        with self.assertRaisesRegex(Exception, "undefined variable y"):
+            sheet["x"]
+        sheet.define(parse_line("y = 2"))
+        self.assertEqual(sheet["x"], Decimal(2))
+
+    def test_errors_propagate(self):
+        sheet = Worksheet()
+        sheet.load(["a = 1 +\n", "b = a * 2\n", "c = b / 0\n", "d = 1\n"])
+        self.assertEqual(sheet.cells["a"].error.msg, "invalid syntax")
+        self.assertEqual(sheet.cells["b"].error.msg, "a has an error")
+        self.assertEqual(sheet.cells["b"].error.column, 2)  # of the expression
+        self.assertEqual(sheet.cells["c"].error.msg, "b has an error")
+        self.assertIsNone(sheet.cells["d"].error)
+        sheet.define(parse_line("a = 1"))
+        self.assertIsInstance(sheet.cells["c"].error, ZeroDivisionError)
+
+    def test_cycles(self):
+        sheet = Worksheet()
+        sheet.load(["a = b + 1\n", "b = a\n", "c = c\n", "d = 1\n"])
+        for key in ("a", "b", "c"):
+            self.assertEqual(sheet.cells[key].error.msg, "circular reference")
+        self.assertEqual(sheet["d"], Decimal(1))
+        sheet.define(parse_line("b = 1"))
+        self.assertEqual(sheet["a"], Decimal(2))
+
+    def test_depending_on_a_cycle(self):
+        sheet = Worksheet()
+        sheet.load(["loop = loop + 1\n", "after = loop * 2\n", "last = after\n"])
+        self.assertEqual(sheet.cells["loop"].error.msg, "circular reference")
+        self.assertEqual(sheet.cells["after"].error.msg, "loop has an error")
+        self.assertEqual(sheet.cells["last"].error.msg, "after has an error")
+
+    def test_names_of_parameters(self):
+        sheet = Worksheet()
+        sheet.load(["self = 3\n", "x = self * 2\n"])
+        self.assertEqual(sheet["x"], Decimal(6))
+
+    def test_removed_lines(self):
+        sheet = Worksheet()
+        sheet.load(SHEET)
+        self.assertEqual(sheet.load(SHEET[1:]), ["week", "4"])
+        self.assertEqual(sheet.cells["week"].error.msg, "undefined variable shift")
+
+
+class TestCli(unittest.TestCase):
+    def run_cli(self, fn, *args, stdin=""):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with mock.patch("sys.stdin", io.StringIO(stdin)), mock.patch(
+            "sys.stdout", stdout
+        ), mock.patch("sys.stderr", stderr):
+            rc = fn(*args)
+        return rc, stdout.getvalue(), stderr.getvalue()
+
+    def test_repl_keeps_state_and_errors(self):
+        rc, out, err = self.run_cli(
+            cli.repl,
+            stdin="shift = 8::\nweek = shift * 5\n1 +\nshift = 7::\nweek / 0\n",
+        )
+        self.assertEqual(rc, 0)
+        self.assertEqual(
+            out.replace("tcalc> ", ""),
+            "shift = 08:00:00\nweek = 40:00:00\n"
+            "shift = 07:00:00\nweek = 35:00:00\n",
+        )
+        self.assertEqual(err, "1 +\n   ^\ninvalid syntax\nDivison by Zero!\n")
+
+    def test_repl_self(self):
+        rc, out, err = self.run_cli(cli.repl, stdin="self = 3\nx = self * 2\n")
+        self.assertEqual((rc, err), (0, ""))
+        self.assertEqual(out.replace("tcalc> ", ""), "self = 3\nx = 6\n")
+
+    def test_sheet(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sheet.tc")
+            with open(path, "w") as fp:
+                fp.writelines(SHEET + ["bad = days $\n"])
+            rc, out, err = self.run_cli(cli.evaluate_sheet, path)
+        self.assertEqual(rc, 1)
+        self.assertEqual(
+            out,
+            "shift = 07:30:00\nweek = 37:30:00\n07:30:00\ndays = 5\n"
+            "pause = 00:30:00\nbad =\n",
+        )
+        self.assertEqual(err, f"{path}:8:12: LexerError: Unknown character: $\n")
+
+
+if __name__ == "__main__":
+    unittest.main()